@@ -3,6 +3,8 @@ import os
 import zipfile
 import datetime
 import json
+import sqlite3
+import tempfile
 from google.oauth2 import service_account
 from google.oauth2.credentials import Credentials as UserCredentials
 from google_auth_oauthlib.flow import InstalledAppFlow
@@ -12,6 +14,7 @@ from googleapiclient.http import MediaFileUpload
 from googleapiclient.errors import HttpError
 import argparse
 import sys
+import backup_incremental
 
 # --- CONFIGURAÇÕES ---
 # O escopo define o nível de acesso. Drive completo é o mais simples para começar.
@@ -39,6 +42,22 @@ BACKUP_PATH = os.path.join(PROJECT_ROOT, BACKUP_FILENAME)
 # *** ID DA SUA PASTA: 1IfMK8UGcaT2cUALo5Uas2mB0n9zIp8hs ***
 DRIVE_FOLDER_ID = '1IfMK8UGcaT2cUALo5Uas2mB0n9zIp8hs'
 
+# Lista de arquivos/pastas para ignorar no backup
+EXCLUDE_LIST = [
+    '__pycache__', 
+    '.git', 
+    BACKUP_FILENAME, # Evita incluir o próprio backup no backup
+    'token.json', # Não precisa de backup da credencial de acesso
+    'credentials.json',
+]
+
+# Bancos SQLite (ex: meu_banco.db) entram no ZIP como um snapshot consistente,
+# copiado com a API de backup do SQLite em passos de poucas páginas
+SQLITE_HEADER = b'SQLite format 3\x00'
+SQLITE_TEMP_SUFFIXES = ('-wal', '-shm', '-journal') # Arquivos auxiliares: o snapshot já contém tudo
+SNAPSHOT_PAGES_PER_STEP = 256 # Páginas copiadas por passo (~1 MB com páginas de 4 KiB)
+SNAPSHOT_SLEEP = 0.005 # Segundos de pausa entre os passos (deixa o scanner escrever)
+
 # --- FUNÇÕES ---
 
 def authenticate_google_drive():
@@ -97,44 +116,106 @@ def parse_args():
     parser.add_argument('--credentials', '-c', help='Caminho para OAuth client_secret JSON (credentials.json)')
     parser.add_argument('--drive-folder', '-d', help='ID da pasta do Drive de destino')
     parser.add_argument('--no-cleanup', action='store_true', help='Não remover o ZIP local após upload')
+    parser.add_argument('--incremental', '-i', action='store_true',
+                        help='Grava só o que mudou no repositório local de backups (sem ZIP e sem upload)')
+    parser.add_argument('--repo', '-r', default=backup_incremental.DEFAULT_REPO,
+                        help='Pasta do repositório de backups incrementais')
     return parser.parse_args()
 
-def create_zip_backup(root_dir, output_path):
+def is_sqlite_file(path):
+    """Confere o cabeçalho do arquivo (não depende da extensão)."""
+    try:
+        with open(path, 'rb') as f:
+            return f.read(len(SQLITE_HEADER)) == SQLITE_HEADER
+    except OSError:
+        return False
+
+
+def snapshot_sqlite(source_path, dest_path, pages=SNAPSHOT_PAGES_PER_STEP, sleep=SNAPSHOT_SLEEP):
+    """
+    Copia um banco SQLite em uso para `dest_path` sem corromper e sem parar o scanner.
+    Em WAL (o modo do banco.py), uma transação de leitura fica aberta durante a cópia:
+    todos os passos leem o mesmo instante do banco, enquanto as escritas seguem no WAL.
+    Em outros modos, cada passo trava o banco só pelo tempo de copiar `pages` páginas.
+    """
+    source = sqlite3.connect(source_path, timeout=30)
+    dest = sqlite3.connect(dest_path)
+    try:
+        hold_snapshot = source.execute("PRAGMA journal_mode").fetchone()[0].lower() == 'wal'
+        if hold_snapshot:
+            source.execute("BEGIN")
+            source.execute("SELECT COUNT(*) FROM sqlite_master").fetchone()
+        source.backup(dest, pages=pages, sleep=sleep)
+        if hold_snapshot:
+            source.rollback()
+        # O snapshot é um arquivo único, que abre sem -wal/-shm
+        dest.execute("PRAGMA journal_mode=DELETE")
+        check = dest.execute("PRAGMA quick_check").fetchone()[0]
+        if check != 'ok':
+            raise sqlite3.DatabaseError(f"snapshot inconsistente ({check})")
+    finally:
+        dest.close()
+        source.close()
+
+
+def snapshot_databases(root_dir, snapshot_dir):
+    """
+    Estágio de snapshot: gera uma cópia consistente de cada banco SQLite do projeto.
+    Retorna {caminho_original: caminho_do_snapshot}.
+    """
+    snapshots = {}
+    for root, dirs, files in os.walk(root_dir):
+        dirs[:] = [d for d in dirs if d not in EXCLUDE_LIST]
+        for file in files:
+            full_path = os.path.join(root, file)
+            if file in EXCLUDE_LIST or not is_sqlite_file(full_path):
+                continue
+            dest_path = os.path.join(snapshot_dir, f"{len(snapshots)}_{file}")
+            print(f"Gerando snapshot do banco '{os.path.relpath(full_path, root_dir)}'...")
+            snapshot_sqlite(full_path, dest_path)
+            snapshots[full_path] = dest_path
+    return snapshots
+
+
+def iter_project_files(root_dir, snapshots, skip_dirs=()):
+    """
+    Arquivos que entram no backup, como (arquivo_no_disco, caminho_no_backup).
+    Os bancos em `snapshots` ({original: snapshot}) são lidos do snapshot, no mesmo caminho do original.
+    """
+    skip_dirs = {os.path.abspath(d) for d in skip_dirs}
+    for root, dirs, files in os.walk(root_dir):
+        # Modifica 'dirs' no local para excluir pastas
+        dirs[:] = [d for d in dirs if d not in EXCLUDE_LIST and os.path.abspath(os.path.join(root, d)) not in skip_dirs]
+        
+        # Cria o caminho relativo dentro do backup
+        relative_path_start = len(root_dir) + len(os.sep) 
+
+        for file in files:
+            # Ignora arquivos de credenciais ou o próprio script
+            if file in EXCLUDE_LIST:
+                continue
+            # Arquivos auxiliares do SQLite não vão: o snapshot do banco já os incorpora
+            if file.endswith(SQLITE_TEMP_SUFFIXES) and os.path.join(root, file[:file.rindex('-')]) in snapshots:
+                continue
+
+            full_path = os.path.join(root, file)
+            arcname = full_path[relative_path_start:]
+
+            # Ignora se o arquivo for o próprio script backup.py
+            if "backup.py" in arcname:
+                continue
+
+            yield snapshots.get(full_path, full_path), arcname
+
+
+def create_zip_backup(root_dir, output_path, snapshots=None):
     """Compacta todo o conteúdo do diretório raiz do projeto."""
     print(f"Criando arquivo ZIP de backup em: {output_path}...")
-    
-    # Lista de arquivos/pastas para ignorar no backup
-    EXCLUDE_LIST = [
-        '__pycache__', 
-        '.git', 
-        BACKUP_FILENAME, # Evita incluir o próprio backup no backup
-        'token.json', # Não precisa de backup da credencial de acesso
-        'credentials.json',
-        'meu_banco.db' 
-    ]
 
     try:
         with zipfile.ZipFile(output_path, 'w', zipfile.ZIP_DEFLATED) as zipf:
-            for root, dirs, files in os.walk(root_dir):
-                # Modifica 'dirs' no local para excluir pastas
-                dirs[:] = [d for d in dirs if d not in EXCLUDE_LIST]
-                
-                # Cria o caminho relativo dentro do ZIP
-                relative_path_start = len(root_dir) + len(os.sep) 
-
-                for file in files:
-                    # Ignora arquivos de credenciais ou o próprio script
-                    if file in EXCLUDE_LIST:
-                        continue
-
-                    full_path = os.path.join(root, file)
-                    arcname = full_path[relative_path_start:]
-
-                    # Ignora se o arquivo for o próprio script backup.py
-                    if "backup.py" in arcname:
-                        continue
-
-                    zipf.write(full_path, arcname)
+            for path, arcname in iter_project_files(root_dir, snapshots or {}):
+                zipf.write(path, arcname)
         print("✅ Backup ZIP criado com sucesso!")
         return True
     except Exception as e:
@@ -142,6 +223,25 @@ def create_zip_backup(root_dir, output_path):
         return False
 
 
+def create_incremental_backup(root_dir, repo_dir, snapshots=None):
+    """
+    Backup incremental: só os blocos novos ou alterados vão para o repositório local
+    (ver backup_incremental.py, que também lista e restaura os snapshots).
+    """
+    print(f"Gravando backup incremental em: {repo_dir}...")
+    snapshots = snapshots or {}
+    files = [(arcname, path) for path, arcname in iter_project_files(root_dir, snapshots, skip_dirs=[repo_dir])]
+    # Os snapshots dos bancos são recriados a cada execução: o mtime não diz nada sobre o conteúdo
+    snapshot_paths = set(snapshots.values())
+    always_hash = {arcname.replace(os.sep, '/') for arcname, path in files if path in snapshot_paths}
+    try:
+        backup_incremental.create_snapshot(repo_dir, files, always_hash)
+        return True
+    except (OSError, ValueError) as e:
+        print(f"❌ Erro ao gravar o backup incremental: {e}")
+        return False
+
+
 def upload_to_drive(service, file_path, folder_id=''):
     """Faz o upload do arquivo para o Google Drive."""
     file_metadata = {
@@ -197,10 +297,24 @@ def run_backup():
     if args.drive_folder:
         DRIVE_FOLDER_ID = args.drive_folder
 
-    # 1. Compactar o Projeto
-    if not create_zip_backup(PROJECT_ROOT, BACKUP_PATH):
-        print("\nProcesso de backup falhou na criação do ZIP.")
-        return
+    # 1. Snapshot dos bancos SQLite e compactação do Projeto
+    with tempfile.TemporaryDirectory(prefix='hosts_snapshot_') as snapshot_dir:
+        try:
+            snapshots = snapshot_databases(PROJECT_ROOT, snapshot_dir)
+        except (sqlite3.Error, OSError) as e:
+            print(f"❌ Erro ao gerar o snapshot do banco de dados: {e}")
+            print("\nProcesso de backup falhou no snapshot do banco.")
+            return
+        # Modo incremental: termina aqui, com o snapshot no repositório local
+        if args.incremental:
+            if create_incremental_backup(PROJECT_ROOT, args.repo, snapshots):
+                print("\nProcesso de backup finalizado.")
+            else:
+                print("\nProcesso de backup falhou no backup incremental.")
+            return
+        if not create_zip_backup(PROJECT_ROOT, BACKUP_PATH, snapshots):
+            print("\nProcesso de backup falhou na criação do ZIP.")
+            return
 
     # 2. Autenticar com o Google Drive
     drive_service = authenticate_google_drive()
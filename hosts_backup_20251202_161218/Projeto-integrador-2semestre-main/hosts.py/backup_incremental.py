@@ -0,0 +1,202 @@
+import argparse
+import datetime
+import hashlib
+import json
+import os
+import sys
+import time
+import zlib
+
+# --- CONFIGURAÇÕES ---
+# Repositório local dos backups incrementais (fora do projeto, para não entrar no próprio backup)
+DEFAULT_REPO = os.environ.get('HOSTS_BACKUP_REPO') or os.path.join(os.path.expanduser('~'), 'hosts_backup_repo')
+# Blocos de tamanho fixo: o SQLite altera o banco página a página, no lugar,
+# então só os blocos com páginas alteradas mudam de uma noite para a outra
+CHUNK_SIZE = 1024 * 1024
+COMPRESSION_LEVEL = 6
+MANIFEST_FORMAT = 1
+
+# =======================================================
+#   BACKUP INCREMENTAL ENDEREÇADO POR CONTEÚDO
+#   repo/chunks/ab/abcd...    bloco comprimido (zlib), com o nome = SHA-256 do conteúdo
+#   repo/snapshots/<id>.json  manifesto: caminho -> tamanho, mtime, SHA-256 e lista de blocos
+#   Um bloco é gravado uma única vez, não importa quantos arquivos ou snapshots o usem.
+#   Arquivos com o mesmo tamanho e mtime do snapshot anterior nem são lidos.
+#
+#   Uso (o backup é feito pelo Backup.py --incremental):
+#     python backup_incremental.py list
+#     python backup_incremental.py restore <id|latest> <pasta_destino>
+# =======================================================
+
+
+def _chunk_path(repo_dir, digest):
+    return os.path.join(repo_dir, 'chunks', digest[:2], digest)
+
+
+def _write_atomic(path, data):
+    """Grava em um arquivo temporário e renomeia: um backup interrompido nunca deixa arquivo pela metade."""
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    tmp_path = f"{path}.{os.getpid()}.tmp"
+    with open(tmp_path, 'wb') as f:
+        f.write(data)
+        f.flush()
+        os.fsync(f.fileno())
+    os.replace(tmp_path, path)
+
+
+def list_snapshots(repo_dir):
+    """IDs dos snapshots do repositório, do mais antigo para o mais novo."""
+    snapshots_dir = os.path.join(repo_dir, 'snapshots')
+    if not os.path.isdir(snapshots_dir):
+        return []
+    ids = [name[:-len('.json')] for name in os.listdir(snapshots_dir) if name.endswith('.json')]
+    # Dois snapshots no mesmo segundo ganham sufixo (-1, -2...): ordena o sufixo como número
+    return sorted(ids, key=lambda snapshot_id: (snapshot_id.split('-')[0], int(snapshot_id.partition('-')[2] or 0)))
+
+
+def load_manifest(repo_dir, snapshot_id='latest'):
+    """Manifesto de um snapshot ('latest' = o mais novo); None se o repositório estiver vazio."""
+    if snapshot_id == 'latest':
+        snapshots = list_snapshots(repo_dir)
+        if not snapshots:
+            return None
+        snapshot_id = snapshots[-1]
+    with open(os.path.join(repo_dir, 'snapshots', f"{snapshot_id}.json"), encoding='utf-8') as f:
+        return json.load(f)
+
+
+def _store_file(repo_dir, path, stats):
+    """Lê o arquivo em blocos e grava os blocos que o repositório ainda não tem. Retorna (sha256, blocos)."""
+    file_hash = hashlib.sha256()
+    chunks = []
+    with open(path, 'rb') as f:
+        while True:
+            data = f.read(CHUNK_SIZE)
+            if not data:
+                break
+            file_hash.update(data)
+            digest = hashlib.sha256(data).hexdigest()
+            chunks.append(digest)
+            chunk_path = _chunk_path(repo_dir, digest)
+            if os.path.exists(chunk_path):
+                stats['reused_chunks'] += 1
+                continue
+            compressed = zlib.compress(data, COMPRESSION_LEVEL)
+            _write_atomic(chunk_path, compressed)
+            stats['new_chunks'] += 1
+            stats['new_bytes'] += len(compressed)
+    return file_hash.hexdigest(), chunks
+
+
+def create_snapshot(repo_dir, files, always_hash=()):
+    """
+    Grava um novo snapshot. `files` = [(caminho_no_backup, arquivo_no_disco)];
+    os caminhos em `always_hash` (ex: snapshots de banco, recriados a cada execução)
+    são sempre lidos, sem o atalho de tamanho/mtime. Retorna o ID do snapshot.
+    """
+    started = time.time()
+    started_ns = time.time_ns()
+    previous = load_manifest(repo_dir) or {'files': {}, 'started_ns': 0}
+    stats = {'files': 0, 'unchanged': 0, 'new_chunks': 0, 'reused_chunks': 0, 'new_bytes': 0}
+    entries = {}
+
+    for arcname, path in files:
+        arcname = arcname.replace(os.sep, '/')
+        st = os.stat(path)
+        stats['files'] += 1
+        old = previous['files'].get(arcname)
+        # Atalho: mesmo tamanho e mtime = mesmo conteúdo. Só vale se o mtime é anterior ao início
+        # do snapshot anterior; senão o arquivo pode ter mudado de novo no mesmo instante.
+        if (old and arcname not in always_hash and old['size'] == st.st_size
+                and old['mtime_ns'] == st.st_mtime_ns and st.st_mtime_ns < previous['started_ns']):
+            entries[arcname] = old
+            stats['unchanged'] += 1
+            continue
+        sha256, chunks = _store_file(repo_dir, path, stats)
+        entries[arcname] = {'size': st.st_size, 'mtime_ns': st.st_mtime_ns, 'mode': st.st_mode & 0o777,
+                            'sha256': sha256, 'chunks': chunks}
+
+    base_id = snapshot_id = datetime.datetime.now().strftime('%Y%m%d_%H%M%S')
+    existing = set(list_snapshots(repo_dir))
+    suffix = 1
+    while snapshot_id in existing:
+        snapshot_id = f"{base_id}-{suffix}"
+        suffix += 1
+
+    manifest = {'format': MANIFEST_FORMAT, 'id': snapshot_id, 'started_ns': started_ns, 'files': entries}
+    # O manifesto é gravado por último: só existe snapshot com todos os blocos já no repositório
+    _write_atomic(os.path.join(repo_dir, 'snapshots', f"{snapshot_id}.json"),
+                  json.dumps(manifest, indent=1, sort_keys=True).encode('utf-8'))
+
+    print(f"✅ Snapshot '{snapshot_id}' gravado em {repo_dir} ({time.time() - started:.1f}s): "
+          f"{stats['files']} arquivos, {stats['unchanged']} sem alteração, "
+          f"{stats['new_chunks']} blocos novos ({stats['new_bytes'] / 1024 / 1024:.2f} MB), "
+          f"{stats['reused_chunks']} blocos reaproveitados.")
+    return snapshot_id
+
+
+def _target_path(target_dir, arcname):
+    """Caminho de destino de um arquivo do snapshot, sem deixar escapar da pasta de destino."""
+    target_root = os.path.abspath(target_dir)
+    path = os.path.abspath(os.path.join(target_root, *arcname.split('/')))
+    if os.path.commonpath([target_root, path]) != target_root:
+        raise ValueError(f"caminho inválido no manifesto: {arcname}")
+    return path
+
+
+def restore_snapshot(repo_dir, snapshot_id, target_dir):
+    """Recria em `target_dir` todos os arquivos do snapshot, conferindo o SHA-256 de cada um."""
+    manifest = load_manifest(repo_dir, snapshot_id)
+    if manifest is None:
+        raise FileNotFoundError(f"nenhum snapshot em {repo_dir}")
+    print(f"Restaurando o snapshot '{manifest['id']}' em {target_dir}...")
+
+    for arcname, entry in sorted(manifest['files'].items()):
+        path = _target_path(target_dir, arcname)
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        tmp_path = f"{path}.{os.getpid()}.tmp"
+        file_hash = hashlib.sha256()
+        with open(tmp_path, 'wb') as out:
+            for digest in entry['chunks']:
+                with open(_chunk_path(repo_dir, digest), 'rb') as f:
+                    chunk = zlib.decompress(f.read())
+                file_hash.update(chunk)
+                out.write(chunk)
+        if file_hash.hexdigest() != entry['sha256']:
+            os.remove(tmp_path)
+            raise ValueError(f"conteúdo corrompido no repositório: {arcname}")
+        os.replace(tmp_path, path)
+        os.chmod(path, entry['mode'])
+        os.utime(path, ns=(entry['mtime_ns'], entry['mtime_ns']))
+
+    print(f"✅ {len(manifest['files'])} arquivos restaurados.")
+
+
+def parse_args():
+    parser = argparse.ArgumentParser(description='Lista e restaura os backups incrementais do projeto')
+    parser.add_argument('--repo', '-r', default=DEFAULT_REPO, help='Pasta do repositório de backups')
+    commands = parser.add_subparsers(dest='command', required=True)
+    commands.add_parser('list', help='Lista os snapshots')
+    restore = commands.add_parser('restore', help='Restaura um snapshot')
+    restore.add_argument('snapshot', help="ID do snapshot (ou 'latest')")
+    restore.add_argument('target', help='Pasta de destino')
+    return parser.parse_args()
+
+
+def main():
+    args = parse_args()
+    try:
+        if args.command == 'list':
+            for snapshot_id in list_snapshots(args.repo):
+                manifest = load_manifest(args.repo, snapshot_id)
+                total = sum(entry['size'] for entry in manifest['files'].values())
+                print(f"{snapshot_id}  {len(manifest['files'])} arquivos  {total / 1024 / 1024:.2f} MB")
+        else:
+            restore_snapshot(args.repo, args.snapshot, args.target)
+    except (OSError, ValueError, zlib.error) as e:
+        print(f"❌ Erro: {e}")
+        sys.exit(1)
+
+
+if __name__ == '__main__':
+    main()
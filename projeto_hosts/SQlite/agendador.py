@@ -0,0 +1,139 @@
+import time
+
+from sondagem import varrer_hosts, SondaTCP, portas_para_tipo
+from latencia import registrar_amostras
+
+# --- Configurações ---
+INTERVALO_MINIMO = 10      # Segundos: hosts que acabaram de mudar ou estão oscilando
+INTERVALO_MAXIMO = 600     # Segundos: teto para hosts estáveis há muito tempo
+FATOR_RECUO = 2            # Cada verificação sem mudança multiplica o intervalo
+JANELA_OSCILACAO = 900     # Segundos em que as mudanças recentes são contadas
+LIMITE_OSCILACAO = 3       # Mudanças dentro da janela para considerar o host "oscilando"
+# ---------------------
+
+METODO_ICMP = 'icmp'
+METODO_TCP = 'tcp'
+
+
+def em_manutencao(condicao):
+    return bool(condicao) and 'manuten' in condicao.lower()
+
+
+def proximo_intervalo(intervalo, ultima_mudanca, mudancas_recentes, mudou, agora):
+    """
+    Calcula o novo intervalo de um ativo depois de uma verificação.
+    Retorna (intervalo, ultima_mudanca, mudancas_recentes).
+    """
+    dentro_da_janela = ultima_mudanca is not None and agora - ultima_mudanca <= JANELA_OSCILACAO
+
+    if mudou:
+        mudancas_recentes = (mudancas_recentes if dentro_da_janela else 0) + 1
+        return INTERVALO_MINIMO, agora, mudancas_recentes
+
+    if not dentro_da_janela:
+        mudancas_recentes = 0
+    if mudancas_recentes >= LIMITE_OSCILACAO:
+        # Host oscilando: continua sendo verificado rápido até estabilizar
+        return INTERVALO_MINIMO, ultima_mudanca, mudancas_recentes
+
+    intervalo = min(INTERVALO_MAXIMO, max(INTERVALO_MINIMO, (intervalo or INTERVALO_MINIMO) * FATOR_RECUO))
+    return intervalo, ultima_mudanca, mudancas_recentes
+
+
+def ativos_pendentes(conexao, agora):
+    """Ativos com IP cuja verificação já venceu (ou que nunca foram verificados)."""
+    linhas = conexao.execute('''
+        SELECT a.id, a.nome, a.ip_address, a.status, a.condicao,
+               g.intervalo, g.ultima_mudanca, g.mudancas_recentes, a.tipo, g.metodo
+        FROM ativos_online a
+        LEFT JOIN agenda_sondagem g ON g.ativo_id = a.id
+        WHERE a.ip_address IS NOT NULL AND a.ip_address != ''
+          AND (g.proxima_verificacao IS NULL OR g.proxima_verificacao <= ?)
+    ''', (agora,)).fetchall()
+    return [linha for linha in linhas if not em_manutencao(linha[4])]
+
+
+def segundos_ate_proxima(conexao, agora=None, espera_maxima=30):
+    """Quanto tempo dormir até o próximo ativo vencer (no máximo `espera_maxima`, para pegar ativos novos)."""
+    agora = int(agora if agora is not None else time.time())
+    proxima = conexao.execute("SELECT MIN(proxima_verificacao) FROM agenda_sondagem").fetchone()[0]
+    if proxima is None:
+        return espera_maxima
+    return max(1, min(espera_maxima, proxima - agora))
+
+
+def sondar_por_metodo(ativos, sonda=None, timeout=1, janela=1024):
+    """
+    Sonda cada ativo primeiro pelo método que funcionou da última vez
+    (ICMP se nunca respondeu) e tenta o outro método em quem não respondeu.
+    Retorna {ip: (rtt ou None, metodo_que_respondeu ou None)}.
+    """
+    portas_por_ip = {ativo[2]: portas_para_tipo(ativo[8]) for ativo in ativos}
+    sondas = {METODO_ICMP: sonda, METODO_TCP: SondaTCP(portas_por_ip)}
+    resultado = {}
+    for metodo, outro in ((METODO_ICMP, METODO_TCP), (METODO_TCP, METODO_ICMP)):
+        ips = {ativo[2] for ativo in ativos if (ativo[9] or METODO_ICMP) == metodo}
+        for tentativa in (metodo, outro):
+            ips -= {ip for ip, (rtt, _) in resultado.items() if rtt is not None}
+            if not ips:
+                break
+            for ip, rtt in varrer_hosts(ips, sonda=sondas[tentativa], timeout=timeout, janela=janela).items():
+                resultado[ip] = (rtt, tentativa if rtt is not None else None)
+    return resultado
+
+
+def verificar_pendentes(conexao, ao_mudar=None, sonda=None, timeout=1, janela=1024, agora=None, presentes=()):
+    """
+    Sonda só os ativos vencidos, atualiza o status de quem mudou e reagenda todos.
+    Cada ativo é sondado pelo método (ICMP ou TCP) que respondeu por último,
+    e o RTT de cada sondagem vai para a série de latência (latencia.py).
+    Vencidos com o IP em `presentes` (presença passiva, presenca.py) contam como
+    Online sem receber pacote nenhum (e sem amostra de latência).
+    `ao_mudar(ativo, status_novo)` é chamado para cada mudança (ex: registrar alerta).
+    Retorna (quantidade_verificada, quantidade_que_mudou).
+    """
+    agora = int(agora if agora is not None else time.time())
+    pendentes = ativos_pendentes(conexao, agora)
+    if not pendentes:
+        return 0, 0
+
+    a_sondar = [ativo for ativo in pendentes if ativo[2] not in presentes]
+    respostas = sondar_por_metodo(a_sondar, sonda=sonda, timeout=timeout, janela=janela) if a_sondar else {}
+
+    mudancas = []
+    agenda = []
+    amostras = []
+    for ativo in pendentes:
+        id_ativo, _, ip, status_antigo, _, intervalo, ultima_mudanca, mudancas_recentes, _, metodo = ativo
+        if ip in presentes:
+            status_novo, metodo_atual = "Online", None
+        else:
+            rtt, metodo_atual = respostas.get(ip, (None, None))
+            status_novo = "Online" if rtt is not None else "Offline"
+            amostras.append((id_ativo, rtt))
+        mudou = status_novo != status_antigo
+
+        intervalo, ultima_mudanca, mudancas_recentes = proximo_intervalo(
+            intervalo, ultima_mudanca, mudancas_recentes or 0, mudou, agora)
+        # Offline (ou visto só pela presença passiva): guarda o último método que funcionou
+        agenda.append((id_ativo, agora + intervalo, intervalo, ultima_mudanca, mudancas_recentes, metodo_atual or metodo))
+        if mudou:
+            mudancas.append((ativo, status_novo))
+
+    with conexao:
+        conexao.executemany("UPDATE ativos_online SET status = ? WHERE id = ?",
+                            [(status_novo, ativo[0]) for ativo, status_novo in mudancas])
+        conexao.executemany('''
+            INSERT OR REPLACE INTO agenda_sondagem
+                (ativo_id, proxima_verificacao, intervalo, ultima_mudanca, mudancas_recentes, metodo)
+            VALUES (?, ?, ?, ?, ?, ?)
+        ''', agenda)
+        registrar_amostras(conexao, amostras, agora)
+        # Ativos excluídos do inventário não ficam na agenda
+        conexao.execute("DELETE FROM agenda_sondagem WHERE ativo_id NOT IN (SELECT id FROM ativos_online)")
+
+    if ao_mudar:
+        for ativo, status_novo in mudancas:
+            ao_mudar(ativo, status_novo)
+
+    return len(pendentes), len(mudancas)
@@ -0,0 +1,84 @@
+import datetime
+import time
+
+from configuracao import RETENCAO_ALERTAS_DIAS, MAX_ALERTAS
+
+# --- Configurações ---
+LIMITE_PADRAO = 100        # Alertas por página quando ?limit= não é informado
+LIMITE_MAXIMO = 1000       # Teto do ?limit=
+LOTE_EXCLUSAO = 5000       # Alertas apagados por transação na poda
+# ---------------------
+
+
+# =======================================================
+#   LOG DE ALERTAS
+#   ts (epoch) e ativo_id são indexados (migração 004); a listagem é
+#   paginada por id (?before_id=), então cada página custa o mesmo
+#   não importa o tamanho da tabela.
+# =======================================================
+
+def registrar(conexao, tipo, mensagem, ativo_id=None, agora=None):
+    """Grava um alerta. Quem chama faz o commit."""
+    agora = agora if agora is not None else time.time()
+    conexao.execute(
+        "INSERT INTO alertas (data_hora, ts, tipo_alerta, mensagem, ativo_id) VALUES (?, ?, ?, ?, ?)",
+        (datetime.datetime.fromtimestamp(agora).isoformat(), int(agora), tipo, mensagem, ativo_id))
+
+
+def mensagem_mudanca_status(nome, ip, status_novo):
+    """(tipo_alerta, mensagem) do alerta de mudança de status, igual no monitor e na API."""
+    if status_novo == "Offline":
+        return "Status: Offline", f"O ativo '{nome}' (IP: {ip}) ficou OFFLINE."
+    return "Status: Online", f"O ativo '{nome}' (IP: {ip}) voltou a ficar ONLINE."
+
+
+def listar(conexao, before_id=None, limite=LIMITE_PADRAO, tipo=None, ativo_id=None, inicio=None, fim=None):
+    """
+    Uma página de alertas, do mais novo para o mais antigo.
+    `before_id` = id do último alerta da página anterior; filtros opcionais
+    por tipo_alerta, ativo e janela [inicio, fim] (epoch).
+    Retorna (alertas, before_id da próxima página ou None).
+    """
+    limite = max(1, min(int(limite), LIMITE_MAXIMO))
+    condicoes, parametros = [], []
+    for condicao, valor in (("id < ?", before_id), ("tipo_alerta = ?", tipo), ("ativo_id = ?", ativo_id),
+                            ("ts >= ?", inicio), ("ts <= ?", fim)):
+        if valor is not None:
+            condicoes.append(condicao)
+            parametros.append(valor)
+    onde = f"WHERE {' AND '.join(condicoes)}" if condicoes else ""
+    cursor = conexao.execute(
+        f"SELECT id, data_hora, ts, tipo_alerta, mensagem, ativo_id FROM alertas {onde} ORDER BY id DESC LIMIT ?",
+        (*parametros, limite))
+    colunas = [coluna[0] for coluna in cursor.description]
+    alertas = [dict(zip(colunas, linha)) for linha in cursor]
+    proximo = alertas[-1]['id'] if len(alertas) == limite else None
+    return alertas, proximo
+
+
+def _apagar_em_lotes(conexao, consulta_ids, parametros):
+    apagados = 0
+    while True:
+        with conexao:
+            removidos = conexao.execute(
+                f"DELETE FROM alertas WHERE id IN ({consulta_ids} LIMIT {LOTE_EXCLUSAO})", parametros).rowcount
+        apagados += removidos
+        if removidos < LOTE_EXCLUSAO:
+            return apagados
+
+
+def podar(conexao, dias=RETENCAO_ALERTAS_DIAS, max_linhas=MAX_ALERTAS, agora=None):
+    """
+    Retenção: apaga alertas com mais de `dias` e, se ainda passar de
+    `max_linhas`, os mais antigos. Apaga em lotes, com um commit por lote
+    (não segura a trava de escrita por muito tempo). Retorna quantos apagou.
+    """
+    agora = int(agora if agora is not None else time.time())
+    apagados = 0
+    if dias:
+        apagados += _apagar_em_lotes(conexao, "SELECT id FROM alertas WHERE ts < ?", (agora - dias * 86400,))
+    if max_linhas:
+        corte = conexao.execute("SELECT id FROM alertas ORDER BY id DESC LIMIT 1 OFFSET ?", (max_linhas,)).fetchone()
+        if corte:
+            apagados += _apagar_em_lotes(conexao, "SELECT id FROM alertas WHERE id <= ?", (corte[0],))
+    return apagados
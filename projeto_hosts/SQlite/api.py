@@ -1,8 +1,6 @@
 # --- Importações Essenciais ---
-import sqlite3
 import datetime
 import os
-import subprocess
 import time
 import threading
 from flask import Flask, request, jsonify, send_from_directory
@@ -10,15 +8,42 @@ from flask_cors import CORS
 
 # --- Importações Específicas para o Scan ---
 import nmap
-from getmac import get_mac_address
-
-# --- CONFIGURAÇÃO DA REDE ALVO ---
-TARGET_NETWORK = '192.168.15.0/24'
+from enriquecimento import enriquecer_host
+from inventario import ComparadorInventario, marcar_offline_exceto, marcar_online, atualizar_macs, ips_cadastrados
+from nmap_stream import gravar_hosts_em_lotes, iterar_hosts_nmap
+from particionamento import varrer_particionado, ips_em_shards
+from presenca import coletar_vizinhos, ips_nas_redes
+from sondagem import varrer_hosts, SondaTCP, portas_para_tipo
+from resolucao import resolver_nomes
+from discovery import discover_and_add_assets
+
+# --- Acesso ao Banco (pool de conexões compartilhado) ---
+from banco import conectar
+
+# --- Tarefas em Segundo Plano (Scans) ---
+import tarefas
+from coordenador import CoordenadorScan, PERFIL_COMPLETO, PERFIL_STATUS, PERFIL_AGENDADO
+from classificador import reclassificar_inventario
+import latencia
+import historico
+import migracoes
+import alertas
+from sessoes import tempo_de_uso
+import busca
+import estatisticas
+import manutencao
+import agendador
+
+# --- CONFIGURAÇÃO DAS REDES ALVO (ver configuracao.py / HOSTS_REDES) ---
+from configuracao import TARGET_NETWORKS, TAMANHO_SHARD, MAX_PROCESSOS_SCAN, PRESENCA_PASSIVA, LEASES_DHCP
+REDES_ALVO = ' '.join(TARGET_NETWORKS)
+# Grava os hosts no banco conforme o nmap os reporta (em vez de esperar o scan inteiro)
+SCAN_STREAMING = True
 
 # --- Caminhos Importantes ---
 PASTA_RAIZ_PROJETO = os.path.abspath(os.path.join(os.path.dirname(__file__), '..'))
 PASTA_SQLITE = os.path.dirname(__file__)
-DB_FILE = os.path.join(PASTA_SQLITE, 'meu_banco.db') 
+# O arquivo do banco e as conexões ficam em banco.py (DB_FILE / HOSTS_BANCO)
 
 # --- Configuração do Aplicativo Flask ---
 app = Flask(__name__, static_folder=PASTA_RAIZ_PROJETO)
@@ -55,31 +80,31 @@ def serve_static_files(filename):
 #   FUNÇÕES DE BANCO DE DADOS
 # =======================================================
 
-def conectar():
-    conexao = sqlite3.connect(DB_FILE)
-    conexao.row_factory = sqlite3.Row 
-    return conexao
+# conectar() vem de banco.py: conexões do pool, em WAL e com busy_timeout
 
-def registrar_alerta(tipo, mensagem):
+def registrar_alerta(tipo, mensagem, ativo_id=None):
     try:
-        data_agora = datetime.datetime.now().isoformat()
         conexao = conectar()
-        conexao.execute("INSERT INTO alertas (data_hora, tipo_alerta, mensagem) VALUES (?, ?, ?)", (data_agora, tipo, mensagem))
+        alertas.registrar(conexao, tipo, mensagem, ativo_id)
         conexao.commit()
         conexao.close()
     except: pass
 
+def preencher_migracoes(progresso=None):
+    conexao = conectar(row_factory=None)
+    try:
+        return {'linhas': migracoes.preencher_pendentes(conexao, progresso)}
+    finally:
+        conexao.close()
+
 def criar_tabelas_iniciais():
+    # Esquema versionado (pasta migracoes/): os passos pendentes rodam aqui, em uma transação;
+    # a conversão de dados antigos segue em segundo plano, em lotes
     try:
-        conexao = conectar()
-        conexao.execute('''CREATE TABLE IF NOT EXISTS usuarios (id INTEGER PRIMARY KEY AUTOINCREMENT, nome TEXT, email TEXT, senha TEXT)''')
-        conexao.execute('''CREATE TABLE IF NOT EXISTS ativos_online (id INTEGER PRIMARY KEY AUTOINCREMENT, nome TEXT, ip_address TEXT, mac_address TEXT, status TEXT, condicao TEXT, data_inicio TEXT, tipo TEXT)''')
-        conexao.execute('''CREATE TABLE IF NOT EXISTS alertas (id INTEGER PRIMARY KEY AUTOINCREMENT, data_hora TEXT, tipo_alerta TEXT, mensagem TEXT)''')
-        try:
-            conexao.execute("ALTER TABLE ativos_online ADD COLUMN tipo TEXT")
-        except sqlite3.OperationalError: pass 
-        conexao.commit()
-        print("Tabelas verificadas.")
+        aplicadas = migracoes.migrar(preencher=False)
+        print(f"Tabelas verificadas (esquema na versão {migracoes.listar_migracoes()[-1][0]}).")
+        if aplicadas:
+            tarefas.submeter('migracao', preencher_migracoes)
     except Exception as e:
         print(f"Erro tabelas: {e}")
 
@@ -88,31 +113,15 @@ def criar_tabelas_iniciais():
 #   MÓDULO DE SCAN DE REDE
 # =======================================================
 
-def netbios_lookup(ip_address):
-    try:
-        if os.name == 'nt':
-            cmd = ['nbtstat', '-A', ip_address]
-            res = subprocess.run(cmd, capture_output=True, text=True, timeout=1)
-            for line in res.stdout.splitlines():
-                if '<20>' in line and 'UNIQUE' in line: return line.split()[0].strip()
-    except: pass 
-    return None
-
-def classificar_tipo_inteligente(nome, vendor):
-    texto = (str(nome) + " " + str(vendor)).lower()
-    if any(x in texto for x in ['iphone', 'android', 'galaxy', 'samsung', 'xiaomi', 'motorola']): return "Smartphone"
-    if any(x in texto for x in ['notebook', 'laptop', 'thinkpad', 'latitude', 'inspiron']): return "Notebook"
-    if any(x in texto for x in ['desktop', 'pc', 'computador', 'windows', 'linux', 'optiplex']): return "Computador"
-    if any(x in texto for x in ['epson', 'hp', 'canon', 'brother']): return "Impressora"
-    if any(x in texto for x in ['router', 'switch', 'cisco', 'tp-link', 'ubiquiti']): return "Rede"
-    return "Outros Dispositivos"
-
 # --- SCAN COMPLETO (Botão Atualizar Inventário) ---
-def executar_scan_completo():
-    print(f"\n📡 [MANUAL] SCAN NA REDE: {TARGET_NETWORK}")
+def executar_scan_completo(progresso=None):
+    if SCAN_STREAMING: return executar_scan_completo_streaming(progresso)
+
+    print(f"\n📡 [MANUAL] SCAN NA REDE: {REDES_ALVO}")
+    if progresso: progresso(fase='varrendo')
     nm = nmap.PortScanner()
     try:
-        nm.scan(hosts=TARGET_NETWORK, arguments='-sn -PR -T5 --min-hostgroup 100')
+        nm.scan(hosts=REDES_ALVO, arguments='-sn -PR -T5 --min-hostgroup 100')
     except Exception as e:
         print(f"Erro Nmap: {e}")
         return False
@@ -121,78 +130,209 @@ def executar_scan_completo():
     if not live_hosts: return True 
 
     print(f"✅ {len(live_hosts)} dispositivos encontrados.")
+    if progresso: progresso(fase='processando', hosts_encontrados=len(live_hosts))
     
     conexao = conectar()
-    data_hoje = datetime.datetime.now().strftime('%d/%m/%Y %H:%M:%S')
+    data_hoje = datetime.datetime.now().isoformat(timespec='seconds')
     ids_encontrados_ip = []
+    comparador = ComparadorInventario(conexao)
+    resultados = []
+    # NetBIOS/MAC de todos os hosts em paralelo, com cache por MAC/IP
+    resolvidos = resolver_nomes(conexao, [(ip, nm[ip]['addresses'].get('mac')) for ip in live_hosts])
 
-    for ip in live_hosts:
+    for i, ip in enumerate(live_hosts):
         ids_encontrados_ip.append(ip)
+        if progresso: progresso(hosts_processados=i)
         
-        mac = 'N/A'
-        if 'mac' in nm[ip]['addresses']: mac = nm[ip]['addresses']['mac'].upper()
-        else:
-            try:
-                m = get_mac_address(ip=ip)
-                if m: mac = m.upper()
-            except: pass
+        mac = nm[ip]['addresses'].get('mac')
 
         vendor = ""
         try:
             if 'vendor' in nm[ip] and nm[ip]['vendor']:
-                vendor = list(nm[ip]['vendor'].values())[0].split(' ')[0]
+                vendor = list(nm[ip]['vendor'].values())[0]
         except: pass
 
-        nome_final = ""
-        if 'hostnames' in nm[ip] and nm[ip]['hostnames']: nome_final = nm[ip]['hostnames'][0]['name']
-        if not nome_final: nome_final = netbios_lookup(ip)
-        if not nome_final:
-            nome_base = f"Dispositivo-{ip.split('.')[-1]}"
-            nome_final = f"{nome_base} ({vendor})" if vendor else nome_base
-
-        tipo_final = classificar_tipo_inteligente(nome_final, vendor)
-
-        cursor = conexao.execute("SELECT id FROM ativos_online WHERE ip_address = ? OR (mac_address = ? AND mac_address != 'N/A')", (ip, mac))
-        existe = cursor.fetchone()
+        hostnames = [h['name'] for h in nm[ip].get('hostnames', []) if h.get('name')]
+        nome_final, mac, tipo_final = enriquecer_host(ip, mac, vendor, hostnames, resolvidos[ip])
+        resultados.append((ip, mac, nome_final, tipo_final))
 
-        if existe:
-            conexao.execute("UPDATE ativos_online SET status='Online', nome=?, tipo=?, data_inicio=? WHERE id=?", (nome_final, tipo_final, data_hoje, existe['id']))
-        else:
-            conexao.execute("INSERT INTO ativos_online (nome, ip_address, mac_address, status, condicao, tipo, data_inicio) VALUES (?, ?, ?, 'Online', 'Monitorado', ?, ?)", (nome_final, ip, mac, tipo_final, data_hoje))
+    if progresso: progresso(fase='gravando', hosts_processados=len(ids_encontrados_ip))
+    # Uma transação só, escrevendo apenas o que mudou
+    with conexao:
+        comparador.aplicar(resultados, data_hoje)
+        if ids_encontrados_ip:
+            comparador.marcar_offline()
+    conexao.close()
+    print(f"📝 Inventário: {comparador.resumo()}.")
+    return comparador.contagem
+
+# --- SCAN COMPLETO EM STREAMING ---
+# As redes são divididas em shards (/24) escaneados em paralelo; cada host é
+# gravado em lotes pequenos conforme chega, então o dashboard já mostra os
+# primeiros ativos durante o scan. O Offline só é decidido no fim de todos os shards.
+def executar_scan_completo_streaming(progresso=None):
+    print(f"\n📡 [MANUAL] SCAN (STREAMING) NAS REDES: {REDES_ALVO}")
+    if progresso: progresso(fase='varrendo')
+    conexao = conectar()
+    comparador = ComparadorInventario(conexao)
+    try:
+        ips_online, shards_com_falha = varrer_particionado(
+            TARGET_NETWORKS, '-sn -PR -T5 --min-hostgroup 100', TAMANHO_SHARD, MAX_PROCESSOS_SCAN,
+            ao_receber_hosts=lambda hosts: gravar_hosts_em_lotes(conexao, hosts, comparador=comparador),
+            progresso=progresso)
+    except Exception as e:
+        print(f"Erro Nmap: {e}")
+        conexao.close()
+        return False
 
-    if ids_encontrados_ip:
-        placeholders = ','.join('?' for _ in ids_encontrados_ip)
-        conexao.execute(f"UPDATE ativos_online SET status='Offline' WHERE ip_address NOT IN ({placeholders}) AND status='Online'", ids_encontrados_ip)
-    
-    conexao.commit()
+    print(f"✅ {len(ips_online)} dispositivos encontrados.")
+    if ips_online:
+        if progresso: progresso(fase='gravando', hosts_encontrados=len(ips_online), hosts_processados=len(ips_online))
+        with conexao:
+            # Quem está em um shard que falhou mantém o status anterior
+            comparador.marcar_offline(ips_em_shards(conexao, shards_com_falha))
     conexao.close()
-    return True
+    print(f"📝 Inventário: {comparador.resumo()}.")
+    if shards_com_falha and not ips_online:
+        return False
+    return comparador.contagem
 
 # --- SCAN STATUS (Automático) ---
-def executar_scan_status_apenas():
-    nm = nmap.PortScanner()
+# Primeiro a presença passiva: o que o kernel já viu há pouco (ip neigh / ARP)
+# é marcado Online sem mandar nenhum pacote. Só os ativos cadastrados que não
+# apareceram ali recebem o ARP ping do nmap, e apenas eles (não a rede inteira).
+# Quem também não responde ao ARP (ICMP/ARP filtrado, outra sub-rede) ainda
+# passa pela sonda TCP nas portas do seu tipo antes de ser dado como Offline.
+TAMANHO_LOTE_STATUS = 256   # IPs por chamada do nmap na confirmação ativa
+TIMEOUT_TCP_STATUS = 1.0    # Segundos por host na sonda TCP
+
+def confirmar_ativamente(ips, tipos_por_ip=None):
+    """ARP ping (nmap -sn -PR) só nos IPs pedidos e TCP connect nos que sobrarem. Retorna os que responderam."""
+    ips = sorted(ips)
+    vistos = set()
+    for inicio in range(0, len(ips), TAMANHO_LOTE_STATUS):
+        lote = ' '.join(ips[inicio:inicio + TAMANHO_LOTE_STATUS])
+        vistos.update(host['ip'] for host in iterar_hosts_nmap(lote, '-sn -PR -T5'))
+
+    restantes = set(ips) - vistos
+    if restantes:
+        tipos_por_ip = tipos_por_ip or {}
+        sonda = SondaTCP({ip: portas_para_tipo(tipos_por_ip.get(ip)) for ip in restantes})
+        respostas = varrer_hosts(restantes, sonda=sonda, timeout=TIMEOUT_TCP_STATUS)
+        vistos.update(ip for ip, rtt in respostas.items() if rtt is not None)
+    return vistos
+
+def executar_scan_status_apenas(progresso=None):
+    if not PRESENCA_PASSIVA:
+        return executar_scan_status_ativo(progresso)
+
+    if progresso: progresso(fase='varrendo')
+    presentes, macs = coletar_vizinhos(TARGET_NETWORKS, LEASES_DHCP)
+    conexao = conectar()
     try:
-        nm.scan(hosts=TARGET_NETWORK, arguments='-sn -PR -T5')
+        pendentes = ips_nas_redes(ips_cadastrados(conexao), TARGET_NETWORKS) - set(presentes)
+        print(f"📡 [STATUS] {len(presentes)} presentes pela tabela de vizinhos; {len(pendentes)} a confirmar com o nmap.")
+        try:
+            tipos_por_ip = dict(conexao.execute("SELECT ip_address, tipo FROM ativos_online WHERE ip_address IS NOT NULL"))
+            confirmados = confirmar_ativamente(pendentes, tipos_por_ip) if pendentes else set()
+        except Exception as e:
+            # Sem a confirmação ativa não dá para dizer quem saiu: só marca quem está presente
+            print(f"Erro Nmap: {e}")
+            with conexao:
+                marcar_online(conexao, presentes)
+                atualizar_macs(conexao, macs)
+            return False
+
+        ips_online = set(presentes) | confirmados
+        if progresso: progresso(fase='gravando', hosts_encontrados=len(ips_online), hosts_processados=len(ips_online))
+        with conexao:
+            marcar_online(conexao, ips_online)
+            atualizar_macs(conexao, macs)
+            if ips_online:
+                marcar_offline_exceto(conexao, ips_online)
+    finally:
+        conexao.close()
+    return True
+
+def executar_scan_status_ativo(progresso=None):
+    """Varredura ARP completa das redes (sem a presença passiva)."""
+    if progresso: progresso(fase='varrendo')
+    try:
+        ips_online, shards_com_falha = varrer_particionado(
+            TARGET_NETWORKS, '-sn -PR -T5', TAMANHO_SHARD, MAX_PROCESSOS_SCAN, progresso=progresso)
     except: return False
 
-    ips_online = nm.all_hosts()
+    if progresso: progresso(fase='gravando', hosts_encontrados=len(ips_online), hosts_processados=len(ips_online))
     conexao = conectar()
     
     if ips_online:
-        placeholders = ','.join('?' for _ in ips_online)
-        conexao.execute(f"UPDATE ativos_online SET status='Online' WHERE ip_address IN ({placeholders})", ips_online)
-        conexao.execute(f"UPDATE ativos_online SET status='Offline' WHERE ip_address NOT IN ({placeholders})", ips_online)
+        marcar_online(conexao, ips_online)
+        marcar_offline_exceto(conexao, ips_online | ips_em_shards(conexao, shards_com_falha))
     
     conexao.commit()
     conexao.close()
+    return not shards_com_falha or bool(ips_online)
+
+# --- COORDENAÇÃO: um único scan por rede/perfil ao mesmo tempo ---
+coordenador = CoordenadorScan()
+
+def scan_completo_coordenado(progresso=None):
+    return coordenador.executar(REDES_ALVO, PERFIL_COMPLETO, executar_scan_completo, progresso=progresso)
+
+def scan_status_coordenado(progresso=None):
+    return coordenador.executar(REDES_ALVO, PERFIL_STATUS, executar_scan_status_apenas, progresso=progresso)
+
+def discovery_coordenado(cancelar=None, progresso=None):
+    # O discovery (com fingerprint -sV -O) cobre tudo que o scan completo faz
+    return coordenador.executar(REDES_ALVO, PERFIL_COMPLETO, discover_and_add_assets, cancelar=cancelar, progresso=progresso)
+
+# --- VERIFICAÇÃO EM SEGUNDO PLANO: agenda adaptativa por ativo (agendador.py), como no monitor.py ---
+ESPERA_MAXIMA_STATUS = 30 # Segundos: teto da espera entre rodadas (pega ativos recém-cadastrados)
+
+def alertar_mudanca(ativo, status_novo):
+    """Callback do agendador: registra o alerta de mudança de status."""
+    print(f"!!! ALERTA !!! Ativo '{ativo['nome']}' mudou de '{ativo['status']}' para '{status_novo}'.")
+    registrar_alerta(*alertas.mensagem_mudanca_status(ativo['nome'], ativo['ip_address'], status_novo), ativo['id'])
+
+def verificar_ativos_agendados(progresso=None):
+    """
+    Presença passiva primeiro (tabela de vizinhos, sem pacotes); depois sonda só os
+    ativos cuja verificação venceu e que não apareceram ali (estáveis espaçam, instáveis repetem logo).
+    """
+    presentes, macs = coletar_vizinhos(TARGET_NETWORKS, LEASES_DHCP) if PRESENCA_PASSIVA else ({}, {})
+    conexao = conectar()
+    try:
+        if macs:
+            with conexao:
+                atualizar_macs(conexao, macs)
+        verificados, _ = agendador.verificar_pendentes(conexao, ao_mudar=alertar_mudanca, presentes=presentes)
+        if progresso: progresso(fase='gravando', hosts_encontrados=verificados, hosts_processados=verificados)
+    finally:
+        conexao.close()
     return True
 
+def espera_ate_proxima_verificacao():
+    conexao = conectar()
+    try:
+        return agendador.segundos_ate_proxima(conexao, espera_maxima=ESPERA_MAXIMA_STATUS)
+    finally:
+        conexao.close()
+
 def monitor_background():
+    ultima_manutencao = 0
+    espera = ESPERA_MAXIMA_STATUS
     while True:
         try:
-            time.sleep(30)
-            executar_scan_status_apenas()
-        except: pass
+            time.sleep(espera)
+            # Consolidação do histórico e retenção (latência, eventos, alertas), como no monitor.py
+            ultima_manutencao = manutencao.executar_se_vencida(ultima_manutencao)
+            # Pelo coordenador: não disputa o SQLite com um scan manual e, se um scan
+            # de status/completo já estiver rodando, só espera por ele
+            coordenador.executar(REDES_ALVO, PERFIL_AGENDADO, verificar_ativos_agendados)
+            espera = espera_ate_proxima_verificacao()
+        except Exception as e:
+            print(f"Erro na verificação em segundo plano: {e}")
+            espera = ESPERA_MAXIMA_STATUS
 
 monitor = threading.Thread(target=monitor_background, daemon=True)
 monitor.start()
@@ -212,24 +352,134 @@ def get_ativos_online():
     return jsonify([dict(x) for x in res])
 
 # 2. ROTA DE TIPOS PARA O GRÁFICO (Correção do outro Erro 404)
+# Lê os contadores mantidos por gatilhos (estatisticas.py), sem varrer a tabela
 @app.route('/api/estatisticas/tipos', methods=['GET'])
 def stats_types():
     con = conectar()
-    res = con.execute("SELECT COALESCE(tipo, 'Outros') as tipo, COUNT(*) as contagem FROM ativos_online GROUP BY tipo").fetchall()
+    por_tipo = estatisticas.ler(con)['tipo']
     con.close()
-    return jsonify([{'tipo': r['tipo'], 'contagem': r['contagem']} for r in res])
+    contagem = {}
+    for tipo, total in por_tipo.items():
+        contagem[tipo or 'Outros'] = contagem.get(tipo or 'Outros', 0) + total
+    return jsonify([{'tipo': tipo, 'contagem': total} for tipo, total in contagem.items()])
 
 # 3. ROTA DE SCAN STATUS (Para o botão da página Online)
+# O scan roda em segundo plano: a resposta traz o id da tarefa para acompanhar
 @app.route('/api/scan-status', methods=['POST'])
 def rota_scan_status():
-    if executar_scan_status_apenas(): return jsonify({"msg": "OK"}), 200
-    return jsonify({"erro": "Falha"}), 500
+    tarefa = tarefas.submeter('scan_status', scan_status_coordenado)
+    return jsonify({"msg": "Scan iniciado", "job_id": tarefa.id, "status_url": f"/api/scan-jobs/{tarefa.id}"}), 202
 
 # 4. ROTA DE SCAN COMPLETO (Para o Inventário)
 @app.route('/api/scan-rede', methods=['POST'])
 def rota_scan_rede():
-    if executar_scan_completo(): return jsonify({"msg": "OK"}), 200
-    return jsonify({"erro": "Falha"}), 500
+    tarefa = tarefas.submeter('scan_completo', scan_completo_coordenado)
+    return jsonify({"msg": "Scan iniciado", "job_id": tarefa.id, "status_url": f"/api/scan-jobs/{tarefa.id}"}), 202
+
+# 4.1 DISCOVERY COM FINGERPRINT (OS/serviços), cancelável pela rota de cancelamento abaixo
+@app.route('/api/discovery', methods=['POST'])
+def rota_discovery():
+    tarefa = tarefas.submeter('discovery', discovery_coordenado, cancelavel=True)
+    return jsonify({"msg": "Discovery iniciado", "job_id": tarefa.id, "status_url": f"/api/scan-jobs/{tarefa.id}"}), 202
+
+# 4.2 ACOMPANHAMENTO DAS TAREFAS DE SCAN
+@app.route('/api/scan-jobs', methods=['GET'])
+def listar_scan_jobs():
+    return jsonify([t.como_dict() for t in tarefas.listar()])
+
+@app.route('/api/scan-jobs/<job_id>', methods=['GET'])
+def get_scan_job(job_id):
+    tarefa = tarefas.obter(job_id)
+    if not tarefa: return jsonify({"erro": "Tarefa não encontrada"}), 404
+    return jsonify(tarefa.como_dict())
+
+@app.route('/api/scan-jobs/<job_id>/cancelar', methods=['POST'])
+def cancelar_scan_job(job_id):
+    tarefa = tarefas.cancelar(job_id)
+    if not tarefa: return jsonify({"erro": "Tarefa não encontrada"}), 404
+    if not tarefa.cancelavel: return jsonify({"erro": "Esta tarefa não pode ser cancelada"}), 409
+    return jsonify(tarefa.como_dict()), 202
+
+# 4.3 RECLASSIFICAR O INVENTÁRIO (após editar o regras_tipos.json)
+def executar_reclassificacao(progresso=None):
+    conexao = conectar()
+    try:
+        with conexao:
+            resultado = reclassificar_inventario(conexao, progresso)
+    finally:
+        conexao.close()
+    print(f"🏷️ Reclassificação: {resultado['alterados']} de {resultado['total']} ativos mudaram de tipo.")
+    return resultado
+
+@app.route('/api/ativos/reclassificar', methods=['POST'])
+def rota_reclassificar():
+    tarefa = tarefas.submeter('reclassificar', executar_reclassificacao)
+    return jsonify({"msg": "Reclassificação iniciada", "job_id": tarefa.id, "status_url": f"/api/scan-jobs/{tarefa.id}"}), 202
+
+# 4.4 SÉRIE DE LATÊNCIA DE UM ATIVO
+# ?inicio=&fim= (epoch; padrão: últimas 24h), ?passo= (segundos) ou ?bruto=1.
+# Sem passo, a série é reduzida para no máximo ?pontos= (padrão 1000) pontos.
+@app.route('/api/ativos/<int:id>/latencia', methods=['GET'])
+def get_latencia(id):
+    try:
+        fim = int(request.args.get('fim', time.time()))
+        inicio = int(request.args.get('inicio', fim - 86400))
+        passo = int(request.args.get('passo', 0))
+        pontos = int(request.args.get('pontos', latencia.MAX_PONTOS_PADRAO))
+    except ValueError:
+        return jsonify({"erro": "Parâmetros inválidos"}), 400
+    if inicio > fim or pontos < 1:
+        return jsonify({"erro": "Janela inválida"}), 400
+    if 'passo' in request.args and passo <= 0:
+        return jsonify({"erro": "passo deve ser maior que zero"}), 400
+    if not passo and request.args.get('bruto') != '1':
+        passo = latencia.passo_para(inicio, fim, pontos)
+        if passo == 1: passo = 0  # Janela pequena: devolve as amostras brutas
+
+    con = conectar()
+    serie = latencia.consultar_serie(con, id, inicio, fim, passo or None)
+    con.close()
+    return jsonify({"ativo_id": id, "inicio": inicio, "fim": fim, "passo": passo or None, "serie": serie})
+
+# 4.5 DISPONIBILIDADE DE UM ATIVO (a partir do histórico de status)
+# ?inicio=&fim= (epoch; padrão: últimos 30 dias), ?passo=dia (padrão) ou hora.
+@app.route('/api/ativos/<int:id>/disponibilidade', methods=['GET'])
+def get_disponibilidade(id):
+    passo = request.args.get('passo', 'dia')
+    try:
+        fim = int(request.args.get('fim', time.time()))
+        inicio = int(request.args.get('inicio', fim - 30 * 86400))
+    except ValueError:
+        return jsonify({"erro": "Parâmetros inválidos"}), 400
+    if inicio > fim or passo not in ('dia', 'hora'):
+        return jsonify({"erro": "Janela inválida"}), 400
+
+    con = conectar()
+    resultado = historico.consultar_disponibilidade(con, id, inicio, fim, passo)
+    con.close()
+    return jsonify({"ativo_id": id, "inicio": inicio, "fim": fim, "passo": passo, **resultado})
+
+# 4.6 TEMPO DE USO (sessões Online): tempo da sessão atual e uso acumulado
+# ?inicio=&fim= (epoch) limitam o uso acumulado a uma janela; ?ativo_id= filtra um ativo.
+@app.route('/api/ativos/tempo-de-uso', methods=['GET'])
+def get_tempo_de_uso():
+    inicio = request.args.get('inicio', type=int)
+    fim = request.args.get('fim', type=int)
+    ativo_id = request.args.get('ativo_id', type=int)
+    con = conectar()
+    res = tempo_de_uso(con, inicio, fim, ativo_id)
+    con.close()
+    return jsonify(res)
+
+# 4.7 BUSCA (índice FTS5 trigram): ?q= em nome, IP, MAC, tipo e condição; ?limit= (padrão 50)
+@app.route('/api/ativos/busca', methods=['GET'])
+def buscar_ativos():
+    termo = request.args.get('q', '')
+    limite = request.args.get('limit', busca.LIMITE_PADRAO, type=int)
+    con = conectar()
+    res = busca.buscar(con, termo, limite)
+    con.close()
+    return jsonify(res)
 
 # 5. ROTA DE RESET (Para zerar o banco)
 @app.route('/api/ativos/reset', methods=['DELETE'])
@@ -238,6 +488,12 @@ def resetar_inventario():
         con = conectar()
         con.execute("DELETE FROM ativos_online")
         con.execute("DELETE FROM sqlite_sequence WHERE name='ativos_online'")
+        historico.limpar_historico(con)  # Os ids dos ativos voltam a ser usados
+        con.execute("DELETE FROM sessoes")
+        # Nada do ativo antigo pode passar para o novo que herdar o id
+        con.execute("DELETE FROM latencia")
+        con.execute("DELETE FROM agenda_sondagem")
+        con.execute("UPDATE alertas SET ativo_id = NULL WHERE ativo_id IS NOT NULL")
         con.commit()
         con.close()
         return jsonify({"msg": "OK"}), 200
@@ -334,21 +590,42 @@ def delete_usuario(id):
 @app.route('/api/estatisticas', methods=['GET'])
 def stats():
     con = conectar()
-    t = con.execute("SELECT COUNT(*) FROM ativos_online").fetchone()[0]
-    on = con.execute("SELECT COUNT(*) FROM ativos_online WHERE status='Online'").fetchone()[0]
-    off = con.execute("SELECT COUNT(*) FROM ativos_online WHERE status='Offline'").fetchone()[0]
+    e = estatisticas.ler(con)
     con.close()
-    return jsonify({'total_ativos':t, 'ativos_online':on, 'ativos_offline':off})
+    return jsonify({'total_ativos': e['total'], 'ativos_online': e['status'].get('Online', 0),
+                    'ativos_offline': e['status'].get('Offline', 0),
+                    'por_status': e['status'], 'por_condicao': e['condicao']})
 
+# Paginado do mais novo para o mais antigo: ?limit= (padrão 100, máx. 1000) e
+# ?before_id= (o "proximo_before_id" da página anterior).
+# Filtros: ?tipo= (tipo_alerta), ?ativo_id=, ?inicio=&fim= (epoch).
 @app.route('/api/alertas', methods=['GET'])
 def get_alertas():
+    try:
+        filtros = {campo: int(request.args[campo]) for campo in ('before_id', 'ativo_id', 'inicio', 'fim')
+                   if request.args.get(campo)}
+        limite = int(request.args.get('limit', alertas.LIMITE_PADRAO))
+    except ValueError:
+        return jsonify({"erro": "Parâmetros inválidos"}), 400
     con = conectar()
-    res = con.execute("SELECT * FROM alertas ORDER BY id DESC").fetchall()
+    res, proximo = alertas.listar(con, limite=limite, tipo=request.args.get('tipo') or None, **filtros)
     con.close()
-    return jsonify([dict(x) for x in res])
+    return jsonify({"alertas": res, "proximo_before_id": proximo})
+
+def executar_poda_alertas(progresso=None):
+    con = conectar()
+    try:
+        return {'apagados': alertas.podar(con)}
+    finally:
+        con.close()
+
+@app.route('/api/alertas/limpar', methods=['POST'])
+def rota_podar_alertas():
+    tarefa = tarefas.submeter('podar_alertas', executar_poda_alertas)
+    return jsonify({"msg": "Limpeza iniciada", "job_id": tarefa.id, "status_url": f"/api/scan-jobs/{tarefa.id}"}), 202
 
 
 if __name__ == '__main__':
     criar_tabelas_iniciais()
-    print(f"\n--- SERVIDOR ONLINE: http://127.0.0.1:5000 ({TARGET_NETWORK}) ---\n")
+    print(f"\n--- SERVIDOR ONLINE: http://127.0.0.1:5000 ({REDES_ALVO}) ---\n")
     app.run(host='127.0.0.1', port=5000, debug=True)
\ No newline at end of file
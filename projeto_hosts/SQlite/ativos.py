@@ -1,4 +1,7 @@
 import sqlite3
+from banco import conectar
+from migracoes import migrar
+from sessoes import tempo_de_uso, formatar_duracao
 import datetime
 
 conexao = None
@@ -11,60 +14,24 @@ def mostrar_e_calcular_ativos(cursor):
     """
     print("\n--- MONITOR DE ATIVOS (COM TEMPO DE USO CALCULADO) ---")
     
-    cursor.execute("SELECT * FROM ativos_online")
-    todos_os_ativos = cursor.fetchall()
+    # O tempo vem das sessões Online (uma consulta agregada para todos os ativos)
+    todos_os_ativos = tempo_de_uso(cursor.connection)
 
     if not todos_os_ativos:
         print("Nenhum ativo encontrado.")
     else:
-        # Pega a hora exata de AGORA
-        tempo_agora = datetime.datetime.now()
-        
         for ativo in todos_os_ativos:
-            id_ativo = ativo[0]
-            nome_ativo = ativo[1]
-            ip_ativo = ativo[2]
-            
-            # Pega a string da data (coluna 6) do banco
-            data_inicio_str = ativo[6] 
-            
-            if data_inicio_str is None:
-                print(f"ID: {id_ativo}, Nome: {nome_ativo}, IP: {ip_ativo}, Tempo de Uso: (Data não registrada)")
-                continue
-
-            try:
-                # Converte a string de volta para um objeto 'datetime'
-                data_inicio_obj = datetime.datetime.fromisoformat(data_inicio_str)
-                
-                # Calcula a diferença (o "cronômetro"!)
-                duracao = tempo_agora - data_inicio_obj
-                
-                # Tira os microsegundos para ficar mais limpo (ex: 0:05:10)
-                duracao_formatada = str(duracao).split('.')[0]
-                
-                # Imprime o resultado calculado
-                print(f"ID: {id_ativo}, Nome: {nome_ativo}, IP: {ip_ativo}, Tempo de Uso: {duracao_formatada}")
-            
-            except (TypeError, ValueError):
-                print(f"ID: {id_ativo}, Nome: {nome_ativo}, IP: {ip_ativo}, Tempo de Uso: (Erro ao calcular data)")
+            # Tempo da sessão atual (ex: 0:05:10); '-' se o ativo está Offline
+            duracao_formatada = formatar_duracao(ativo['tempo_online'])
+            print(f"ID: {ativo['id']}, Nome: {ativo['nome']}, IP: {ativo['ip_address']}, Tempo de Uso: {duracao_formatada}, "
+                  f"Uso acumulado: {formatar_duracao(ativo['uso_total'])}")
 
 try:
-    conexao = sqlite3.connect('meu_banco.db')
+    # --- ETAPA DE CRIAÇÃO (CREATE): esquema atualizado pelas migrações ---
+    migrar()
+    conexao = conectar(row_factory=None)
     cursor = conexao.cursor()
 
-    # --- ETAPA DE CRIAÇÃO (CREATE) ---
-    cursor.execute('''
-    CREATE TABLE IF NOT EXISTS ativos_online (
-        id INTEGER PRIMARY KEY AUTOINCREMENT,
-        nome TEXT NOT NULL,
-        ip_address TEXT,
-        mac_address TEXT,
-        status TEXT,
-        condicao TEXT,
-        data_inicio TEXT
-    )
-    ''')
-
     # --- CONSULTA (Antes de Adicionar) ---
     # Agora a lista "ANTES" também calcula o tempo de uso
     mostrar_e_calcular_ativos(cursor)
@@ -79,7 +46,7 @@ try:
     condicao_digitada = input("Digite a condição (ex: Bom, Manutenção): ")
     
     # Capturamos a hora atual para salvar no banco
-    data_agora = datetime.datetime.now().isoformat()
+    data_agora = datetime.datetime.now().isoformat(timespec='seconds')
     
     print(f"\nAdicionando '{nome_digitado}' ao banco de dados às {data_agora}...")
     
@@ -0,0 +1,106 @@
+import atexit
+import os
+import sqlite3
+import threading
+
+# --- Configurações ---
+# Pode ser sobrescrito pela variável de ambiente HOSTS_BANCO
+DB_FILE = os.environ.get('HOSTS_BANCO') or os.path.join(os.path.dirname(os.path.abspath(__file__)), 'meu_banco.db')
+BUSY_TIMEOUT_MS = 5000          # Espera pela trava de escrita em vez de "database is locked"
+MMAP_BYTES = 256 * 1024 * 1024  # Leituras direto do arquivo mapeado
+CACHE_KIB = 16 * 1024           # Cache de páginas por conexão (16 MiB)
+COMANDOS_EM_CACHE = 256         # Comandos preparados guardados por conexão
+MAX_CONEXOES_OCIOSAS = 8        # Conexões devolvidas ao pool além disso são fechadas
+# ---------------------
+
+
+# =======================================================
+#   ACESSO COMPARTILHADO AO BANCO
+#   Todas as partes do sistema (API, monitor, discovery e scripts) abrem o
+#   banco por aqui: mesmas pragmas (WAL, busy_timeout...) e conexões reaproveitadas.
+# =======================================================
+
+class Conexao(sqlite3.Connection):
+    """
+    Conexão do pool: `close()` devolve a conexão para ser reaproveitada
+    (desfazendo o que ficou sem commit) em vez de fechá-la.
+    """
+
+    def close(self):
+        _devolver(self)
+
+    def fechar_de_verdade(self):
+        super().close()
+
+
+_ociosas = []
+_trava = threading.Lock()
+
+
+def _configurar(conexao):
+    # O modo WAL fica gravado no arquivo; as outras pragmas valem por conexão
+    conexao.execute("PRAGMA journal_mode=WAL")
+    conexao.execute(f"PRAGMA busy_timeout={BUSY_TIMEOUT_MS}")
+    conexao.execute("PRAGMA synchronous=NORMAL")
+    conexao.execute(f"PRAGMA mmap_size={MMAP_BYTES}")
+    conexao.execute(f"PRAGMA cache_size=-{CACHE_KIB}")
+    conexao.execute("PRAGMA temp_store=MEMORY")
+
+
+def _nova_conexao():
+    conexao = sqlite3.connect(DB_FILE, timeout=BUSY_TIMEOUT_MS / 1000, factory=Conexao,
+                              cached_statements=COMANDOS_EM_CACHE, check_same_thread=False)
+    _configurar(conexao)
+    return conexao
+
+
+def conectar(row_factory=sqlite3.Row):
+    """
+    Pega uma conexão do pool (ou abre uma nova). Use e feche como sempre:
+    `conexao.close()` a devolve para o próximo que pedir.
+    Por padrão as linhas vêm como sqlite3.Row (acesso por nome e por índice);
+    `row_factory=None` devolve tuplas.
+    """
+    with _trava:
+        conexao = _ociosas.pop() if _ociosas else None
+    if conexao is None:
+        conexao = _nova_conexao()
+    conexao.row_factory = row_factory
+    return conexao
+
+
+def _devolver(conexao):
+    try:
+        if conexao.in_transaction:
+            conexao.rollback()
+    except sqlite3.Error:
+        conexao.fechar_de_verdade()
+        return
+    with _trava:
+        if len(_ociosas) < MAX_CONEXOES_OCIOSAS and conexao not in _ociosas:
+            _ociosas.append(conexao)
+            return
+    if conexao not in _ociosas:
+        conexao.fechar_de_verdade()
+
+
+def fechar_todas():
+    """Fecha as conexões ociosas do pool (fim do processo / testes)."""
+    with _trava:
+        conexoes = list(_ociosas)
+        _ociosas.clear()
+    for conexao in conexoes:
+        conexao.fechar_de_verdade()
+
+
+def _apos_fork():
+    # Processos filhos (pool do scan particionado) não podem usar as conexões do pai
+    global _ociosas, _trava
+    _ociosas = []
+    _trava = threading.Lock()
+
+
+atexit.register(fechar_todas)
+
+if hasattr(os, 'register_at_fork'):
+    os.register_at_fork(after_in_child=_apos_fork)
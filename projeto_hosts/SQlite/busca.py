@@ -0,0 +1,52 @@
+# =======================================================
+#   BUSCA DE ATIVOS (índice FTS5 trigram da migração 005)
+#   Casa pedaços de qualquer tamanho a partir de 3 caracteres em nome,
+#   IP, MAC, tipo e condição, com ranking bm25 (o nome pesa mais).
+# =======================================================
+
+# --- Configurações ---
+LIMITE_PADRAO = 50
+LIMITE_MAXIMO = 500
+# ---------------------
+
+TAMANHO_TRIGRAMA = 3
+COLUNAS = ('id', 'nome', 'ip_address', 'mac_address', 'status', 'condicao', 'data_inicio', 'tipo')
+
+
+def montar_consulta_fts(termo):
+    """
+    Cada palavra do termo vira uma frase entre aspas (sem operadores do FTS5);
+    todas precisam casar. Palavras com menos de 3 caracteres não têm trigrama
+    e ficam de fora. Retorna None se não sobrar nenhuma.
+    """
+    palavras = [p for p in termo.split() if len(p) >= TAMANHO_TRIGRAMA]
+    if not palavras:
+        return None
+    return ' '.join('"' + p.replace('"', '""') + '"' for p in palavras)
+
+
+def buscar(conexao, termo, limite=LIMITE_PADRAO):
+    """
+    Ativos que contêm todas as palavras de `termo`, do mais relevante para o menos.
+    Termos curtos demais para o índice (ex: "pc") caem numa busca LIKE no nome.
+    Retorna [dict] com as colunas do ativo.
+    """
+    limite = max(1, min(int(limite), LIMITE_MAXIMO))
+    termo = (termo or '').strip()
+    if not termo:
+        return []
+    consulta = montar_consulta_fts(termo)
+    colunas = ', '.join(f'a.{coluna}' for coluna in COLUNAS)
+    if consulta is None:
+        linhas = conexao.execute(
+            f"SELECT {colunas} FROM ativos_online a WHERE a.nome LIKE ? ORDER BY a.nome LIMIT ?",
+            (f'%{termo}%', limite))
+    else:
+        # O LIMIT dentro da subconsulta deixa o FTS5 ordenar pelo rank antes do JOIN
+        linhas = conexao.execute(f'''
+            SELECT {colunas}
+            FROM (SELECT rowid, rank FROM ativos_busca WHERE ativos_busca MATCH ? ORDER BY rank LIMIT ?) b
+            JOIN ativos_online a ON a.id = b.rowid
+            ORDER BY b.rank
+        ''', (consulta, limite))
+    return [dict(zip(COLUNAS, linha)) for linha in linhas]
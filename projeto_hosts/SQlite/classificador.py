@@ -0,0 +1,149 @@
+import json
+import os
+import re
+import threading
+
+from oui import obter_indice
+
+# --- Configurações ---
+ARQUIVO_REGRAS = os.path.join(os.path.dirname(__file__), 'regras_tipos.json')
+CAMPOS = ('nome', 'vendor', 'os')
+TAMANHO_LOTE_RECLASSIFICAR = 500
+# ---------------------
+
+
+# =======================================================
+#   MOTOR DE CLASSIFICAÇÃO (regras em regras_tipos.json)
+# =======================================================
+
+class Classificador:
+    """
+    Classifica o tipo do dispositivo a partir de nome, fabricante e OS.
+    As regras (em ordem de prioridade) viram UMA expressão regular por campo,
+    com um grupo nomeado por regra; palavras só casam inteiras
+    ('hp' não casa dentro de 'whatsapp', nem 'pc' dentro de 'hpc01').
+    Quando várias regras casam, vale a que vem primeiro no arquivo.
+    """
+
+    def __init__(self, regras, padrao='Outros Dispositivos'):
+        self.padrao = padrao
+        self.tipos = []
+        alternativas = {campo: [] for campo in CAMPOS}
+        for indice, regra in enumerate(regras):
+            palavras = sorted((p.lower() for p in regra['palavras']), key=len, reverse=True)
+            padrao_regra = f"(?P<r{indice}>{'|'.join(re.escape(p) for p in palavras)})"
+            for campo in regra.get('campos', CAMPOS):
+                alternativas[campo].append(padrao_regra)
+            self.tipos.append(regra['tipo'])
+        self._expressoes = {
+            campo: re.compile(r'(?<![a-z0-9])(?:' + '|'.join(partes) + r')(?![a-z0-9])')
+            for campo, partes in alternativas.items() if partes
+        }
+
+    @classmethod
+    def carregar(cls, caminho=ARQUIVO_REGRAS):
+        with open(caminho, encoding='utf-8') as arquivo:
+            configuracao = json.load(arquivo)
+        return cls(configuracao['regras'], configuracao.get('padrao', 'Outros Dispositivos'))
+
+    def classificar(self, nome=None, vendor=None, os_guess=None):
+        melhor = len(self.tipos)
+        for campo, texto in zip(CAMPOS, (nome, vendor, os_guess)):
+            expressao = self._expressoes.get(campo)
+            if not texto or expressao is None:
+                continue
+            for encontrado in expressao.finditer(str(texto).lower()):
+                melhor = min(melhor, int(encontrado.lastgroup[1:]))
+                if melhor == 0:
+                    return self.tipos[0]
+        return self.tipos[melhor] if melhor < len(self.tipos) else self.padrao
+
+    def classificar_lote(self, itens):
+        """
+        Classifica [(nome, vendor, os)] de uma vez e devolve a lista de tipos na mesma ordem.
+        Triplas repetidas (mesmo fabricante/OS, nomes genéricos) são avaliadas uma vez só.
+        """
+        ja_vistos = {}
+        tipos = []
+        for item in itens:
+            item = tuple(item)
+            tipo = ja_vistos.get(item)
+            if tipo is None:
+                tipo = ja_vistos[item] = self.classificar(*item)
+            tipos.append(tipo)
+        return tipos
+
+
+_classificador = None
+_trava = threading.Lock()
+
+
+def obter_classificador():
+    """Classificador compartilhado, compilado na primeira chamada."""
+    global _classificador
+    if _classificador is None:
+        with _trava:
+            if _classificador is None:
+                _classificador = Classificador.carregar()
+    return _classificador
+
+
+def recarregar_regras(caminho=ARQUIVO_REGRAS):
+    """Relê o arquivo de regras (após editá-lo) e troca o classificador compartilhado."""
+    global _classificador
+    novo = Classificador.carregar(caminho)
+    with _trava:
+        _classificador = novo
+    return novo
+
+
+def classificar(nome=None, vendor=None, os_guess=None):
+    return obter_classificador().classificar(nome, vendor, os_guess)
+
+
+def classificar_lote(itens):
+    return obter_classificador().classificar_lote(itens)
+
+
+# =======================================================
+#   RECLASSIFICAÇÃO DO INVENTÁRIO INTEIRO
+# =======================================================
+
+def reclassificar_inventario(conexao, progresso=None):
+    """
+    Reaplica as regras atuais a todos os ativos (nome + fabricante pelo OUI +
+    OS do último fingerprint). Se nenhuma regra casar, o tipo atual é mantido
+    (pode ter sido escolhido à mão). Quem chama faz o commit.
+    Retorna {'total': n, 'alterados': n}.
+    """
+    classificador = recarregar_regras()
+    indice_oui = obter_indice()
+    try:
+        os_por_mac = dict(conexao.execute("SELECT mac, os_guess FROM fingerprints"))
+    except Exception:
+        os_por_mac = {}  # Discovery ainda não rodou: sem tabela de fingerprints
+
+    ativos = conexao.execute("SELECT id, nome, mac_address, tipo FROM ativos_online").fetchall()
+    if progresso: progresso(fase='classificando', hosts_encontrados=len(ativos), hosts_processados=0)
+
+    alterados = 0
+    for inicio in range(0, len(ativos), TAMANHO_LOTE_RECLASSIFICAR):
+        lote = ativos[inicio:inicio + TAMANHO_LOTE_RECLASSIFICAR]
+        itens = [(nome, indice_oui.fabricante(mac) if indice_oui else None, os_por_mac.get(mac))
+                 for _, nome, mac, _ in lote]
+        mudancas = []
+        for (id_ativo, _, _, tipo_atual), tipo in zip(lote, classificador.classificar_lote(itens)):
+            if tipo == classificador.padrao and tipo_atual:
+                continue
+            if tipo != tipo_atual:
+                mudancas.append((tipo, id_ativo))
+        conexao.executemany("UPDATE ativos_online SET tipo=? WHERE id=?", mudancas)
+        alterados += len(mudancas)
+        if progresso: progresso(hosts_processados=inicio + len(lote))
+
+    return {'total': len(ativos), 'alterados': alterados}
+
+
+if __name__ == "__main__":
+    import sys
+    print(classificar(*sys.argv[1:4]))
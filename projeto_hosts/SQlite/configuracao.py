@@ -0,0 +1,58 @@
+import os
+
+# =======================================================
+#   CONFIGURAÇÃO COMPARTILHADA DOS SCANNERS
+#   (api.py e discovery.py leem daqui)
+# =======================================================
+
+# --- Redes monitoradas ---
+# Pode ser sobrescrita pela variável de ambiente HOSTS_REDES,
+# separando as redes por vírgula: HOSTS_REDES="10.10.0.0/16,192.168.15.0/24"
+TARGET_NETWORKS = ['192.168.15.0/24']
+
+# --- Particionamento do scan ---
+TAMANHO_SHARD = 24        # Cada rede é dividida em blocos /24
+MAX_PROCESSOS_SCAN = 4    # Máximo de shards escaneados ao mesmo tempo
+
+# --- Discovery (fingerprint -sV -O) ---
+IDADE_MAXIMA_FINGERPRINT = 7 * 24 * 3600  # Segundos até refazer o fingerprint de um MAC já conhecido
+TAMANHO_LOTE_FINGERPRINT = 16     # Hosts por chamada do nmap no scan detalhado
+MAX_LOTES_FINGERPRINT = 4         # Lotes detalhados rodando ao mesmo tempo
+TIMEOUT_LOTE_FINGERPRINT = 900    # Segundos até abortar um lote inteiro
+TIMEOUT_HOST_FINGERPRINT = 180    # Segundos por host (--host-timeout do nmap)
+
+# --- Presença passiva (tabela ARP / ip neigh / leases DHCP) ---
+PRESENCA_PASSIVA = True   # Scan de status consulta o kernel antes de mandar pacotes
+# Arquivos de leases DHCP lidos junto (HOSTS_LEASES_DHCP, separados por vírgula),
+# ex.: /var/lib/misc/dnsmasq.leases ou /var/lib/dhcp/dhcpd.leases
+LEASES_DHCP = []
+
+# --- Retenção dos alertas (poda feita pelo monitor) ---
+RETENCAO_ALERTAS_DIAS = 180   # Alertas mais antigos são apagados (0 = sem limite de idade)
+MAX_ALERTAS = 100_000         # Máximo de alertas guardados (0 = sem limite)
+
+
+def _ler_lista(nome, padrao):
+    valor = os.environ.get(nome)
+    if not valor:
+        return padrao
+    return [item.strip() for item in valor.split(',') if item.strip()]
+
+
+def _ler_inteiro(nome, padrao):
+    try:
+        return int(os.environ.get(nome, padrao))
+    except ValueError:
+        return padrao
+
+
+TARGET_NETWORKS = _ler_lista('HOSTS_REDES', TARGET_NETWORKS)
+TAMANHO_SHARD = _ler_inteiro('HOSTS_TAMANHO_SHARD', TAMANHO_SHARD)
+MAX_PROCESSOS_SCAN = _ler_inteiro('HOSTS_MAX_PROCESSOS', MAX_PROCESSOS_SCAN)
+IDADE_MAXIMA_FINGERPRINT = _ler_inteiro('HOSTS_IDADE_FINGERPRINT', IDADE_MAXIMA_FINGERPRINT)
+TAMANHO_LOTE_FINGERPRINT = _ler_inteiro('HOSTS_LOTE_FINGERPRINT', TAMANHO_LOTE_FINGERPRINT)
+MAX_LOTES_FINGERPRINT = _ler_inteiro('HOSTS_MAX_LOTES_FINGERPRINT', MAX_LOTES_FINGERPRINT)
+PRESENCA_PASSIVA = _ler_inteiro('HOSTS_PRESENCA_PASSIVA', int(PRESENCA_PASSIVA)) != 0
+LEASES_DHCP = _ler_lista('HOSTS_LEASES_DHCP', LEASES_DHCP)
+RETENCAO_ALERTAS_DIAS = _ler_inteiro('HOSTS_RETENCAO_ALERTAS_DIAS', RETENCAO_ALERTAS_DIAS)
+MAX_ALERTAS = _ler_inteiro('HOSTS_MAX_ALERTAS', MAX_ALERTAS)
@@ -0,0 +1,105 @@
+import threading
+
+# Perfis de scan: o completo cobre tudo que o de status faz,
+# e o de status cobre a verificação agendada (só os ativos vencidos)
+PERFIL_AGENDADO = 'agendado'
+PERFIL_STATUS = 'status'
+PERFIL_COMPLETO = 'completo'
+
+# Perfis que também atendem quem pediu o perfil da chave
+PERFIS_QUE_ATENDEM = {
+    PERFIL_AGENDADO: (PERFIL_COMPLETO, PERFIL_STATUS, PERFIL_AGENDADO),
+    PERFIL_STATUS: (PERFIL_COMPLETO, PERFIL_STATUS),
+    PERFIL_COMPLETO: (PERFIL_COMPLETO,),
+}
+
+
+class _Voo:
+    """Um scan em andamento e quem está esperando por ele."""
+
+    def __init__(self, perfil):
+        self.perfil = perfil
+        self.concluido = threading.Event()
+        self.resultado = None
+        self.erro = None
+        self.observadores = []
+        self.ultimo_progresso = {}
+        self._trava = threading.Lock()
+
+    def adicionar_observador(self, progresso):
+        with self._trava:
+            self.observadores.append(progresso)
+            estado = dict(self.ultimo_progresso)
+        # Quem chega atrasado recebe o estado atual de uma vez
+        if estado:
+            progresso(**estado)
+
+    def notificar(self, **dados):
+        with self._trava:
+            self.ultimo_progresso.update({k: v for k, v in dados.items() if v is not None})
+            observadores = list(self.observadores)
+        for progresso in observadores:
+            try:
+                progresso(**dados)
+            except Exception:
+                pass
+
+
+class CoordenadorScan:
+    """
+    Deduplica scans concorrentes (single-flight).
+    Pedidos iguais para a mesma rede se juntam ao scan em andamento e recebem
+    o mesmo resultado; um scan completo em andamento também atende pedidos de status.
+    Scans diferentes da mesma rede rodam um de cada vez, para não disputar o SQLite.
+    """
+
+    def __init__(self):
+        self._trava = threading.Lock()
+        self._em_voo = {}
+        self._travas_rede = {}
+
+    def _trava_da_rede(self, rede):
+        with self._trava:
+            return self._travas_rede.setdefault(rede, threading.Lock())
+
+    def em_andamento(self, rede, perfil):
+        """Retorna o voo que atende (rede, perfil), se houver."""
+        for perfil_compativel in PERFIS_QUE_ATENDEM.get(perfil, (perfil,)):
+            voo = self._em_voo.get((rede, perfil_compativel))
+            if voo is not None:
+                return voo
+        return None
+
+    def executar(self, rede, perfil, funcao, *args, progresso=None, **kwargs):
+        """
+        Executa `funcao` (que recebe `progresso=`) ou se junta ao scan equivalente em andamento.
+        Todos os chamadores recebem o mesmo resultado (ou a mesma exceção).
+        """
+        with self._trava:
+            voo = self.em_andamento(rede, perfil)
+            dono = voo is None
+            if dono:
+                voo = _Voo(perfil)
+                self._em_voo[(rede, perfil)] = voo
+
+        if progresso:
+            voo.adicionar_observador(progresso)
+
+        if not dono:
+            print(f"[COORDENADOR] Pedido '{perfil}' em {rede} anexado ao scan '{voo.perfil}' em andamento.")
+            voo.concluido.wait()
+            if voo.erro is not None:
+                raise voo.erro
+            return voo.resultado
+
+        try:
+            with self._trava_da_rede(rede):
+                voo.resultado = funcao(*args, progresso=voo.notificar, **kwargs)
+        except Exception as e:
+            voo.erro = e
+            raise
+        finally:
+            with self._trava:
+                self._em_voo.pop((rede, perfil), None)
+            voo.concluido.set()
+        return voo.resultado
@@ -1,34 +1,20 @@
 import sqlite3
+import datetime
+import banco
+from migracoes import migrar
 
-# Nome do arquivo do nosso banco de dados
-DB_FILE = 'meu_banco.db'
+# O arquivo do banco de dados fica definido em banco.py (DB_FILE)
 
 def conectar():
     """Cria e retorna uma conexão com o banco de dados."""
-    return sqlite3.connect(DB_FILE)
+    return banco.conectar(row_factory=None)
 
 def criar_tabela():
-    """Garante que a tabela 'ativos_online' exista."""
+    """Garante que a tabela 'ativos_online' exista (no formato atual, pelas migrações)."""
     try:
-        conexao = conectar()
-        cursor = conexao.cursor()
-        cursor.execute('''
-        CREATE TABLE IF NOT EXISTS ativos_online (
-            id INTEGER PRIMARY KEY AUTOINCREMENT,
-            nome TEXT NOT NULL,
-            ip_address TEXT,
-            mac_address TEXT,
-            status TEXT,
-            condicao TEXT,
-            tempo_de_uso INTEGER
-        )
-        ''')
-        conexao.commit()
+        migrar()
     except sqlite3.Error as e:
         print(f"Erro ao criar a tabela: {e}")
-    finally:
-        if conexao:
-            conexao.close()
 
 # --- CREATE (Criar) ---
 def adicionar_ativo():
@@ -39,18 +25,15 @@ def adicionar_ativo():
     mac = input("MAC Address: ")
     status = input("Status (ex: Online, Offline): ")
     condicao = input("Condição (ex: Bom, Manutenção): ")
-    try:
-        tempo = int(input("Tempo de uso (em minutos): "))
-    except ValueError:
-        print("Tempo inválido, será salvo como 0.")
-        tempo = 0
+    # O tempo de uso não é mais digitado: vem das sessões Online (sessoes.py)
+    data_agora = datetime.datetime.now().isoformat(timespec='seconds')
 
     try:
         conexao = conectar()
         cursor = conexao.cursor()
         cursor.execute(
-            "INSERT INTO ativos_online (nome, ip_address, mac_address, status, condicao, tempo_de_uso) VALUES (?, ?, ?, ?, ?, ?)",
-            (nome, ip, mac, status, condicao, tempo)
+            "INSERT INTO ativos_online (nome, ip_address, mac_address, status, condicao, data_inicio) VALUES (?, ?, ?, ?, ?, ?)",
+            (nome, ip, mac, status, condicao, data_agora)
         )
         conexao.commit()
         print(f"Ativo '{nome}' adicionado com sucesso!")
@@ -120,20 +103,13 @@ def atualizar_ativo():
         mac = input(f"Novo MAC ({ativo[3]}): ") or ativo[3]
         status = input(f"Novo Status ({ativo[4]}): ") or ativo[4]
         condicao = input(f"Nova Condição ({ativo[5]}): ") or ativo[5]
-        
-        try:
-            tempo_str = input(f"Novo Tempo de Uso ({ativo[6]}): ")
-            tempo = int(tempo_str) if tempo_str else ativo[6]
-        except ValueError:
-            print("Valor inválido, mantendo tempo original.")
-            tempo = ativo[6]
 
         # Executa o comando UPDATE
         cursor.execute(
             '''UPDATE ativos_online 
-               SET nome = ?, ip_address = ?, mac_address = ?, status = ?, condicao = ?, tempo_de_uso = ?
+               SET nome = ?, ip_address = ?, mac_address = ?, status = ?, condicao = ?
                WHERE id = ?''',
-            (nome, ip, mac, status, condicao, tempo, id_para_atualizar)
+            (nome, ip, mac, status, condicao, id_para_atualizar)
         )
         conexao.commit()
         print("Ativo atualizado com sucesso!")
@@ -1,31 +1,19 @@
 import sqlite3
+import banco
+from migracoes import migrar
 
-# O arquivo do banco de dados é o MESMO
-DB_FILE = 'meu_banco.db'
+# O arquivo do banco de dados é o MESMO (definido em banco.py)
 
 def conectar():
     """Cria e retorna uma conexão com o banco de dados."""
-    return sqlite3.connect(DB_FILE)
+    return banco.conectar(row_factory=None)
 
 def criar_tabela():
-    """Garante que a tabela 'usuarios' exista."""
+    """Garante que a tabela 'usuarios' exista (no formato atual, pelas migrações)."""
     try:
-        conexao = conectar()
-        cursor = conexao.cursor()
-        # Comando SQL para criar a tabela usuarios
-        cursor.execute('''
-        CREATE TABLE IF NOT EXISTS usuarios (
-            id INTEGER PRIMARY KEY AUTOINCREMENT,
-            nome TEXT NOT NULL,
-            email TEXT
-        )
-        ''')
-        conexao.commit()
+        migrar()
     except sqlite3.Error as e:
         print(f"Erro ao criar a tabela: {e}")
-    finally:
-        if conexao:
-            conexao.close()
 
 # --- CREATE (Criar) ---
 def adicionar_usuario():
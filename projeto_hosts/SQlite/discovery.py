@@ -1,51 +1,59 @@
 import sqlite3
 import datetime
-import os
-import nmap
-import ipaddress
-import time 
-import subprocess 
-from getmac import get_mac_address
+from nmap_stream import gravar_hosts_em_lotes
+from inventario import ComparadorInventario
+from particionamento import varrer_particionado, ips_em_shards
+from configuracao import TARGET_NETWORKS, TAMANHO_SHARD, MAX_PROCESSOS_SCAN
+from resolucao import resolver_nomes
+from netbios import consultar_nbstat
+from fingerprints import (separar_para_fingerprint, salvar_fingerprints, servicos_do_nmap, fingerprint_em_lotes,
+                          dados_do_fingerprint)
+from classificador import classificar_lote, obter_classificador
+from oui import obter_indice
+import banco
+from migracoes import migrar
 
 # --- Configurações CRÍTICAS ---
-DB_FILE = 'meu_banco.db' 
-# ATUALIZADO PARA A REDE DO SENAC:
-TARGET_NETWORK = '192.168.15.0/24'
+# As redes monitoradas ficam em configuracao.py (ou na variável HOSTS_REDES)
 # ------------------------------
 
 def conectar():
-    """Conecta ao banco de dados."""
+    """Conecta ao banco de dados (conexão do pool compartilhado, ver banco.py)."""
     try:
-        conexao = sqlite3.connect(DB_FILE)
-        conexao.row_factory = sqlite3.Row 
-        return conexao
+        return banco.conectar()
     except sqlite3.OperationalError as e:
         print(f"ERRO DE CONEXÃO: {e}")
         raise
 
 def netbios_lookup(ip_address):
-    """Tenta obter o Nome NetBIOS (Hostname) usando o 'nbtstat' do Windows."""
+    """Tenta obter o Nome NetBIOS (Hostname) com uma consulta NBSTAT nativa (sem o 'nbtstat' do Windows)."""
     try:
-        comando = ['nbtstat', '-A', ip_address]
-        resultado = subprocess.run(
-            comando, capture_output=True, text=True, timeout=1, check=False)
-        
-        for line in resultado.stdout.splitlines():
-            if '<20>' in line and 'UNIQUE' in line:
-                nome_netbios = line.split()[0].strip()
-                if nome_netbios:
-                    return nome_netbios
+        return consultar_nbstat(ip_address)
     except Exception:
         pass 
     return None
 
-def get_best_name(ip, nm_detail_data):
-    """Tenta obter o Nome (NetBIOS ou Nmap) ou usa um genérico."""
-    netbios_name = netbios_lookup(ip)
+def get_best_name(ip, nm_detail_data, nomes_resolvidos=None):
+    """
+    Tenta obter o Nome (NetBIOS ou Nmap) ou usa um genérico.
+    `nomes_resolvidos` ({ip: (nome, mac)}, ver resolucao.py) evita a consulta NetBIOS individual.
+    """
+    if nomes_resolvidos is not None and ip in nomes_resolvidos:
+        netbios_name = nomes_resolvidos[ip][0]
+    else:
+        netbios_name = netbios_lookup(ip)
     if netbios_name:
         return netbios_name
     
     # Tenta o nome do Nmap (Plano B)
+    nmap_name = get_nmap_hostname(nm_detail_data)
+    if nmap_name:
+        return nmap_name
+
+    return f"Dispositivo-{ip.split('.')[-1]}" 
+
+def get_nmap_hostname(nm_detail_data):
+    """Primeiro hostname útil do resultado do Nmap (None se não houver)."""
     try:
         if nm_detail_data and 'hostnames' in nm_detail_data:
             for h in nm_detail_data['hostnames']:
@@ -53,8 +61,7 @@ def get_best_name(ip, nm_detail_data):
                 if name and name != 'localhost':
                     return name
     except Exception: pass
-
-    return f"Dispositivo-{ip.split('.')[-1]}" 
+    return None
 
 def get_os_guess(nm_detail_data):
     """Extrai a melhor estimativa de OS do resultado do Nmap."""
@@ -66,157 +73,158 @@ def get_os_guess(nm_detail_data):
         pass
     return "OS Bloqueado"
 
-# -----------------------------------------------------------
-# >>> NOVA FUNÇÃO PARA CLASSIFICAR O TIPO DE ATIVO PARA O GRÁFICO <<<
-# -----------------------------------------------------------
-def get_asset_type(os_guess):
-    """Mapeia a estimativa de OS para um Tipo de Ativo para o Dashboard."""
-    os_guess = os_guess.lower()
-    
-    if 'windows' in os_guess or 'linux' in os_guess or 'unix' in os_guess:
-        return 'Computador'
-    if 'router' in os_guess or 'openwrt' in os_guess or 'cisco' in os_guess:
-        return 'Roteador/Firewall'
-    if 'printer' in os_guess or 'hp' in os_guess or 'canon' in os_guess or 'epson' in os_guess:
-        return 'Impressora'
-    if 'server' in os_guess or 'esxi' in os_guess or 'hyper-v' in os_guess:
-        return 'Servidor'
-    if 'switch' in os_guess or 'network' in os_guess:
-        return 'Switch'
+def salvar_lote_detalhado(conexao, comparador, ips, macs_por_ip, dados_por_ip, fingerprints_em_cache, nomes_resolvidos):
+    """
+    ETAPA 3 de um lote: combina os dados da Etapa 1 com o fingerprint
+    (novo ou em cache), grava no banco só o que mudou e faz o commit do lote.
+    """
+    data_hora_atual = datetime.datetime.now().isoformat(timespec='seconds')
+    novos_fingerprints = []
+    resultados = []
+    itens_classificacao = []
+    indice_oui = obter_indice()
+
+    for ip_address in ips:
+        # Pega os dados básicos da Etapa 1 (MAC já corrigido pela tabela ARP quando o nmap não informa)
+        mac_address = macs_por_ip[ip_address]
+        
+        # Dados detalhados da Etapa 2 (None se o host não respondeu ao -sV -O ou o lote falhou)
+        nm_host_data = dados_por_ip.get(ip_address)
+        fingerprint = fingerprints_em_cache.get(ip_address)
+        do_cache = fingerprint is not None and not nm_host_data
+        if do_cache:
+            # Hostname, OS e serviços reaproveitados do fingerprint em cache
+            nm_host_data = dados_do_fingerprint(fingerprint)
+
+        # 1. Resolve o nome 
+        nome_base = get_best_name(ip_address, nm_host_data, nomes_resolvidos)
+        
+        # 2. Resolve o OS 
+        sistema_op = get_os_guess(nm_host_data)
+
+        # 3. Tipo para o Gráfico: classificado em lote logo abaixo (regras_tipos.json)
+        fabricante = indice_oui.fabricante(mac_address) if indice_oui else None
+        itens_classificacao.append((nome_base, fabricante, sistema_op))
+        
+        # 4. Combina o nome e OS
+        nome_ativo_final = f"{nome_base} ({sistema_op})"
+        
+        resultados.append((ip_address, mac_address, nome_ativo_final, nm_host_data, sistema_op,
+                           fingerprint if do_cache else None))
+
+    tipos = classificar_lote(itens_classificacao)
+    padrao = obter_classificador().padrao
+    gravar = []
+    for (ip_address, mac_address, nome_ativo_final, nm_host_data, sistema_op, fingerprint), tipo_ativo_final in zip(resultados, tipos):
+        if fingerprint is not None and tipo_ativo_final == padrao and fingerprint['tipo']:
+            # Nenhuma regra casou agora: mantém o tipo salvo junto com o fingerprint
+            tipo_ativo_final = fingerprint['tipo']
+        gravar.append((ip_address, mac_address, nome_ativo_final, tipo_ativo_final))
+        # Só guarda fingerprints que o scan detalhado realmente trouxe (o do cache mantém a idade original)
+        if nm_host_data and fingerprint is None:
+            novos_fingerprints.append((mac_address, ip_address, get_nmap_hostname(nm_host_data), sistema_op,
+                                       servicos_do_nmap(nm_host_data), tipo_ativo_final))
     
-    return 'Outros' # Tipo padrão se não houver correspondência
+    comparador.aplicar(gravar, data_hora_atual)
+    salvar_fingerprints(conexao, novos_fingerprints)
+    conexao.commit()
 
 # --- FUNÇÃO PRINCIPAL ATUALIZADA ---
 
-def discover_and_add_assets():
+def discover_and_add_assets(cancelar=None, progresso=None):
     """
     Executa um scan OTIMIZADO em 2 Etapas:
     1. Ping Scan Rápido (para achar IPs vivos)
-    2. OS Scan Lento (APENAS nos IPs vivos)
+    2. OS Scan Lento (APENAS nos IPs vivos que não têm fingerprint recente em cache)
     3. Salva TODOS os IPs da Etapa 1, enriquecidos com dados da Etapa 2
+       (lote a lote; `cancelar` (threading.Event) interrompe a Etapa 2)
+    `progresso` é o callback das tarefas em segundo plano (tarefas.py).
+    Retorna False se o nmap não conseguiu escanear nada.
     """
-    nm_fast = nmap.PortScanner() # Scanner para Etapa 1
-    nm_detail = nmap.PortScanner() # Scanner para Etapa 2
-    
     # -----------------------------------------------------------------
     # ETAPA 1: ACHAR HOSTS VIVOS (RÁPIDO)
+    # Em streaming: cada host já é gravado no banco (nome/tipo básicos)
+    # assim que o nmap o reporta, sem esperar a rede inteira.
     # -----------------------------------------------------------------
+    if progresso: progresso(fase='varrendo')
     start_time = datetime.datetime.now()
-    print(f"[{start_time.strftime('%Y-%m-%d %H:%M:%S')}] OTIMIZAÇÃO (1/3): Buscando hosts ativos (Ping Scan) em {TARGET_NETWORK}...")
-    try:
-        nm_fast.scan(hosts=TARGET_NETWORK, arguments='-sn -T4')
-        print("Scan Rápido concluído.")
-    except nmap.PortScannerError as e:
-        print(f"ERRO CRÍTICO DO NMAP (Etapa 1): {e}")
-        return
-
-    live_hosts_ips = nm_fast.all_hosts()
+    print(f"[{start_time.strftime('%Y-%m-%d %H:%M:%S')}] OTIMIZAÇÃO (1/3): Buscando hosts ativos (Ping Scan) em {', '.join(TARGET_NETWORKS)}...")
+    conexao = conectar()
+    comparador = ComparadorInventario(conexao)
+    macs_por_ip = {}
+    _, shards_com_falha = varrer_particionado(
+        TARGET_NETWORKS, '-sn -T4', TAMANHO_SHARD, MAX_PROCESSOS_SCAN,
+        ao_receber_hosts=lambda hosts: macs_por_ip.update(
+            gravar_hosts_em_lotes(conexao, hosts, comparador=comparador, manter_nome=True)),
+        progresso=progresso)
+    if shards_com_falha and not macs_por_ip:
+        print(f"ERRO CRÍTICO DO NMAP (Etapa 1): nenhum dos {len(shards_com_falha)} shards pôde ser escaneado.")
+        conexao.close()
+        return False
+    print("Scan Rápido concluído.")
+
+    live_hosts_ips = list(macs_por_ip)
     if not live_hosts_ips:
         print("Nenhum host ativo encontrado na rede.")
+        conexao.close()
         return
         
     print(f"Encontrados {len(live_hosts_ips)} hosts ativos. IPs: {live_hosts_ips}")
-    live_hosts_str = ' '.join(live_hosts_ips) 
 
     # -----------------------------------------------------------------
     # ETAPA 2: BUSCAR DETALHES (OS/NOME) APENAS DOS HOSTS VIVOS
+    # Só MACs novos, que trocaram de IP ou com fingerprint velho;
+    # os demais reaproveitam o fingerprint salvo (tabela fingerprints).
     # -----------------------------------------------------------------
-    print(f"[{datetime.datetime.now().strftime('%Y-%m-%d %H:%M:%S')}] OTIMIZAÇÃO (2/3): Buscando OS/Detalhes dos hosts ativos (pode demorar)...")
-    try:
-        nm_detail.scan(hosts=live_hosts_str, arguments='-sV -O -T4')
-        print("Scan Detalhado concluído.")
-    except nmap.PortScannerError as e:
-        print(f"ERRO CRÍTICO DO NMAP (Etapa 2): {e}")
-        # Mesmo se a Etapa 2 falhar, continuamos para salvar os dados da Etapa 1
-        pass 
+    ips_para_detalhar, fingerprints_em_cache = separar_para_fingerprint(conexao, macs_por_ip)
+    print(f"[{datetime.datetime.now().strftime('%Y-%m-%d %H:%M:%S')}] OTIMIZAÇÃO (2/3): Buscando OS/Detalhes de {len(ips_para_detalhar)} hosts "
+          f"({len(fingerprints_em_cache)} reaproveitados do cache)...")
+
+    # Nomes NetBIOS de todos os hosts de uma vez (em paralelo e com cache)
+    nomes_resolvidos = resolver_nomes(conexao, [(ip, macs_por_ip[ip]) for ip in live_hosts_ips])
 
     # -----------------------------------------------------------------
     # ETAPA 3: PROCESSAR E SALVAR NO BANCO (LÓGICA ATUALIZADA)
+    # Quem está no cache é salvo já; os demais, lote a lote, assim que
+    # cada lote do scan detalhado termina (em paralelo, com timeouts).
     # -----------------------------------------------------------------
     print(f"[{datetime.datetime.now().strftime('%Y-%m-%d %H:%M:%S')}] OTIMIZAÇÃO (3/3): Processando e salvando TODOS os {len(live_hosts_ips)} hosts no banco...")
-    
-    conexao = conectar()
-    cursor = conexao.cursor()
-    data_hora_atual = datetime.datetime.now().strftime('%d/%m/%Y %H:%M:%S')
+    salvar_lote_detalhado(conexao, comparador, [ip for ip in live_hosts_ips if ip in fingerprints_em_cache],
+                          macs_por_ip, {}, fingerprints_em_cache, nomes_resolvidos)
 
-    hosts_escaneados_neste_ciclo = [] # Para rastrear quem foi encontrado
-
-    for ip_address in live_hosts_ips: 
-        hosts_escaneados_neste_ciclo.append(ip_address) # Marca como encontrado
+    pendentes = set(ips_para_detalhar)
+    if progresso: progresso(fase='detalhando', hosts_encontrados=len(live_hosts_ips),
+                            hosts_processados=len(live_hosts_ips) - len(pendentes))
+    try:
+        for lote, dados_por_ip in fingerprint_em_lotes(ips_para_detalhar, cancelar=cancelar):
+            salvar_lote_detalhado(conexao, comparador, lote, macs_por_ip, dados_por_ip, fingerprints_em_cache, nomes_resolvidos)
+            pendentes.difference_update(lote)
+            print(f" Lote detalhado salvo: {len(dados_por_ip)}/{len(lote)} hosts com fingerprint ({len(pendentes)} pendentes).")
+            if progresso: progresso(hosts_processados=len(live_hosts_ips) - len(pendentes))
+    except KeyboardInterrupt:
+        print("Scan Detalhado cancelado.")
+    if cancelar is not None and cancelar.is_set():
+        print("Scan Detalhado cancelado pela tarefa.")
+    if pendentes:
+        # Lotes cancelados: os hosts ficam com os dados básicos da Etapa 1
+        print(f"ERRO/CANCELAMENTO (Etapa 2): {len(pendentes)} hosts ficaram sem fingerprint.")
+
+    hosts_escaneados_neste_ciclo = live_hosts_ips # Para rastrear quem foi encontrado
 
-        # Pega os dados básicos da Etapa 1 (nm_fast)
-        mac_address = nm_fast[ip_address]['addresses'].get('mac', 'N/A') 
-        
-        # Tenta pegar os dados detalhados da Etapa 2 (nm_detail)
-        nm_host_data = nm_detail[ip_address] if ip_address in nm_detail.all_hosts() else None
-
-        # --- CORREÇÃO PARA O MAC LOCAL ---
-        if mac_address == 'N/A':
-            mac_local = get_mac_address(ip=ip_address)
-            if mac_local:
-                mac_address = mac_local.upper()
-        
-        # 1. Resolve o nome 
-        nome_base = get_best_name(ip_address, nm_host_data)
-        
-        # 2. Resolve o OS 
-        sistema_op = get_os_guess(nm_host_data)
-        
-        # 3. NOVIDADE: Resolve o Tipo para o Gráfico
-        tipo_ativo_final = get_asset_type(sistema_op) 
-        
-        # 4. Combina o nome e OS
-        nome_ativo_final = f"{nome_base} ({sistema_op})"
-        
-        
-        cursor.execute(
-            "SELECT id FROM ativos_online WHERE ip_address = ? OR (mac_address = ? AND mac_address != 'N/A')",
-            (ip_address, mac_address)
-        )
-        ativo_existente = cursor.fetchone()
-
-        if not ativo_existente:
-            print(f" [+] INSERINDO NOVO: {nome_ativo_final} | Tipo: {tipo_ativo_final}")
-            
-            # >>> SQL ATUALIZADO: INCLUI O CAMPO 'TIPO' <<<
-            cursor.execute(
-                """INSERT INTO ativos_online (nome, ip_address, mac_address, status, condicao, data_inicio, tipo) 
-                   VALUES (?, ?, ?, ?, ?, ?, ?)""",
-                (nome_ativo_final, ip_address, mac_address, 'Online', 'Monitorado', data_hora_atual, tipo_ativo_final)
-            )
-        else:
-            print(f" [~] ATUALIZANDO: {nome_ativo_final} | Tipo: {tipo_ativo_final}")
-            
-            # >>> SQL ATUALIZADO: INCLUI O CAMPO 'TIPO' NO UPDATE <<<
-            cursor.execute(
-                """UPDATE ativos_online 
-                   SET status = 'Online', nome = ?, tipo = ?, data_inicio = ? 
-                   WHERE id = ?""",
-                (nome_ativo_final, tipo_ativo_final, data_hora_atual, ativo_existente['id'])
-            )
-    
     # --- LÓGICA DE DETECÇÃO DE OFFLINE ---
     
     if hosts_escaneados_neste_ciclo:
-        live_ips_tuple = tuple(hosts_escaneados_neste_ciclo)
-        
         # Marcamos como 'Offline' os ativos que estavam online e NÃO foram encontrados no scan
-        placeholders = ','.join('?' for _ in live_ips_tuple)
-        
-        cursor.execute(f"""
-            UPDATE ativos_online 
-            SET status = 'Offline' 
-            WHERE ip_address NOT IN ({placeholders}) AND status = 'Online'
-        """, live_ips_tuple)
-        
-        offline_count = cursor.rowcount
+        # (quem está em um shard que falhou mantém o status anterior)
+        offline_count = comparador.marcar_offline(ips_em_shards(conexao, shards_com_falha))
         if offline_count > 0:
             print(f" [!] {offline_count} ativos detectados como OFFLINE (Não apareceram no scan).")
         
             
     conexao.commit()
     conexao.close()
-    print(f"\nDiscovery Otimizado finalizado. {len(live_hosts_ips)} hosts encontrados.")
+    print(f"\nDiscovery Otimizado finalizado. {len(live_hosts_ips)} hosts encontrados ({comparador.resumo()}).")
 
 if __name__ == "__main__":
+    migrar()
     discover_and_add_assets()
\ No newline at end of file
@@ -0,0 +1,58 @@
+from getmac import get_mac_address
+from netbios import consultar_nbstat
+from oui import fabricante_do_mac
+from classificador import classificar
+
+
+# =======================================================
+#   ENRIQUECIMENTO DOS HOSTS ENCONTRADOS NO SCAN
+#   (nome, MAC, fabricante e tipo do dispositivo)
+# =======================================================
+
+def netbios_lookup(ip_address):
+    # Consulta NBSTAT nativa (UDP/137): funciona no Linux e no Windows, sem o nbtstat
+    try:
+        return consultar_nbstat(ip_address)
+    except: pass
+    return None
+
+def resolver_mac(ip, mac=None):
+    """Usa o MAC do nmap ou, se não veio (host local / sem root), consulta a tabela ARP."""
+    if mac: return mac.upper()
+    try:
+        m = get_mac_address(ip=ip)
+        if m: return m.upper()
+    except: pass
+    return 'N/A'
+
+def vendor_curto(vendor):
+    """Primeira palavra do fabricante informado pelo nmap (ex: 'TP-LINK TECHNOLOGIES' -> 'TP-LINK')."""
+    try:
+        return vendor.split(' ')[0] if vendor else ""
+    except: return ""
+
+def enriquecer_host(ip, mac=None, vendor=None, hostnames=None, resolvido=None):
+    """
+    Resolve nome, MAC e tipo de um host do scan.
+    `resolvido` = (nome_netbios, mac) já obtido em lote (ver resolucao.py);
+    sem ele as consultas são feitas aqui, uma a uma.
+    Retorna (nome_final, mac, tipo_final).
+    """
+    if resolvido:
+        nome_netbios, mac_resolvido = resolvido
+        mac = mac.upper() if mac else (mac_resolvido or 'N/A')
+    else:
+        mac = resolver_mac(ip, mac)
+    # Sem root o nmap não informa o fabricante: consulta o índice OUI local
+    fabricante = vendor or fabricante_do_mac(mac)
+    vendor = vendor_curto(fabricante)
+
+    nome_final = ""
+    if hostnames: nome_final = hostnames[0]
+    if not nome_final: nome_final = nome_netbios if resolvido else netbios_lookup(ip)
+    if not nome_final:
+        nome_base = f"Dispositivo-{ip.split('.')[-1]}"
+        nome_final = f"{nome_base} ({vendor})" if vendor else nome_base
+
+    tipo_final = classificar(nome_final, fabricante)
+    return nome_final, mac, tipo_final
@@ -0,0 +1,25 @@
+# =======================================================
+#   CONTADORES DO INVENTÁRIO (tabela estatisticas, migração 006)
+#   Totais por status, tipo e condição mantidos por gatilhos na
+#   ativos_online, na mesma transação de cada INSERT/UPDATE/DELETE:
+#   os endpoints de estatística leem meia dúzia de linhas em vez de
+#   contar a tabela inteira.
+# =======================================================
+
+DIMENSOES = ('status', 'tipo', 'condicao')
+TOTAL = 'total'   # Dimensão com uma linha só: quantidade de ativos
+
+
+def ler(conexao):
+    """
+    {'total': n, 'status': {valor: n}, 'tipo': {...}, 'condicao': {...}}.
+    Valores nulos aparecem como ''; contadores zerados ficam de fora.
+    """
+    resultado = {TOTAL: 0, **{dimensao: {} for dimensao in DIMENSOES}}
+    for dimensao, valor, total in conexao.execute(
+            "SELECT dimensao, valor, total FROM estatisticas WHERE total > 0"):
+        if dimensao == TOTAL:
+            resultado[TOTAL] = total
+        elif dimensao in resultado:
+            resultado[dimensao][valor] = total
+    return resultado
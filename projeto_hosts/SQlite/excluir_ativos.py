@@ -1,5 +1,7 @@
 import sqlite3
-import datetime # Vamos usar só para exibir o tempo de uso na consulta
+from banco import conectar
+from migracoes import migrar
+from sessoes import tempo_de_uso, formatar_duracao # Tempo de uso exibido na consulta
 
 conexao = None
 cursor = None
@@ -8,46 +10,23 @@ def mostrar_todos_os_ativos(cursor):
     """Função auxiliar para mostrar os ativos e seu tempo de uso."""
     print("\n--- ATIVOS ATUALMENTE CADASTRADOS ---")
     
-    cursor.execute("SELECT * FROM ativos_online")
-    todos_os_ativos = cursor.fetchall()
+    todos_os_ativos = tempo_de_uso(cursor.connection)
 
     if not todos_os_ativos:
         print("Nenhum ativo encontrado.")
         return False # Retorna False se a lista estiver vazia
     
-    tempo_agora = datetime.datetime.now()
-    
     for ativo in todos_os_ativos:
-        id_ativo = ativo[0]
-        nome_ativo = ativo[1]
-        data_inicio_str = ativo[6] # Coluna da data de início
-        
-        try:
-            # Calcula o tempo de uso para exibição
-            data_inicio_obj = datetime.datetime.fromisoformat(data_inicio_str)
-            duracao = tempo_agora - data_inicio_obj
-            duracao_formatada = str(duracao).split('.')[0]
-        except (TypeError, ValueError):
-            duracao_formatada = "Erro na data"
-            
-        print(f"ID: {id_ativo}, Nome: {nome_ativo}, Tempo de Uso: {duracao_formatada}")
+        print(f"ID: {ativo['id']}, Nome: {ativo['nome']}, Tempo de Uso: {formatar_duracao(ativo['tempo_online'])}")
         
     return True # Retorna True se houver ativos
 
 try:
-    # 1. Conectar ao banco de dados
-    conexao = sqlite3.connect('meu_banco.db')
+    # 1. Garantir o esquema atualizado (migrações) e conectar ao banco de dados
+    migrar()
+    conexao = conectar(row_factory=None)
     cursor = conexao.cursor()
 
-    # Garante que a tabela exista (não custa verificar)
-    cursor.execute('''
-    CREATE TABLE IF NOT EXISTS ativos_online (
-        id INTEGER PRIMARY KEY AUTOINCREMENT,
-        nome TEXT NOT NULL, ip_address TEXT, mac_address TEXT,
-        status TEXT, condicao TEXT, data_inicio TEXT
-    )
-    ''')
-
     # 2. Mostrar a lista de ativos ANTES de deletar
     #    (Se não houver ativos, a função nos avisa)
     if not mostrar_todos_os_ativos(cursor):
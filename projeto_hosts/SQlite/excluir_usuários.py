@@ -1,4 +1,6 @@
 import sqlite3
+from banco import conectar
+from migracoes import migrar
 # Não precisamos do 'datetime' aqui, pois a tabela 'usuarios' não tem o tempo.
 
 conexao = None
@@ -26,18 +28,10 @@ def mostrar_todos_os_usuarios(cursor):
     return True # Retorna True se houver usuários
 
 try:
-    # 1. Conectar ao banco de dados
-    conexao = sqlite3.connect('meu_banco.db')
+    # 1. Garantir o esquema atualizado (migrações) e conectar ao banco de dados
+    migrar()
+    conexao = conectar(row_factory=None)
     cursor = conexao.cursor()
-
-    # Garante que a tabela 'usuarios' exista (não custa verificar)
-    cursor.execute('''
-    CREATE TABLE IF NOT EXISTS usuarios (
-        id INTEGER PRIMARY KEY AUTOINCREMENT,
-        nome TEXT NOT NULL,
-        email TEXT
-    )
-    ''')
     
     # NOTA: Removi os INSERTs de 'Ana Silva' e 'Bruno Costa'
     # para este script focar APENAS em excluir.
@@ -0,0 +1,173 @@
+import json
+import shlex
+import subprocess
+import tempfile
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor, as_completed
+
+from configuracao import (IDADE_MAXIMA_FINGERPRINT, TAMANHO_LOTE_FINGERPRINT, MAX_LOTES_FINGERPRINT,
+                          TIMEOUT_LOTE_FINGERPRINT, TIMEOUT_HOST_FINGERPRINT)
+from nmap_stream import ler_hosts_xml
+
+
+# =======================================================
+#   CACHE DE FINGERPRINTS (-sV -O) POR MAC (tabela fingerprints, migrações 009 e 011)
+#   Evita refazer o scan lento em aparelhos que não mudaram.
+# =======================================================
+
+def servicos_do_nmap(nm_host_data):
+    """Lista compacta dos serviços abertos encontrados pelo -sV."""
+    servicos = []
+    try:
+        for protocolo in ('tcp', 'udp'):
+            for porta, info in (nm_host_data or {}).get(protocolo, {}).items():
+                if info.get('state') == 'open':
+                    servicos.append({'porta': int(porta), 'protocolo': protocolo,
+                                     'nome': info.get('name'), 'produto': info.get('product')})
+    except Exception:
+        pass
+    return servicos
+
+
+def carregar_fingerprints(conexao, macs):
+    """Retorna {mac: registro} dos fingerprints já salvos para esses MACs."""
+    macs = [mac for mac in set(macs) if mac and mac != 'N/A']
+    registros = {}
+    for inicio in range(0, len(macs), 500):
+        parte = macs[inicio:inicio + 500]
+        placeholders = ','.join('?' for _ in parte)
+        for mac, ip, hostname, os_guess, servicos, tipo, atualizado_em in conexao.execute(
+                f"SELECT mac, ip, hostname, os_guess, servicos, tipo, atualizado_em FROM fingerprints WHERE mac IN ({placeholders})", parte):
+            registros[mac] = {'mac': mac, 'ip': ip, 'hostname': hostname, 'os_guess': os_guess,
+                              'servicos': json.loads(servicos or '[]'), 'tipo': tipo, 'atualizado_em': atualizado_em}
+    return registros
+
+
+def dados_do_fingerprint(registro):
+    """
+    Converte um fingerprint salvo para o formato de dicionário do python-nmap
+    (hostname, OS e serviços), para o host do cache seguir o mesmo caminho de quem foi escaneado.
+    """
+    dados = {
+        'hostnames': [{'name': registro['hostname']}] if registro.get('hostname') else [],
+        'osmatch': [{'name': registro['os_guess']}] if registro.get('os_guess') else [],
+    }
+    for servico in registro.get('servicos') or []:
+        dados.setdefault(servico['protocolo'], {})[servico['porta']] = {
+            'state': 'open', 'name': servico.get('nome'), 'product': servico.get('produto')}
+    return dados
+
+
+def precisa_fingerprint(registro, ip, agora, idade_maxima=IDADE_MAXIMA_FINGERPRINT):
+    """MAC novo, IP diferente do último fingerprint ou registro velho demais."""
+    return registro is None or registro['ip'] != ip or agora - registro['atualizado_em'] > idade_maxima
+
+
+def separar_para_fingerprint(conexao, macs_por_ip, agora=None, idade_maxima=IDADE_MAXIMA_FINGERPRINT):
+    """
+    Divide os hosts vivos entre os que precisam do scan detalhado e os que
+    podem reaproveitar o fingerprint salvo.
+    Retorna (ips_para_escanear, {ip: registro_em_cache}).
+    Hosts sem MAC conhecido não têm identidade estável e sempre são escaneados.
+    """
+    agora = int(agora if agora is not None else time.time())
+    salvos = carregar_fingerprints(conexao, macs_por_ip.values())
+    para_escanear = []
+    em_cache = {}
+    for ip, mac in macs_por_ip.items():
+        registro = salvos.get(mac)
+        if precisa_fingerprint(registro, ip, agora, idade_maxima):
+            para_escanear.append(ip)
+        else:
+            em_cache[ip] = registro
+    return para_escanear, em_cache
+
+
+def salvar_fingerprints(conexao, registros, agora=None):
+    """Grava [(mac, ip, hostname, os_guess, servicos, tipo)] (quem chama faz o commit)."""
+    agora = int(agora if agora is not None else time.time())
+    conexao.executemany(
+        "INSERT OR REPLACE INTO fingerprints (mac, ip, hostname, os_guess, servicos, tipo, atualizado_em) VALUES (?, ?, ?, ?, ?, ?, ?)",
+        [(mac, ip, hostname, os_guess, json.dumps(servicos), tipo, agora)
+         for mac, ip, hostname, os_guess, servicos, tipo in registros if mac and mac != 'N/A']
+    )
+
+
+# =======================================================
+#   SCAN DETALHADO EM LOTES PARALELOS
+#   Um host lento/filtrado só atrasa o próprio lote, e cada lote
+#   pode ser salvo assim que termina.
+# =======================================================
+
+def _para_formato_nmap(host):
+    """Converte o host do XML para o mesmo formato de dicionário do python-nmap."""
+    dados = {
+        'hostnames': [{'name': nome} for nome in host['hostnames']],
+        'osmatch': [{'name': nome} for nome in host['os']],
+    }
+    for servico in host['servicos']:
+        dados.setdefault(servico['protocolo'], {})[servico['porta']] = {
+            'state': 'open', 'name': servico['nome'], 'product': servico['produto']}
+    return dados
+
+
+def _scan_lote(ips, argumentos, timeout_lote, cancelar):
+    """
+    Roda o nmap em um lote e devolve {ip: dados_no_formato_python_nmap}.
+    Se o prazo do lote estourar ou a tarefa for cancelada, o nmap é encerrado
+    e os hosts que ele já tinha concluído são aproveitados.
+    """
+    with tempfile.TemporaryFile() as saida:
+        comando = ['nmap'] + shlex.split(argumentos) + ['-oX', '-'] + list(ips)
+        processo = subprocess.Popen(comando, stdout=saida, stderr=subprocess.DEVNULL)
+        prazo = time.monotonic() + timeout_lote
+        while True:
+            try:
+                processo.wait(timeout=0.5)
+                break
+            except subprocess.TimeoutExpired:
+                if cancelar.is_set() or time.monotonic() > prazo:
+                    processo.kill()
+                    processo.wait()
+                    break
+        saida.seek(0)
+        return {host['ip']: _para_formato_nmap(host) for host in ler_hosts_xml(saida.read())}
+
+
+def fingerprint_em_lotes(ips, argumentos='-sV -O -T4', tamanho_lote=TAMANHO_LOTE_FINGERPRINT,
+                         max_paralelo=MAX_LOTES_FINGERPRINT, timeout_lote=TIMEOUT_LOTE_FINGERPRINT,
+                         timeout_host=TIMEOUT_HOST_FINGERPRINT, cancelar=None):
+    """
+    Divide os IPs em lotes e roda o scan detalhado de até `max_paralelo` lotes ao mesmo tempo.
+    Produz (ips_do_lote, {ip: dados}) conforme cada lote termina; `cancelar`
+    (threading.Event) interrompe os lotes em andamento e descarta os que ainda não começaram.
+    """
+    ips = list(ips)
+    if not ips:
+        return
+    cancelar = cancelar if cancelar is not None else threading.Event()
+    argumentos = f"{argumentos} --host-timeout {timeout_host}s"
+    lotes = [ips[i:i + tamanho_lote] for i in range(0, len(ips), tamanho_lote)]
+
+    with ThreadPoolExecutor(max_workers=min(max_paralelo, len(lotes)), thread_name_prefix='fingerprint') as pool:
+        futuros = {pool.submit(_scan_lote, lote, argumentos, timeout_lote, cancelar): lote for lote in lotes}
+        try:
+            for futuro in as_completed(futuros):
+                lote = futuros[futuro]
+                try:
+                    dados = futuro.result()
+                except Exception as e:
+                    print(f"ERRO no lote detalhado {lote[0]}..{lote[-1]}: {e}")
+                    dados = {}
+                yield lote, dados
+                if cancelar.is_set():
+                    break
+        except BaseException:
+            # Ctrl+C ou quem consome parou no meio: derruba os nmaps em andamento
+            cancelar.set()
+            raise
+        finally:
+            # Lotes que ainda não começaram não rodam mais (cancelamento ou saída antecipada)
+            for futuro in futuros:
+                futuro.cancel()
@@ -0,0 +1,197 @@
+import datetime
+import time
+from collections import defaultdict
+
+# --- Configurações ---
+RETENCAO_EVENTOS_DIAS = 90   # Transições mais antigas são apagadas (depois de consolidadas)
+RETENCAO_HORAS_DIAS = 400    # Consolidação por hora; a diária é mantida para sempre
+BLOCO_CONSOLIDACAO = 24      # Horas consolidadas por passada (limita a memória)
+# ---------------------
+
+HORA = 3600
+
+
+# =======================================================
+#   HISTÓRICO DE STATUS (status_eventos)
+#   Cada transição Online/Offline de um ativo vira uma linha (ativo_id, ts, online).
+#   Gatilhos na ativos_online (migração 002) gravam as transições, então todo
+#   caminho que muda o status (scans da API, monitor, agendador, discovery,
+#   scripts CRUD) entra no histórico sem precisar chamar nada.
+# =======================================================
+
+def limpar_historico(conexao):
+    """Apaga todo o histórico (reset do inventário)."""
+    for tabela in ('status_eventos', 'disponibilidade_hora', 'disponibilidade_dia', 'historico_estado'):
+        conexao.execute(f"DELETE FROM {tabela}")
+
+
+def _estado(conexao, chave):
+    linha = conexao.execute("SELECT valor FROM historico_estado WHERE chave=?", (chave,)).fetchone()
+    return linha[0] if linha else None
+
+
+def _hora(ts):
+    return ts - ts % HORA
+
+
+def _dia_local(ts):
+    """Meia-noite (horário local) do dia de `ts`."""
+    return int(time.mktime(datetime.date.fromtimestamp(ts).timetuple()))
+
+
+def _estados_em(conexao, instante, ativo_id=None):
+    """{ativo_id: online} pelo último evento antes de `instante`."""
+    filtro = "AND ativo_id = ?" if ativo_id is not None else ""
+    parametros = (instante, ativo_id) if ativo_id is not None else (instante,)
+    # Com MAX(id), o SQLite devolve as outras colunas da mesma linha (o último evento)
+    linhas = conexao.execute(
+        f"SELECT ativo_id, online, MAX(id) FROM status_eventos WHERE ts < ? {filtro} GROUP BY ativo_id", parametros)
+    return {ativo: online for ativo, online, _ in linhas}
+
+
+def _eventos_entre(conexao, inicio, fim, ativo_id=None):
+    filtro = "AND ativo_id = ?" if ativo_id is not None else ""
+    parametros = (inicio, fim, ativo_id) if ativo_id is not None else (inicio, fim)
+    return conexao.execute(
+        f"SELECT ativo_id, ts, online FROM status_eventos WHERE ts >= ? AND ts < ? {filtro} ORDER BY ts, id",
+        parametros).fetchall()
+
+
+def segundos_online_por_hora(estados, eventos, inicio, fim):
+    """
+    Soma os segundos Online de cada ativo em cada hora de [inicio, fim).
+    `estados` = {ativo_id: online} no instante `inicio` (é atualizado para o estado em `fim`);
+    `eventos` = [(ativo_id, ts, online)] em ordem de ts.
+    Retorna {(ativo_id, hora): segundos}.
+    """
+    acumulado = defaultdict(int)
+
+    def somar(ativo, de, ate):
+        while de < ate:
+            proxima = min(_hora(de) + HORA, ate)
+            acumulado[(ativo, _hora(de))] += proxima - de
+            de = proxima
+
+    desde = dict.fromkeys(estados, inicio)
+    for ativo, ts, online in eventos:
+        if estados.get(ativo):
+            somar(ativo, desde[ativo], ts)
+        estados[ativo] = online
+        desde[ativo] = ts
+    for ativo, online in estados.items():
+        if online:
+            somar(ativo, desde[ativo], fim)
+    return acumulado
+
+
+# =======================================================
+#   CONSOLIDAÇÃO (por hora e por dia) E RETENÇÃO
+# =======================================================
+
+def _consolidar_dias(conexao, inicio, fim):
+    """Refaz a consolidação diária dos dias tocados por [inicio, fim) a partir da horária."""
+    dia_de = {}
+    por_dia = defaultdict(int)
+    for ativo, hora, segundos in conexao.execute(
+            "SELECT ativo_id, hora, segundos_online FROM disponibilidade_hora WHERE hora >= ? AND hora < ?",
+            (_dia_local(inicio), fim)):
+        if hora not in dia_de:
+            dia_de[hora] = _dia_local(hora)
+        por_dia[(ativo, dia_de[hora])] += segundos
+    conexao.executemany("INSERT OR REPLACE INTO disponibilidade_dia (ativo_id, dia, segundos_online) VALUES (?, ?, ?)",
+                        [(ativo, dia, segundos) for (ativo, dia), segundos in por_dia.items()])
+
+
+def consolidar(conexao, agora=None):
+    """
+    Consolida as horas completas ainda não consolidadas (segundos Online por
+    ativo, por hora e por dia). Quem chama faz o commit.
+    Retorna quantas horas foram consolidadas.
+    """
+    agora = int(agora if agora is not None else time.time())
+    fim = _hora(agora)
+    inicio = _estado(conexao, 'hora_consolidada')
+    if inicio is None:
+        primeiro = conexao.execute("SELECT MIN(ts) FROM status_eventos").fetchone()[0]
+        if primeiro is None:
+            return 0
+        inicio = _hora(primeiro)
+    if inicio >= fim:
+        return 0
+
+    estados = _estados_em(conexao, inicio)
+    for bloco in range(inicio, fim, BLOCO_CONSOLIDACAO * HORA):
+        fim_bloco = min(fim, bloco + BLOCO_CONSOLIDACAO * HORA)
+        acumulado = segundos_online_por_hora(estados, _eventos_entre(conexao, bloco, fim_bloco), bloco, fim_bloco)
+        conexao.executemany(
+            "INSERT OR REPLACE INTO disponibilidade_hora (ativo_id, hora, segundos_online) VALUES (?, ?, ?)",
+            [(ativo, hora, segundos) for (ativo, hora), segundos in acumulado.items()])
+        _consolidar_dias(conexao, bloco, fim_bloco)
+        conexao.execute("INSERT OR REPLACE INTO historico_estado (chave, valor) VALUES ('hora_consolidada', ?)",
+                        (fim_bloco,))
+    return (fim - inicio) // HORA
+
+
+def limpar_antigos(conexao, agora=None):
+    """
+    Aplica a retenção: eventos já consolidados com mais de RETENCAO_EVENTOS_DIAS
+    (o último de cada ativo fica, pois é o estado de partida) e horas com mais
+    de RETENCAO_HORAS_DIAS. Retorna quantos eventos foram apagados.
+    """
+    agora = int(agora if agora is not None else time.time())
+    consolidada = _estado(conexao, 'hora_consolidada')
+    if consolidada is None:
+        return 0
+    corte = min(agora - RETENCAO_EVENTOS_DIAS * 86400, consolidada)
+    apagados = conexao.execute('''
+        DELETE FROM status_eventos
+        WHERE ts < :corte
+          AND (id NOT IN (SELECT MAX(id) FROM status_eventos WHERE ts < :corte GROUP BY ativo_id)
+               OR ativo_id NOT IN (SELECT id FROM ativos_online))
+    ''', {'corte': corte}).rowcount
+    conexao.execute("DELETE FROM disponibilidade_hora WHERE hora < ?", (agora - RETENCAO_HORAS_DIAS * 86400,))
+    return apagados
+
+
+# =======================================================
+#   CONSULTA DE DISPONIBILIDADE
+# =======================================================
+
+def consultar_disponibilidade(conexao, ativo_id, inicio, fim, passo='dia', agora=None):
+    """
+    Segundos Online do ativo em [inicio, fim) por 'hora' ou por 'dia' (local).
+    O período consolidado vem das tabelas de consolidação; o resto (horas
+    ainda abertas) é calculado na hora a partir dos eventos do ativo.
+    Retorna {'pontos': [{ts, segundos_online}], 'segundos_online', 'percentual'}.
+    """
+    agora = int(agora if agora is not None else time.time())
+    alinhar = _dia_local if passo == 'dia' else _hora
+    inicio, fim = alinhar(inicio), min(fim, agora)
+    consolidada = _estado(conexao, 'hora_consolidada') or inicio
+
+    pontos = defaultdict(int)
+    if passo == 'dia':
+        linhas = conexao.execute(
+            "SELECT dia, segundos_online FROM disponibilidade_dia WHERE ativo_id=? AND dia >= ? AND dia < ?",
+            (ativo_id, inicio, min(fim, consolidada)))
+    else:
+        linhas = conexao.execute(
+            "SELECT hora, segundos_online FROM disponibilidade_hora WHERE ativo_id=? AND hora >= ? AND hora < ?",
+            (ativo_id, inicio, min(fim, consolidada)))
+    for ts, segundos in linhas:
+        pontos[ts] += segundos
+
+    aberto = max(inicio, consolidada)
+    if aberto < fim:
+        estados = _estados_em(conexao, aberto, ativo_id)
+        eventos = _eventos_entre(conexao, aberto, fim, ativo_id)
+        for (_, hora), segundos in segundos_online_por_hora(estados, eventos, aberto, fim).items():
+            pontos[alinhar(hora)] += segundos
+
+    total = sum(pontos.values())
+    duracao = max(1, fim - inicio)
+    return {
+        'pontos': [{'ts': ts, 'segundos_online': pontos[ts]} for ts in sorted(pontos)],
+        'segundos_online': total,
+        'percentual': round(100 * total / duracao, 2),
+    }
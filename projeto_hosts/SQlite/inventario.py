@@ -0,0 +1,217 @@
+# =======================================================
+#   ESCRITA DOS RESULTADOS DE SCAN NA TABELA ativos_online
+#   (todas as funções recebem a conexão; quem chama faz o commit)
+# =======================================================
+
+MAC_VALIDO = "mac_address IS NOT NULL AND mac_address != 'N/A'"
+
+UPSERT_POR_MAC = f"""
+    INSERT INTO ativos_online (nome, ip_address, mac_address, status, condicao, tipo, data_inicio)
+    VALUES (?, ?, ?, 'Online', 'Monitorado', ?, ?)
+    ON CONFLICT (mac_address) WHERE {MAC_VALIDO} DO UPDATE SET
+        nome = excluded.nome,
+        ip_address = excluded.ip_address,
+        tipo = excluded.tipo,
+        status = 'Online',
+        data_inicio = CASE WHEN ativos_online.status = 'Online' THEN ativos_online.data_inicio
+                           ELSE excluded.data_inicio END
+"""
+
+
+def _mac_valido(mac):
+    return bool(mac) and mac != 'N/A'
+
+
+class ComparadorInventario:
+    """
+    Compara os resultados do scan com o inventário carregado em memória e só
+    escreve as linhas que realmente mudaram. O data_inicio só é gravado quando
+    o ativo entra (novo ou voltando de Offline), então o tempo de uso não zera
+    a cada scan.
+    A identidade do ativo é o MAC (índice único, migração 002); o IP só identifica hosts
+    sem MAC conhecido. As escritas saem em lote (executemany): novos com MAC
+    por UPSERT (ON CONFLICT no MAC, caso outro processo já o tenha gravado),
+    já cadastrados por UPDATE no id.
+    Conta inseridos, alterados, inalterados e (em marcar_offline) quem saiu.
+    """
+
+    def __init__(self, conexao):
+        self.conexao = conexao
+        self.por_ip = {}
+        self.por_mac = {}
+        self.ativos = []
+        for id_ativo, ip, mac, nome, tipo, status in conexao.execute(
+                "SELECT id, ip_address, mac_address, nome, tipo, status FROM ativos_online ORDER BY id"):
+            ativo = {'id': id_ativo, 'ip': ip, 'mac': mac, 'nome': nome, 'tipo': tipo, 'status': status}
+            self.ativos.append(ativo)
+            if ip:
+                self.por_ip[ip] = ativo  # IP repetido: vale o ativo mais recente
+            if _mac_valido(mac):
+                self.por_mac[mac] = ativo
+        self.vistos = set()
+        self.ids_vistos = set()
+        self.inseridos = set()
+        self.alterados = set()
+        self.offline = 0
+
+    def _encontrar(self, ip, mac):
+        if _mac_valido(mac):
+            ativo = self.por_mac.get(mac)
+            if ativo is not None:
+                return ativo
+            # Mesmo IP, mas cadastrado sem MAC: é esse aparelho (o MAC será preenchido)
+            ativo = self.por_ip.get(ip)
+            return ativo if ativo is not None and not _mac_valido(ativo['mac']) else None
+        return self.por_ip.get(ip)
+
+    def _id_do_ip(self, ip):
+        # Ativo sem MAC inserido neste mesmo scan: o id só existe no banco
+        linha = self.conexao.execute(
+            "SELECT id FROM ativos_online WHERE ip_address=? ORDER BY id DESC LIMIT 1", (ip,)).fetchone()
+        return linha[0] if linha else None
+
+    def aplicar(self, hosts, data, manter_nome=False):
+        """
+        Aplica [(ip, mac, nome, tipo)] de hosts vistos Online agora
+        (quem chama faz o commit; cada chamada cabe em uma transação).
+        `manter_nome` não mexe no nome/tipo de quem já existe (etapa rápida
+        do discovery, antes do fingerprint definir o nome final).
+        """
+        upserts = []
+        inserir_sem_mac = []
+        atualizar_por_id = []
+        for ip, mac, nome, tipo in hosts:
+            self.vistos.add(ip)
+            ativo = self._encontrar(ip, mac)
+            if ativo is None:
+                ativo = {'id': None, 'ip': ip, 'mac': mac, 'nome': nome, 'tipo': tipo, 'status': 'Online'}
+                self.ativos.append(ativo)
+                self.por_ip[ip] = ativo
+                if _mac_valido(mac):
+                    self.por_mac[mac] = ativo
+                    upserts.append((nome, ip, mac, tipo, data))
+                else:
+                    inserir_sem_mac.append((nome, ip, mac, tipo, data))
+                self.inseridos.add(ip)
+                continue
+
+            if ativo['id'] is not None:
+                self.ids_vistos.add(ativo['id'])
+            if manter_nome:
+                nome, tipo = ativo['nome'], ativo['tipo']
+            preencher_mac = _mac_valido(mac) and not _mac_valido(ativo['mac'])
+            voltou = ativo['status'] != 'Online'
+            if not (voltou or preencher_mac or ativo['nome'] != nome or ativo['tipo'] != tipo or ativo['ip'] != ip):
+                continue
+
+            if ativo['ip'] != ip:
+                # O DHCP deu outro IP ao aparelho
+                self.por_ip[ip] = ativo
+            if preencher_mac:
+                self.por_mac[mac] = ativo
+            mac_final = mac if preencher_mac else ativo['mac']
+            inicio = data if voltou else None
+            ativo.update({'status': 'Online', 'nome': nome, 'tipo': tipo, 'ip': ip, 'mac': mac_final})
+
+            if ativo['id'] is not None:
+                atualizar_por_id.append((nome, ip, mac_final, tipo, inicio, ativo['id']))
+            elif _mac_valido(mac_final):
+                # Inserido neste mesmo scan: o MAC acha a linha
+                upserts.append((nome, ip, mac_final, tipo, data))
+            else:
+                atualizar_por_id.append((nome, ip, mac_final, tipo, inicio, self._id_do_ip(ip)))
+            if ip not in self.inseridos:
+                self.alterados.add(ip)
+
+        if upserts:
+            self.conexao.executemany(UPSERT_POR_MAC, upserts)
+        if inserir_sem_mac:
+            self.conexao.executemany(
+                "INSERT INTO ativos_online (nome, ip_address, mac_address, status, condicao, tipo, data_inicio) VALUES (?, ?, ?, 'Online', 'Monitorado', ?, ?)",
+                inserir_sem_mac
+            )
+        if atualizar_por_id:
+            self.conexao.executemany(
+                """UPDATE ativos_online
+                   SET nome=?, ip_address=?, mac_address=?, tipo=?, status='Online', data_inicio=COALESCE(?, data_inicio)
+                   WHERE id=?""",
+                atualizar_por_id
+            )
+
+    def marcar_offline(self, ips_preservados=()):
+        """Marca Offline quem estava Online e não foi visto (nem está em `ips_preservados`)."""
+        ips_preservados = set(ips_preservados)
+        saiu = [ativo for ativo in self.ativos
+                if ativo['id'] is not None and ativo['status'] == 'Online'
+                and ativo['id'] not in self.ids_vistos and ativo['ip'] not in ips_preservados]
+        self.conexao.executemany("UPDATE ativos_online SET status='Offline' WHERE id=? AND status='Online'",
+                                 [(ativo['id'],) for ativo in saiu])
+        for ativo in saiu:
+            ativo['status'] = 'Offline'
+        self.offline += len(saiu)
+        return self.offline
+
+    @property
+    def contagem(self):
+        """Contagem por host do scan (um host alterado em duas etapas conta uma vez)."""
+        return {
+            'inseridos': len(self.inseridos),
+            'alterados': len(self.alterados),
+            'inalterados': len(self.vistos - self.inseridos - self.alterados),
+            'offline': self.offline,
+        }
+
+    def resumo(self):
+        c = self.contagem
+        return (f"{c['inseridos']} novos, {c['alterados']} alterados, "
+                f"{c['inalterados']} sem mudança, {c['offline']} ficaram Offline")
+
+
+def _carregar_ips_vistos(conexao, ips):
+    """Carrega os IPs na tabela temporária ips_vistos (evita o limite de parâmetros do SQLite)."""
+    conexao.execute("CREATE TEMP TABLE IF NOT EXISTS ips_vistos (ip TEXT PRIMARY KEY)")
+    conexao.execute("DELETE FROM ips_vistos")
+    conexao.executemany("INSERT OR IGNORE INTO ips_vistos (ip) VALUES (?)", ((ip,) for ip in ips))
+
+
+def marcar_online(conexao, ips_online):
+    """Marca como Online os ativos cujos IPs estão em `ips_online`."""
+    _carregar_ips_vistos(conexao, ips_online)
+    cursor = conexao.execute(
+        "UPDATE ativos_online SET status='Online' WHERE status IS NOT 'Online' AND ip_address IN (SELECT ip FROM ips_vistos)"
+    )
+    conexao.execute("DELETE FROM ips_vistos")
+    return cursor.rowcount
+
+
+def marcar_offline_exceto(conexao, ips_online):
+    """
+    Marca como Offline os ativos Online que não estão em `ips_online`.
+    Retorna quantos ativos mudaram para Offline.
+    """
+    _carregar_ips_vistos(conexao, ips_online)
+    cursor = conexao.execute(
+        "UPDATE ativos_online SET status='Offline' WHERE status='Online' AND ip_address NOT IN (SELECT ip FROM ips_vistos)"
+    )
+    conexao.execute("DELETE FROM ips_vistos")
+    return cursor.rowcount
+
+
+def atualizar_macs(conexao, macs_por_ip):
+    """
+    Preenche o MAC dos ativos que ainda estão sem (N/A) a partir de {ip: mac}.
+    Retorna quantos ativos foram atualizados.
+    """
+    # MAC que já pertence a outro ativo não é copiado (identidade única por MAC)
+    cursor = conexao.executemany(
+        """UPDATE ativos_online SET mac_address=?
+           WHERE ip_address=? AND (mac_address IS NULL OR mac_address='N/A')
+             AND NOT EXISTS (SELECT 1 FROM ativos_online WHERE mac_address=?)""",
+        [(mac, ip, mac) for ip, mac in macs_por_ip.items() if mac and mac != 'N/A']
+    )
+    return cursor.rowcount
+
+
+def ips_cadastrados(conexao):
+    """IPs de todos os ativos do inventário."""
+    return {ip for ip, in conexao.execute("SELECT ip_address FROM ativos_online WHERE ip_address IS NOT NULL")}
@@ -0,0 +1,62 @@
+import time
+
+# --- Configurações ---
+RETENCAO_DIAS = 30         # Amostras mais antigas são apagadas pelo monitor
+MAX_PONTOS_PADRAO = 1000   # Pontos devolvidos pela API quando o passo não é informado
+# ---------------------
+
+
+# =======================================================
+#   SÉRIE DE LATÊNCIA (RTT) POR ATIVO (tabela latencia, migração 008)
+#   Tabela estreita e sem rowid: a chave (ativo_id, ts) é o próprio
+#   índice, então a consulta de uma janela lê só as páginas daquele ativo.
+# =======================================================
+
+def registrar_amostras(conexao, amostras, agora=None):
+    """
+    Grava [(ativo_id, rtt_em_segundos ou None)] no instante `agora`
+    (None = sem resposta). Quem chama faz o commit.
+    """
+    agora = int(agora if agora is not None else time.time())
+    conexao.executemany(
+        "INSERT OR REPLACE INTO latencia (ativo_id, ts, rtt_us) VALUES (?, ?, ?)",
+        [(ativo_id, agora, None if rtt is None else int(rtt * 1_000_000)) for ativo_id, rtt in amostras]
+    )
+
+
+def _ms(rtt_us):
+    return None if rtt_us is None else round(rtt_us / 1000, 3)
+
+
+def consultar_serie(conexao, ativo_id, inicio, fim, passo=None):
+    """
+    Série do ativo entre `inicio` e `fim` (epoch, segundos).
+    Sem `passo`: amostras brutas [{ts, rtt_ms}].
+    Com `passo`: uma linha por intervalo de `passo` segundos com média, mínimo,
+    máximo, quantidade de amostras e de perdas.
+    """
+    if not passo:
+        linhas = conexao.execute(
+            "SELECT ts, rtt_us FROM latencia WHERE ativo_id = ? AND ts BETWEEN ? AND ? ORDER BY ts",
+            (ativo_id, inicio, fim))
+        return [{'ts': ts, 'rtt_ms': _ms(rtt_us)} for ts, rtt_us in linhas]
+
+    linhas = conexao.execute('''
+        SELECT (ts / ?) * ? AS bloco, AVG(rtt_us), MIN(rtt_us), MAX(rtt_us), COUNT(*), COUNT(*) - COUNT(rtt_us)
+        FROM latencia
+        WHERE ativo_id = ? AND ts BETWEEN ? AND ?
+        GROUP BY bloco ORDER BY bloco
+    ''', (passo, passo, ativo_id, inicio, fim))
+    return [{'ts': bloco, 'media_ms': _ms(media), 'min_ms': _ms(minimo), 'max_ms': _ms(maximo),
+             'amostras': total, 'perdas': perdas}
+            for bloco, media, minimo, maximo, total, perdas in linhas]
+
+
+def passo_para(inicio, fim, max_pontos=MAX_PONTOS_PADRAO):
+    """Menor passo (em segundos) que mantém a janela em até `max_pontos` pontos."""
+    return max(1, -(-(fim - inicio) // max_pontos))
+
+
+def limpar_antigas(conexao, dias=RETENCAO_DIAS, agora=None):
+    agora = int(agora if agora is not None else time.time())
+    return conexao.execute("DELETE FROM latencia WHERE ts < ?", (agora - dias * 86400,)).rowcount
@@ -0,0 +1,90 @@
+import time
+
+import alertas # Log de alertas (poda)
+import historico # Consolidação da disponibilidade e retenção dos eventos
+import latencia # Retenção da série de RTT
+from banco import conectar
+
+# --- Configurações ---
+INTERVALO_MANUTENCAO = 3600 # Segundos entre as limpezas (latência, histórico, alertas, cache de nomes) e a consolidação da disponibilidade
+# ---------------------
+
+
+# =======================================================
+#   MANUTENÇÃO PERIÓDICA DO BANCO
+#   Chamada pelos dois laços de verificação (monitor.py e a thread de
+#   fundo da api.py), então rodar só um deles já mantém as tabelas
+#   de série/histórico dentro da retenção.
+# =======================================================
+
+def limpar_latencia_antiga():
+    conexao = None
+    try:
+        conexao = conectar()
+        with conexao:
+            apagadas = latencia.limpar_antigas(conexao)
+        if apagadas:
+            print(f"{apagadas} amostras de latência com mais de {latencia.RETENCAO_DIAS} dias apagadas.")
+    except Exception as e:
+        print(f"Erro ao limpar a latência antiga: {e}")
+    finally:
+        if conexao:
+            conexao.close()
+
+def consolidar_historico():
+    conexao = None
+    try:
+        conexao = conectar()
+        with conexao:
+            horas = historico.consolidar(conexao)
+            apagados = historico.limpar_antigos(conexao)
+        if horas:
+            print(f"Disponibilidade consolidada ({horas} hora(s)); {apagados} eventos de status antigos apagados.")
+    except Exception as e:
+        print(f"Erro ao consolidar o histórico de status: {e}")
+    finally:
+        if conexao:
+            conexao.close()
+
+def podar_alertas():
+    conexao = None
+    try:
+        conexao = conectar()
+        apagados = alertas.podar(conexao)
+        if apagados:
+            print(f"{apagados} alertas antigos apagados (retenção de {alertas.RETENCAO_ALERTAS_DIAS} dias / {alertas.MAX_ALERTAS} alertas).")
+    except Exception as e:
+        print(f"Erro ao podar os alertas: {e}")
+    finally:
+        if conexao:
+            conexao.close()
+
+def limpar_nomes_expirados():
+    # Importado aqui: resolucao traz o getmac e o NetBIOS, que o monitor não usa para mais nada
+    from resolucao import limpar_cache_expirado
+    conexao = None
+    try:
+        conexao = conectar()
+        with conexao:
+            apagados = limpar_cache_expirado(conexao)
+        if apagados:
+            print(f"{apagados} nomes expirados apagados do cache de resolução.")
+    except Exception as e:
+        print(f"Erro ao limpar o cache de nomes: {e}")
+    finally:
+        if conexao:
+            conexao.close()
+
+def executar():
+    """Roda todas as tarefas de manutenção (cada uma trata e informa os próprios erros)."""
+    limpar_latencia_antiga()
+    consolidar_historico()
+    podar_alertas()
+    limpar_nomes_expirados()
+
+def executar_se_vencida(ultima_manutencao):
+    """Roda a manutenção se já passou INTERVALO_MANUTENCAO desde `ultima_manutencao`; retorna o novo horário."""
+    if time.time() - ultima_manutencao < INTERVALO_MANUTENCAO:
+        return ultima_manutencao
+    executar()
+    return time.time()
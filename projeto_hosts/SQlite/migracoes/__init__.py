@@ -0,0 +1,129 @@
+import importlib
+import pkgutil
+import re
+import time
+
+from banco import conectar
+
+# --- Configurações ---
+TAMANHO_LOTE_PREENCHIMENTO = 500  # Linhas por transação nos preenchimentos (backfill)
+# ---------------------
+
+
+# =======================================================
+#   MIGRAÇÕES VERSIONADAS DO ESQUEMA
+#   Cada módulo mNNN_descricao.py desta pasta é um passo, aplicado em ordem:
+#     DESCRICAO          texto curto
+#     aplicar(conexao)   mudanças de esquema (rodam todas em UMA transação)
+#     preencher(conexao, limite)   opcional: converte dados em lotes pequenos
+#                        (cada lote em sua transação); retorna quantas linhas
+#                        tratou e 0 quando não há mais nada a fazer.
+#   A tabela schema_version guarda o que já foi aplicado e preenchido.
+# =======================================================
+
+_NOME_MIGRACAO = re.compile(r'^m(\d+)_')
+_migracoes = None
+
+
+def listar_migracoes():
+    """[(versao, modulo)] de todas as migrações, em ordem de versão."""
+    global _migracoes
+    if _migracoes is None:
+        encontradas = []
+        for info in pkgutil.iter_modules(__path__):
+            numero = _NOME_MIGRACAO.match(info.name)
+            if numero:
+                encontradas.append((int(numero.group(1)), importlib.import_module(f'{__name__}.{info.name}')))
+        _migracoes = sorted(encontradas, key=lambda migracao: migracao[0])
+    return _migracoes
+
+
+def _criar_tabela_versao(conexao):
+    conexao.execute('''
+    CREATE TABLE IF NOT EXISTS schema_version (
+        versao INTEGER PRIMARY KEY,
+        descricao TEXT,
+        aplicada_em INTEGER NOT NULL,
+        preenchida_em INTEGER
+    )
+    ''')
+
+
+def versao_atual(conexao):
+    _criar_tabela_versao(conexao)
+    return conexao.execute("SELECT COALESCE(MAX(versao), 0) FROM schema_version").fetchone()[0]
+
+
+def aplicar_pendentes(conexao):
+    """
+    Aplica, em uma única transação, as migrações com versão acima da atual.
+    Se qualquer passo falhar, nada é aplicado. Retorna as versões aplicadas.
+    """
+    atual = versao_atual(conexao)
+    conexao.commit()
+    pendentes = [(versao, modulo) for versao, modulo in listar_migracoes() if versao > atual]
+    if not pendentes:
+        return []
+
+    agora = int(time.time())
+    conexao.execute("BEGIN IMMEDIATE")
+    try:
+        # Outro processo pode ter migrado enquanto esperávamos a trava
+        atual = conexao.execute("SELECT COALESCE(MAX(versao), 0) FROM schema_version").fetchone()[0]
+        pendentes = [(versao, modulo) for versao, modulo in pendentes if versao > atual]
+        for versao, modulo in pendentes:
+            modulo.aplicar(conexao)
+            conexao.execute(
+                "INSERT INTO schema_version (versao, descricao, aplicada_em, preenchida_em) VALUES (?, ?, ?, ?)",
+                (versao, getattr(modulo, 'DESCRICAO', None), agora,
+                 None if hasattr(modulo, 'preencher') else agora))
+        conexao.commit()
+    except BaseException:
+        conexao.rollback()
+        raise
+    for versao, modulo in pendentes:
+        print(f"Migração {versao:03d} aplicada: {getattr(modulo, 'DESCRICAO', modulo.__name__)}")
+    return [versao for versao, _ in pendentes]
+
+
+def preencher_pendentes(conexao, progresso=None, tamanho_lote=TAMANHO_LOTE_PREENCHIMENTO):
+    """
+    Roda os preenchimentos (backfill) ainda não concluídos, lote a lote, com
+    um commit por lote: o banco nunca fica travado mais que um lote.
+    Retorna quantas linhas foram tratadas.
+    """
+    modulos = dict(listar_migracoes())
+    pendentes = [versao for versao, in conexao.execute(
+        "SELECT versao FROM schema_version WHERE preenchida_em IS NULL ORDER BY versao")]
+    total = 0
+    for versao in pendentes:
+        modulo = modulos.get(versao)
+        if progresso: progresso(fase=f'preenchendo_{versao:03d}')
+        while modulo is not None:
+            with conexao:
+                tratadas = modulo.preencher(conexao, tamanho_lote)
+            if not tratadas:
+                break
+            total += tratadas
+            if progresso: progresso(hosts_processados=total)
+        with conexao:
+            conexao.execute("UPDATE schema_version SET preenchida_em=? WHERE versao=?", (int(time.time()), versao))
+    if total:
+        print(f"Preenchimento das migrações concluído ({total} linhas).")
+    return total
+
+
+def migrar(preencher=True):
+    """
+    Ponto único de entrada (API, monitor, scripts): aplica o que falta do
+    esquema e, se `preencher`, os preenchimentos pendentes.
+    Sem nada pendente, custa duas consultas.
+    """
+    conexao = conectar(row_factory=None)
+    try:
+        aplicadas = aplicar_pendentes(conexao)
+        if preencher:
+            preencher_pendentes(conexao)
+        return aplicadas
+    finally:
+        conexao.close()
@@ -0,0 +1,41 @@
+DESCRICAO = "Tabelas base (usuarios, ativos_online, alertas) no formato único"
+
+# Colunas que bancos antigos podem não ter: cada script criava a
+# ativos_online de um jeito (sem tipo, sem data_inicio, com tempo_de_uso...)
+COLUNAS_ATIVOS = (
+    ('status', 'TEXT'),
+    ('condicao', 'TEXT'),
+    ('data_inicio', 'TEXT'),
+    ('tipo', 'TEXT'),
+)
+COLUNAS_USUARIOS = (
+    ('email', 'TEXT'),
+    ('senha', 'TEXT'),
+)
+
+
+def _adicionar_colunas(conexao, tabela, colunas):
+    existentes = {coluna[1] for coluna in conexao.execute(f"PRAGMA table_info({tabela})")}
+    for nome, tipo in colunas:
+        if nome not in existentes:
+            conexao.execute(f"ALTER TABLE {tabela} ADD COLUMN {nome} {tipo}")
+
+
+def aplicar(conexao):
+    conexao.execute("CREATE TABLE IF NOT EXISTS usuarios (id INTEGER PRIMARY KEY AUTOINCREMENT, nome TEXT, email TEXT, senha TEXT)")
+    conexao.execute('''
+    CREATE TABLE IF NOT EXISTS ativos_online (
+        id INTEGER PRIMARY KEY AUTOINCREMENT,
+        nome TEXT,
+        ip_address TEXT,
+        mac_address TEXT,
+        status TEXT,
+        condicao TEXT,
+        data_inicio TEXT,
+        tipo TEXT
+    )
+    ''')
+    conexao.execute("CREATE TABLE IF NOT EXISTS alertas (id INTEGER PRIMARY KEY AUTOINCREMENT, data_hora TEXT, tipo_alerta TEXT, mensagem TEXT)")
+
+    _adicionar_colunas(conexao, 'ativos_online', COLUNAS_ATIVOS)
+    _adicionar_colunas(conexao, 'usuarios', COLUNAS_USUARIOS)
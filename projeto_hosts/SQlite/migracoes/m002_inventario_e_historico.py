@@ -0,0 +1,91 @@
+DESCRICAO = "Índices do inventário (IP e MAC único) e histórico de status"
+
+# SQL congelado: uma migração aplicada não pode mudar junto com inventario.py/historico.py
+MAC_VALIDO = "mac_address IS NOT NULL AND mac_address != 'N/A'"
+AGORA_SQL = "CAST(strftime('%s', 'now') AS INTEGER)"
+
+
+def _criar_indices_inventario(conexao):
+    """
+    Índice por IP e identidade única por MAC (índice parcial: MACs 'N/A' não contam).
+    MACs repetidos de antes do índice ficam só no ativo mais recente; os outros viram 'N/A'.
+    """
+    conexao.execute("CREATE INDEX IF NOT EXISTS idx_ativos_ip ON ativos_online (ip_address)")
+    repetidos = conexao.execute(
+        f"SELECT mac_address, MAX(id) FROM ativos_online WHERE {MAC_VALIDO} GROUP BY mac_address HAVING COUNT(*) > 1"
+    ).fetchall()
+    for mac, manter in repetidos:
+        conexao.execute("UPDATE ativos_online SET mac_address='N/A' WHERE mac_address=? AND id != ?", (mac, manter))
+    if repetidos:
+        print(f"Aviso: {len(repetidos)} MACs repetidos no inventário; mantido só o ativo mais recente de cada um.")
+    conexao.execute(f"CREATE UNIQUE INDEX IF NOT EXISTS idx_ativos_mac_unico ON ativos_online (mac_address) WHERE {MAC_VALIDO}")
+
+
+def _criar_tabelas_historico(conexao):
+    """Tabelas, gatilhos e ponto de partida (status atual de cada ativo) do histórico."""
+    # Bancos de antes das migrações podem já ter o histórico (e os eventos dele)
+    ja_existia = conexao.execute(
+        "SELECT 1 FROM sqlite_master WHERE type='trigger' AND name='trg_status_update'").fetchone()
+    conexao.execute('''
+    CREATE TABLE IF NOT EXISTS status_eventos (
+        id INTEGER PRIMARY KEY,
+        ativo_id INTEGER NOT NULL,
+        ts INTEGER NOT NULL,
+        online INTEGER NOT NULL
+    )
+    ''')
+    conexao.execute("CREATE INDEX IF NOT EXISTS idx_status_eventos_ativo ON status_eventos (ativo_id, ts)")
+    conexao.execute("CREATE INDEX IF NOT EXISTS idx_status_eventos_ts ON status_eventos (ts)")
+    conexao.execute('''
+    CREATE TABLE IF NOT EXISTS disponibilidade_hora (
+        ativo_id INTEGER NOT NULL,
+        hora INTEGER NOT NULL,
+        segundos_online INTEGER NOT NULL,
+        PRIMARY KEY (ativo_id, hora)
+    ) WITHOUT ROWID
+    ''')
+    conexao.execute('''
+    CREATE TABLE IF NOT EXISTS disponibilidade_dia (
+        ativo_id INTEGER NOT NULL,
+        dia INTEGER NOT NULL,
+        segundos_online INTEGER NOT NULL,
+        PRIMARY KEY (ativo_id, dia)
+    ) WITHOUT ROWID
+    ''')
+    conexao.execute("CREATE TABLE IF NOT EXISTS historico_estado (chave TEXT PRIMARY KEY, valor INTEGER)")
+
+    # Gatilhos na ativos_online: todo caminho que muda o status entra no histórico
+    conexao.execute(f'''
+    CREATE TRIGGER IF NOT EXISTS trg_status_insert AFTER INSERT ON ativos_online
+    BEGIN
+        INSERT INTO status_eventos (ativo_id, ts, online)
+        VALUES (NEW.id, {AGORA_SQL}, NEW.status IS 'Online');
+    END
+    ''')
+    conexao.execute(f'''
+    CREATE TRIGGER IF NOT EXISTS trg_status_delete AFTER DELETE ON ativos_online
+    WHEN OLD.status IS 'Online'
+    BEGIN
+        INSERT INTO status_eventos (ativo_id, ts, online)
+        VALUES (OLD.id, {AGORA_SQL}, 0);
+    END
+    ''')
+    if not ja_existia:
+        # Sem histórico anterior: o status atual de cada ativo é o ponto de partida
+        conexao.execute(f'''
+            INSERT INTO status_eventos (ativo_id, ts, online)
+            SELECT id, {AGORA_SQL}, status IS 'Online' FROM ativos_online
+        ''')
+    conexao.execute(f'''
+    CREATE TRIGGER IF NOT EXISTS trg_status_update AFTER UPDATE OF status ON ativos_online
+    WHEN (NEW.status IS 'Online') != (OLD.status IS 'Online')
+    BEGIN
+        INSERT INTO status_eventos (ativo_id, ts, online)
+        VALUES (NEW.id, {AGORA_SQL}, NEW.status IS 'Online');
+    END
+    ''')
+
+
+def aplicar(conexao):
+    _criar_indices_inventario(conexao)
+    _criar_tabelas_historico(conexao)
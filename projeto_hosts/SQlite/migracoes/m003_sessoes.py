@@ -0,0 +1,105 @@
+import datetime
+import time
+
+DESCRICAO = "Sessões Online por ativo (epoch) e data_inicio em formato único"
+
+# Formatos que já foram gravados em data_inicio (além do ISO)
+FORMATOS_ANTIGOS = ('%d/%m/%Y %H:%M:%S', '%d/%m/%Y %H:%M', '%d/%m/%Y')
+AGORA_SQL = "CAST(strftime('%s', 'now') AS INTEGER)"
+
+
+def aplicar(conexao):
+    conexao.execute('''
+    CREATE TABLE IF NOT EXISTS sessoes (
+        id INTEGER PRIMARY KEY,
+        ativo_id INTEGER NOT NULL,
+        inicio INTEGER NOT NULL,
+        fim INTEGER
+    )
+    ''')
+    conexao.execute("CREATE INDEX IF NOT EXISTS idx_sessoes_ativo ON sessoes (ativo_id, inicio)")
+    conexao.execute("CREATE INDEX IF NOT EXISTS idx_sessoes_abertas ON sessoes (ativo_id) WHERE fim IS NULL")
+
+    # As sessões abrem e fecham junto com o status, seja quem for que o mude
+    conexao.execute(f'''
+    CREATE TRIGGER IF NOT EXISTS trg_sessao_novo AFTER INSERT ON ativos_online
+    WHEN NEW.status IS 'Online'
+    BEGIN
+        INSERT INTO sessoes (ativo_id, inicio) VALUES (NEW.id, {AGORA_SQL});
+    END
+    ''')
+    conexao.execute(f'''
+    CREATE TRIGGER IF NOT EXISTS trg_sessao_abre AFTER UPDATE OF status ON ativos_online
+    WHEN NEW.status IS 'Online' AND OLD.status IS NOT 'Online'
+    BEGIN
+        INSERT INTO sessoes (ativo_id, inicio) VALUES (NEW.id, {AGORA_SQL});
+    END
+    ''')
+    conexao.execute(f'''
+    CREATE TRIGGER IF NOT EXISTS trg_sessao_fecha AFTER UPDATE OF status ON ativos_online
+    WHEN OLD.status IS 'Online' AND NEW.status IS NOT 'Online'
+    BEGIN
+        UPDATE sessoes SET fim = {AGORA_SQL} WHERE ativo_id = NEW.id AND fim IS NULL;
+    END
+    ''')
+    conexao.execute(f'''
+    CREATE TRIGGER IF NOT EXISTS trg_sessao_excluido AFTER DELETE ON ativos_online
+    BEGIN
+        UPDATE sessoes SET fim = {AGORA_SQL} WHERE ativo_id = OLD.id AND fim IS NULL;
+    END
+    ''')
+
+
+def para_epoch(texto):
+    """Converte um data_inicio antigo (ISO, dd/mm/aaaa [hh:mm[:ss]] ou epoch) em epoch; None se não der."""
+    if texto is None:
+        return None
+    texto = str(texto).strip()
+    if texto.isdigit():
+        return int(texto)
+    try:
+        return int(datetime.datetime.fromisoformat(texto).timestamp())
+    except ValueError:
+        pass
+    for formato in FORMATOS_ANTIGOS:
+        try:
+            return int(datetime.datetime.strptime(texto, formato).timestamp())
+        except ValueError:
+            continue
+    return None
+
+
+def preencher(conexao, limite):
+    """
+    Lote de até `limite` ativos que ainda têm data_inicio fora do ISO ou estão
+    Online sem sessão aberta: grava data_inicio em ISO (ou NULL, se ilegível)
+    e abre a sessão dos Online a partir dele.
+    """
+    linhas = conexao.execute('''
+        SELECT id, status, data_inicio FROM ativos_online a
+        WHERE (data_inicio IS NOT NULL
+               AND data_inicio NOT GLOB '[0-9][0-9][0-9][0-9]-[0-9][0-9]-[0-9][0-9]T*')
+           OR (status IS 'Online'
+               AND NOT EXISTS (SELECT 1 FROM sessoes s WHERE s.ativo_id = a.id AND s.fim IS NULL))
+        LIMIT ?
+    ''', (limite,)).fetchall()
+
+    agora = int(time.time())
+    datas = []
+    sessoes = []
+    for id_ativo, status, data_inicio in linhas:
+        inicio = para_epoch(data_inicio)
+        if inicio is not None and inicio > agora:
+            inicio = None
+        iso = datetime.datetime.fromtimestamp(inicio).isoformat() if inicio is not None else None
+        if iso != data_inicio:
+            datas.append((iso, id_ativo))
+        if status == 'Online':
+            sessoes.append((id_ativo, inicio if inicio is not None else agora))
+
+    conexao.executemany("UPDATE ativos_online SET data_inicio=? WHERE id=?", datas)
+    conexao.executemany('''
+        INSERT INTO sessoes (ativo_id, inicio)
+        SELECT ?, ? WHERE NOT EXISTS (SELECT 1 FROM sessoes WHERE ativo_id = ? AND fim IS NULL)
+    ''', [(id_ativo, inicio, id_ativo) for id_ativo, inicio in sessoes])
+    return len(linhas)
@@ -0,0 +1,22 @@
+from migracoes.m003_sessoes import para_epoch
+
+DESCRICAO = "Alertas com ts (epoch) e ativo_id indexados"
+
+
+def aplicar(conexao):
+    existentes = {coluna[1] for coluna in conexao.execute("PRAGMA table_info(alertas)")}
+    if 'ts' not in existentes:
+        conexao.execute("ALTER TABLE alertas ADD COLUMN ts INTEGER")
+    if 'ativo_id' not in existentes:
+        conexao.execute("ALTER TABLE alertas ADD COLUMN ativo_id INTEGER")
+    conexao.execute("CREATE INDEX IF NOT EXISTS idx_alertas_ts ON alertas (ts)")
+    conexao.execute("CREATE INDEX IF NOT EXISTS idx_alertas_tipo ON alertas (tipo_alerta, id)")
+    conexao.execute("CREATE INDEX IF NOT EXISTS idx_alertas_ativo ON alertas (ativo_id, id)")
+
+
+def preencher(conexao, limite):
+    """Converte o data_hora (texto) dos alertas antigos em ts; ilegível vira 0 (sai na primeira poda)."""
+    linhas = conexao.execute("SELECT id, data_hora FROM alertas WHERE ts IS NULL LIMIT ?", (limite,)).fetchall()
+    conexao.executemany("UPDATE alertas SET ts=? WHERE id=?",
+                        [(para_epoch(data_hora) or 0, id_alerta) for id_alerta, data_hora in linhas])
+    return len(linhas)
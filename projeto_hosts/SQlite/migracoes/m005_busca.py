@@ -0,0 +1,41 @@
+DESCRICAO = "Índice de busca FTS5 (trigram) sobre nome, IP, MAC, tipo e condição"
+
+COLUNAS = "nome, ip_address, mac_address, tipo, condicao"
+
+
+def aplicar(conexao):
+    # Tabela de conteúdo externo: o índice guarda só os trigramas, o texto fica na ativos_online
+    conexao.execute(f'''
+    CREATE VIRTUAL TABLE IF NOT EXISTS ativos_busca USING fts5(
+        {COLUNAS}, content='ativos_online', content_rowid='id', tokenize='trigram'
+    )
+    ''')
+    # Pesos do ranking (bm25): o nome vale mais que IP/MAC, que valem mais que tipo/condição
+    conexao.execute("INSERT INTO ativos_busca (ativos_busca, rank) VALUES ('rank', 'bm25(10.0, 5.0, 5.0, 2.0, 1.0)')")
+
+    conexao.execute(f'''
+    CREATE TRIGGER IF NOT EXISTS trg_busca_insert AFTER INSERT ON ativos_online
+    BEGIN
+        INSERT INTO ativos_busca (rowid, {COLUNAS})
+        VALUES (NEW.id, NEW.nome, NEW.ip_address, NEW.mac_address, NEW.tipo, NEW.condicao);
+    END
+    ''')
+    conexao.execute(f'''
+    CREATE TRIGGER IF NOT EXISTS trg_busca_delete AFTER DELETE ON ativos_online
+    BEGIN
+        INSERT INTO ativos_busca (ativos_busca, rowid, {COLUNAS})
+        VALUES ('delete', OLD.id, OLD.nome, OLD.ip_address, OLD.mac_address, OLD.tipo, OLD.condicao);
+    END
+    ''')
+    # Só as colunas indexadas: as trocas de status (as escritas mais frequentes) não mexem no índice
+    conexao.execute(f'''
+    CREATE TRIGGER IF NOT EXISTS trg_busca_update AFTER UPDATE OF {COLUNAS} ON ativos_online
+    BEGIN
+        INSERT INTO ativos_busca (ativos_busca, rowid, {COLUNAS})
+        VALUES ('delete', OLD.id, OLD.nome, OLD.ip_address, OLD.mac_address, OLD.tipo, OLD.condicao);
+        INSERT INTO ativos_busca (rowid, {COLUNAS})
+        VALUES (NEW.id, NEW.nome, NEW.ip_address, NEW.mac_address, NEW.tipo, NEW.condicao);
+    END
+    ''')
+    # Indexa o que já existe (~1,5 s para 100 mil ativos)
+    conexao.execute("INSERT INTO ativos_busca (ativos_busca) VALUES ('rebuild')")
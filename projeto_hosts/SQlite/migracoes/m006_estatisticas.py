@@ -0,0 +1,52 @@
+DESCRICAO = "Contadores por status, tipo e condição mantidos por gatilhos"
+
+# Congelado aqui (e não importado de estatisticas.py): uma migração aplicada não muda depois
+DIMENSOES = ('status', 'tipo', 'condicao')
+
+
+def _somar(referencia, dimensao, sinal):
+    return f"""
+        INSERT INTO estatisticas (dimensao, valor, total) VALUES ('{dimensao}', COALESCE({referencia}.{dimensao}, ''), {sinal})
+        ON CONFLICT (dimensao, valor) DO UPDATE SET total = total + ({sinal});"""
+
+
+def aplicar(conexao):
+    conexao.execute('''
+    CREATE TABLE IF NOT EXISTS estatisticas (
+        dimensao TEXT NOT NULL,
+        valor TEXT NOT NULL,
+        total INTEGER NOT NULL,
+        PRIMARY KEY (dimensao, valor)
+    ) WITHOUT ROWID
+    ''')
+
+    novo = ''.join(_somar('NEW', dimensao, 1) for dimensao in DIMENSOES)
+    antigo = ''.join(_somar('OLD', dimensao, -1) for dimensao in DIMENSOES)
+    conexao.execute(f"""
+    CREATE TRIGGER IF NOT EXISTS trg_estatisticas_insert AFTER INSERT ON ativos_online
+    BEGIN
+        UPDATE estatisticas SET total = total + 1 WHERE dimensao = 'total';{novo}
+    END
+    """)
+    conexao.execute(f"""
+    CREATE TRIGGER IF NOT EXISTS trg_estatisticas_delete AFTER DELETE ON ativos_online
+    BEGIN
+        UPDATE estatisticas SET total = total - 1 WHERE dimensao = 'total';{antigo}
+    END
+    """)
+    # Um gatilho por coluna: só mexe no contador quando o valor daquela coluna muda
+    for dimensao in DIMENSOES:
+        conexao.execute(f"""
+        CREATE TRIGGER IF NOT EXISTS trg_estatisticas_{dimensao} AFTER UPDATE OF {dimensao} ON ativos_online
+        WHEN NEW.{dimensao} IS NOT OLD.{dimensao}
+        BEGIN{_somar('OLD', dimensao, -1)}{_somar('NEW', dimensao, 1)}
+        END
+        """)
+    # Contagem inicial a partir do que já está no inventário
+    conexao.execute("DELETE FROM estatisticas")
+    conexao.execute("INSERT INTO estatisticas (dimensao, valor, total) SELECT 'total', '', COUNT(*) FROM ativos_online")
+    for dimensao in DIMENSOES:
+        conexao.execute(f'''
+            INSERT INTO estatisticas (dimensao, valor, total)
+            SELECT '{dimensao}', COALESCE({dimensao}, ''), COUNT(*) FROM ativos_online GROUP BY 2
+        ''')
@@ -0,0 +1,19 @@
+DESCRICAO = "Agenda adaptativa de sondagem por ativo (com o método ICMP/TCP)"
+
+
+def aplicar(conexao):
+    conexao.execute('''
+    CREATE TABLE IF NOT EXISTS agenda_sondagem (
+        ativo_id INTEGER PRIMARY KEY,
+        proxima_verificacao INTEGER NOT NULL,
+        intervalo INTEGER NOT NULL,
+        ultima_mudanca INTEGER,
+        mudancas_recentes INTEGER NOT NULL DEFAULT 0,
+        metodo TEXT
+    )
+    ''')
+    # Agendas criadas pelo monitor antes da sonda TCP não têm a coluna metodo
+    existentes = {coluna[1] for coluna in conexao.execute("PRAGMA table_info(agenda_sondagem)")}
+    if 'metodo' not in existentes:
+        conexao.execute("ALTER TABLE agenda_sondagem ADD COLUMN metodo TEXT")
+    conexao.execute("CREATE INDEX IF NOT EXISTS idx_agenda_proxima ON agenda_sondagem (proxima_verificacao)")
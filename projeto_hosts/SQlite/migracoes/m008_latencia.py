@@ -0,0 +1,13 @@
+DESCRICAO = "Série de latência (RTT) por ativo"
+
+
+def aplicar(conexao):
+    # Sem rowid: a chave (ativo_id, ts) é o próprio índice
+    conexao.execute('''
+    CREATE TABLE IF NOT EXISTS latencia (
+        ativo_id INTEGER NOT NULL,
+        ts INTEGER NOT NULL,
+        rtt_us INTEGER,
+        PRIMARY KEY (ativo_id, ts)
+    ) WITHOUT ROWID
+    ''')
@@ -0,0 +1,14 @@
+DESCRICAO = "Cache de fingerprints (-sV -O) por MAC"
+
+
+def aplicar(conexao):
+    conexao.execute('''
+    CREATE TABLE IF NOT EXISTS fingerprints (
+        mac TEXT PRIMARY KEY,
+        ip TEXT,
+        os_guess TEXT,
+        servicos TEXT,
+        tipo TEXT,
+        atualizado_em INTEGER NOT NULL
+    )
+    ''')
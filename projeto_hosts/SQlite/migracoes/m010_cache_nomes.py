@@ -0,0 +1,12 @@
+DESCRICAO = "Cache de resolução de nomes por MAC e por IP"
+
+
+def aplicar(conexao):
+    conexao.execute('''
+    CREATE TABLE IF NOT EXISTS cache_nomes (
+        chave TEXT PRIMARY KEY,
+        nome TEXT,
+        mac TEXT,
+        expira_em INTEGER NOT NULL
+    )
+    ''')
@@ -0,0 +1,8 @@
+DESCRICAO = "Hostname do nmap no cache de fingerprints"
+
+
+def aplicar(conexao):
+    # Sem o hostname, quem vinha do cache perdia o nome do nmap (só restava o NetBIOS ou o genérico)
+    existentes = {coluna[1] for coluna in conexao.execute("PRAGMA table_info(fingerprints)")}
+    if 'hostname' not in existentes:
+        conexao.execute("ALTER TABLE fingerprints ADD COLUMN hostname TEXT")
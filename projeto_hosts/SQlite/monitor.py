@@ -1,28 +1,28 @@
-import sqlite3
 import datetime
 import time
-from ping3 import ping # Importa a função 'ping' da biblioteca ping3
+from sondagem import varrer_hosts # Motor de sondagem concorrente
+import agendador # Agenda adaptativa por ativo
+import latencia # Série de RTT por ativo
+import alertas # Log de alertas (gravação e mensagens)
+import manutencao # Limpezas e consolidação periódicas (compartilhadas com a api.py)
+from banco import conectar # Conexões compartilhadas (WAL, busy_timeout)
+from migracoes import migrar # Esquema versionado do banco
 
 # --- Configurações ---
-DB_FILE = 'meu_banco.db'
 TEMPO_DE_ESPERA = 30 # Segundos (Verifica a cada 30 segundos)
+TIMEOUT_PING = 1 # Segundos de espera por host
+JANELA_PING = 1024 # Máximo de pings simultâneos
+MODO_ADAPTATIVO = True # Cada ativo tem seu próprio intervalo (ver agendador.py)
 # ---------------------
 
-def conectar():
-    """Conecta ao banco e retorna uma conexão em formato de dicionário."""
-    conexao = sqlite3.connect(DB_FILE)
-    conexao.row_factory = sqlite3.Row 
-    return conexao
+# conectar() vem de banco.py: retorna uma conexão do pool em formato de dicionário (sqlite3.Row)
 
-def registrar_alerta(tipo, mensagem):
+def registrar_alerta(tipo, mensagem, ativo_id=None):
     """Função central para salvar qualquer notificação no banco."""
+    conexao = None
     try:
-        data_agora = datetime.datetime.now().isoformat()
         conexao = conectar()
-        conexao.execute(
-            "INSERT INTO alertas (data_hora, tipo_alerta, mensagem) VALUES (?, ?, ?)",
-            (data_agora, tipo, mensagem)
-        )
+        alertas.registrar(conexao, tipo, mensagem, ativo_id)
         conexao.commit()
     except Exception as e:
         print(f"Erro ao registrar alerta: {e}")
@@ -30,19 +30,6 @@ def registrar_alerta(tipo, mensagem):
         if conexao:
             conexao.close()
 
-def ping_host(ip):
-    """
-    Verifica se um IP está respondendo (Online).
-    Retorna True se Online (recebeu resposta), False se Offline (timeout).
-    """
-    try:
-        # ping() retorna o tempo de resposta (em segundos) ou None/False se falhar.
-        resposta = ping(ip, timeout=1) 
-        return resposta is not None and resposta is not False
-    except Exception as e:
-        print(f"Erro ao pingar {ip}: {e}")
-        return False # Assume offline se der erro
-
 def verificar_ativos():
     """A função principal do monitor."""
     print(f"[{datetime.datetime.now().strftime('%Y-%m-%d %H:%M:%S')}] Verificando status dos ativos...")
@@ -58,6 +45,13 @@ def verificar_ativos():
             print("Nenhum ativo cadastrado para monitorar.")
             return
 
+        # 1. PINGA TODOS OS ATIVOS DE UMA VEZ (em paralelo, ~1 timeout no total)
+        ips = {ativo['ip_address'] for ativo in todos_os_ativos if ativo['ip_address']}
+        tempos_resposta = varrer_hosts(ips, timeout=TIMEOUT_PING, janela=JANELA_PING)
+        with conexao:
+            latencia.registrar_amostras(conexao, [(ativo['id'], tempos_resposta.get(ativo['ip_address']))
+                                                  for ativo in todos_os_ativos if ativo['ip_address']])
+
         for ativo in todos_os_ativos:
             id_ativo = ativo['id']
             nome_ativo = ativo['nome']
@@ -68,8 +62,8 @@ def verificar_ativos():
                 print(f"Ativo '{nome_ativo}' (ID: {id_ativo}) pulado. (Sem IP)")
                 continue # Pula ativos sem IP
 
-            # 1. PINGA O ATIVO
-            esta_online = ping_host(ip_ativo)
+            rtt = tempos_resposta.get(ip_ativo)
+            esta_online = rtt is not None
             
             # 2. DEFINE O NOVO STATUS
             status_novo = "Online" if esta_online else "Offline"
@@ -84,13 +78,11 @@ def verificar_ativos():
                 conexao.commit()
                 
                 # Registra o alerta
-                if status_novo == "Offline":
-                    registrar_alerta("Status: Offline", f"O ativo '{nome_ativo}' (IP: {ip_ativo}) ficou OFFLINE.")
-                else:
-                    registrar_alerta("Status: Online", f"O ativo '{nome_ativo}' (IP: {ip_ativo}) voltou a ficar ONLINE.")
+                registrar_alerta(*alertas.mensagem_mudanca_status(nome_ativo, ip_ativo, status_novo), id_ativo)
             else:
                 # Se não mudou, apenas informa no console
-                print(f"Ativo '{nome_ativo}' permanece {status_novo}.")
+                texto_rtt = f" ({rtt * 1000:.1f} ms)" if esta_online else ""
+                print(f"Ativo '{nome_ativo}' permanece {status_novo}{texto_rtt}.")
             
     except Exception as e:
         print(f"Erro no loop de verificação: {e}")
@@ -98,13 +90,48 @@ def verificar_ativos():
         if 'conexao' in locals() and conexao:
             conexao.close()
 
+def alertar_mudanca(ativo, status_novo):
+    """Callback do agendador: registra o alerta de mudança de status."""
+    nome_ativo, ip_ativo, status_antigo = ativo['nome'], ativo['ip_address'], ativo['status']
+    print(f"!!! ALERTA !!! Ativo '{nome_ativo}' mudou de '{status_antigo}' para '{status_novo}'.")
+    registrar_alerta(*alertas.mensagem_mudanca_status(nome_ativo, ip_ativo, status_novo), ativo['id'])
+
+def verificar_ativos_agendados():
+    """
+    Versão adaptativa: só pinga os ativos cuja verificação venceu.
+    Ativos estáveis vão espaçando as verificações; os que mudaram ou oscilam
+    são verificados de novo rapidamente; ativos em manutenção são ignorados.
+    Retorna quantos segundos esperar até a próxima rodada.
+    """
+    conexao = None
+    try:
+        conexao = conectar()
+        verificados, mudancas = agendador.verificar_pendentes(
+            conexao, ao_mudar=alertar_mudanca, timeout=TIMEOUT_PING, janela=JANELA_PING)
+        if verificados:
+            print(f"[{datetime.datetime.now().strftime('%Y-%m-%d %H:%M:%S')}] {verificados} ativos verificados, {mudancas} mudança(s).")
+        return agendador.segundos_ate_proxima(conexao, espera_maxima=TEMPO_DE_ESPERA)
+    except Exception as e:
+        print(f"Erro no loop de verificação: {e}")
+        return TEMPO_DE_ESPERA
+    finally:
+        if conexao:
+            conexao.close()
+
 # --- Loop Principal do Monitor ---
 if __name__ == "__main__":
     print("=========================================================")
     print(" Iniciando o Monitor de Ativos (Script de Alerta)")
     print(" Use (Ctrl+C) para parar o monitor.")
     print("=========================================================")
+    migrar()
+    ultima_manutencao = 0
+    if MODO_ADAPTATIVO:
+        while True:
+            ultima_manutencao = manutencao.executar_se_vencida(ultima_manutencao)
+            time.sleep(verificar_ativos_agendados())
     while True:
+        ultima_manutencao = manutencao.executar_se_vencida(ultima_manutencao)
         verificar_ativos()
         print(f"Monitoramento concluído. Próxima verificação em {TEMPO_DE_ESPERA} segundos.\n")
         time.sleep(TEMPO_DE_ESPERA)
\ No newline at end of file
@@ -0,0 +1,210 @@
+import select
+import socket
+import struct
+import threading
+import time
+
+# --- Configurações ---
+PORTA_NETBIOS = 137
+TIMEOUT_NBSTAT = 1.0   # Prazo único para todas as respostas do lote
+# ---------------------
+
+TIPO_NBSTAT = 0x0021
+CLASSE_IN = 0x0001
+FLAG_GRUPO = 0x8000
+
+
+# =======================================================
+#   MONTAGEM E LEITURA DOS PACOTES NBSTAT (RFC 1002)
+# =======================================================
+
+def _codificar_nome(nome, sufixo=0x00):
+    """Codificação "first-level" do NetBIOS: 16 bytes viram 32 letras de 'A' a 'P'."""
+    bruto = nome.encode('ascii')[:15].ljust(15, b'\x00' if nome == '*' else b' ') + bytes([sufixo])
+    codificado = bytearray()
+    for byte in bruto:
+        codificado.append(ord('A') + (byte >> 4))
+        codificado.append(ord('A') + (byte & 0x0F))
+    return bytes([32]) + bytes(codificado) + b'\x00'
+
+
+def montar_consulta(id_transacao):
+    """Pacote de consulta NBSTAT para o nome curinga '*'."""
+    cabecalho = struct.pack('!HHHHHH', id_transacao, 0x0000, 1, 0, 0, 0)
+    return cabecalho + _codificar_nome('*') + struct.pack('!HH', TIPO_NBSTAT, CLASSE_IN)
+
+
+def _pular_nome(dados, pos):
+    while True:
+        tamanho = dados[pos]
+        if tamanho & 0xC0 == 0xC0:  # Ponteiro de compressão
+            return pos + 2
+        if tamanho == 0:
+            return pos + 1
+        pos += 1 + tamanho
+
+
+def ler_resposta(dados):
+    """
+    Lê uma resposta NBSTAT.
+    Retorna (id_transacao, [(nome, sufixo, grupo)], mac) ou None se o pacote não for válido.
+    """
+    try:
+        id_transacao, flags, _, total_respostas = struct.unpack('!HHHH', dados[:8])
+        if not flags & 0x8000 or total_respostas < 1:
+            return None
+        pos = _pular_nome(dados, 12)
+        tipo, _, _, _ = struct.unpack('!HHIH', dados[pos:pos + 10])
+        if tipo != TIPO_NBSTAT:
+            return None
+        pos += 10
+        quantidade = dados[pos]
+        pos += 1
+        nomes = []
+        for _ in range(quantidade):
+            nome = dados[pos:pos + 15].decode('ascii', errors='replace').rstrip(' \x00')
+            sufixo = dados[pos + 15]
+            flags_nome, = struct.unpack('!H', dados[pos + 16:pos + 18])
+            nomes.append((nome, sufixo, bool(flags_nome & FLAG_GRUPO)))
+            pos += 18
+        mac = dados[pos:pos + 6]
+        mac = ':'.join(f'{b:02X}' for b in mac) if len(mac) == 6 and any(mac) else None
+        return id_transacao, nomes, mac
+    except (IndexError, struct.error):
+        return None
+
+
+def nome_da_maquina(nomes):
+    """Mesmo critério do nbtstat: nome <20> UNIQUE; senão o <00> UNIQUE (estação)."""
+    for sufixo_desejado in (0x20, 0x00):
+        for nome, sufixo, grupo in nomes:
+            if sufixo == sufixo_desejado and not grupo and nome:
+                return nome
+    return None
+
+
+# =======================================================
+#   CONSULTA EM LOTE: UM SOCKET, UM PRAZO
+# =======================================================
+
+def consultar_nbstat_lote(ips, timeout=TIMEOUT_NBSTAT, porta=PORTA_NETBIOS):
+    """
+    Envia a consulta NBSTAT para todos os IPs a partir de um único socket UDP
+    e coleta as respostas até o prazo `timeout`.
+    Retorna {ip: nome ou None} para todos os IPs pedidos.
+    """
+    ips = list(dict.fromkeys(ips))
+    resultados = {ip: None for ip in ips}
+    if not ips:
+        return resultados
+
+    esperados = {}
+    sock = socket.socket(socket.AF_INET, socket.SOCK_DGRAM)
+    try:
+        sock.setblocking(False)
+        for indice, ip in enumerate(ips):
+            id_transacao = indice & 0xFFFF
+            esperados[ip] = id_transacao
+            try:
+                sock.sendto(montar_consulta(id_transacao), (ip, porta))
+            except BlockingIOError:
+                select.select([], [sock], [], timeout)
+                try:
+                    sock.sendto(montar_consulta(id_transacao), (ip, porta))
+                except OSError:
+                    esperados.pop(ip)
+            except OSError:
+                esperados.pop(ip)  # IP inválido / rede inalcançável
+
+        prazo = time.monotonic() + timeout
+        while esperados:
+            restante = prazo - time.monotonic()
+            if restante <= 0:
+                break
+            prontos, _, _ = select.select([sock], [], [], restante)
+            if not prontos:
+                break
+            while True:
+                try:
+                    dados, (ip, _) = sock.recvfrom(2048)
+                except (BlockingIOError, InterruptedError):
+                    break
+                except OSError:
+                    # ICMP "port unreachable" de algum host: segue lendo
+                    continue
+                resposta = ler_resposta(dados)
+                if resposta is None or esperados.get(ip) != resposta[0]:
+                    continue
+                esperados.pop(ip)
+                resultados[ip] = nome_da_maquina(resposta[1])
+    finally:
+        sock.close()
+    return resultados
+
+
+def consultar_nbstat(ip, timeout=TIMEOUT_NBSTAT, porta=PORTA_NETBIOS):
+    return consultar_nbstat_lote([ip], timeout, porta)[ip]
+
+
+# =======================================================
+#   RESPONDEDOR LOCAL (substituto de um host Windows em testes)
+# =======================================================
+
+def montar_resposta(id_transacao, nomes, mac='00:00:00:00:00:00'):
+    """Resposta NBSTAT com a tabela de nomes [(nome, sufixo, grupo)]."""
+    corpo = bytes([len(nomes)])
+    for nome, sufixo, grupo in nomes:
+        corpo += nome.encode('ascii')[:15].ljust(15, b' ') + bytes([sufixo])
+        corpo += struct.pack('!H', (FLAG_GRUPO if grupo else 0) | 0x0400)
+    corpo += bytes(int(parte, 16) for parte in mac.split(':'))
+    corpo += b'\x00' * 40  # Estatísticas (não usadas)
+
+    cabecalho = struct.pack('!HHHHHH', id_transacao, 0x8400, 0, 1, 0, 0)
+    registro = _codificar_nome('*') + struct.pack('!HHIH', TIPO_NBSTAT, CLASSE_IN, 0, len(corpo))
+    return cabecalho + registro + corpo
+
+
+class ResponderNbstatLocal:
+    """
+    Servidor UDP que responde consultas NBSTAT com uma tabela de nomes fixa.
+    Uso:
+        with ResponderNbstatLocal('PC-TESTE', host='127.0.0.2', porta=13700) as r:
+            consultar_nbstat('127.0.0.2', porta=r.porta)
+    """
+
+    def __init__(self, nome, host='127.0.0.1', porta=0, mac='00:00:00:00:00:00', nomes=None):
+        self.nomes = nomes or [(nome, 0x00, False), ('WORKGROUP', 0x00, True), (nome, 0x20, False)]
+        self.mac = mac
+        self._sock = socket.socket(socket.AF_INET, socket.SOCK_DGRAM)
+        self._sock.bind((host, porta))
+        self._sock.settimeout(0.2)
+        self.porta = self._sock.getsockname()[1]
+        self._parar = threading.Event()
+        self._thread = threading.Thread(target=self._atender, daemon=True)
+
+    def _atender(self):
+        while not self._parar.is_set():
+            try:
+                dados, origem = self._sock.recvfrom(2048)
+            except socket.timeout:
+                continue
+            except OSError:
+                return
+            if len(dados) >= 12:
+                id_transacao, = struct.unpack('!H', dados[:2])
+                self._sock.sendto(montar_resposta(id_transacao, self.nomes, self.mac), origem)
+
+    def __enter__(self):
+        self._thread.start()
+        return self
+
+    def __exit__(self, *_):
+        self._parar.set()
+        self._thread.join()
+        self._sock.close()
+
+
+if __name__ == "__main__":
+    import sys
+    for ip, nome in consultar_nbstat_lote(sys.argv[1:]).items():
+        print(f"{ip}: {nome or '(sem resposta)'}")
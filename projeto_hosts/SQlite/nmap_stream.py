@@ -0,0 +1,178 @@
+import datetime
+import shlex
+import subprocess
+import tempfile
+import xml.etree.ElementTree as ET
+
+from enriquecimento import enriquecer_host
+from inventario import ComparadorInventario
+from resolucao import resolver_nomes
+
+# --- Configurações ---
+TAMANHO_LOTE = 25  # Hosts gravados por transação
+# ---------------------
+
+
+class ErroNmap(Exception):
+    """O nmap não pôde ser executado ou terminou com erro."""
+
+
+# =======================================================
+#   LEITURA INCREMENTAL DO XML DO NMAP
+# =======================================================
+
+def _host_do_xml(elemento):
+    """Converte um elemento <host> do XML do nmap em um dicionário simples."""
+    status = elemento.find('status')
+    host = {
+        'ip': None,
+        'mac': None,
+        'vendor': None,
+        'estado': status.get('state') if status is not None else None,
+        'hostnames': [],
+        'os': [],
+        'servicos': [],
+    }
+
+    for endereco in elemento.findall('address'):
+        tipo = endereco.get('addrtype')
+        if tipo == 'ipv4':
+            host['ip'] = endereco.get('addr')
+        elif tipo == 'mac':
+            host['mac'] = endereco.get('addr')
+            host['vendor'] = endereco.get('vendor')
+
+    for hostname in elemento.iterfind('hostnames/hostname'):
+        nome = hostname.get('name')
+        if nome:
+            host['hostnames'].append(nome)
+
+    for osmatch in elemento.iterfind('os/osmatch'):
+        host['os'].append(osmatch.get('name'))
+
+    for porta in elemento.iterfind('ports/port'):
+        estado = porta.find('state')
+        if estado is None or estado.get('state') != 'open':
+            continue
+        servico = porta.find('service')
+        host['servicos'].append({
+            'porta': int(porta.get('portid')),
+            'protocolo': porta.get('protocol'),
+            'nome': servico.get('name') if servico is not None else None,
+            'produto': servico.get('product') if servico is not None else None,
+        })
+
+    return host
+
+
+def ler_hosts_xml(dados):
+    """
+    Extrai os hosts completos de um XML do nmap, mesmo truncado
+    (ex: nmap interrompido por timeout): o host que estava pela metade é ignorado.
+    """
+    parser = ET.XMLPullParser(events=('end',))
+    hosts = []
+    try:
+        parser.feed(dados)
+    except ET.ParseError:
+        pass
+    try:
+        for _, elemento in parser.read_events():
+            if elemento.tag == 'host':
+                host = _host_do_xml(elemento)
+                if host['ip'] and host['estado'] == 'up':
+                    hosts.append(host)
+    except ET.ParseError:
+        pass
+    return hosts
+
+
+def iterar_hosts_nmap(alvos, argumentos='-sn -PR -T5'):
+    """
+    Executa o nmap com saída XML em stdout e produz cada host assim que o
+    nmap termina de reportá-lo (sem esperar o scan do intervalo inteiro).
+    Só hosts 'up' são produzidos.
+    """
+    comando = ['nmap'] + shlex.split(argumentos) + ['-oX', '-'] + shlex.split(alvos)
+    # stderr vai para um arquivo temporário para o pipe nunca travar o nmap
+    saida_erros = tempfile.TemporaryFile()
+    try:
+        processo = subprocess.Popen(comando, stdout=subprocess.PIPE, stderr=saida_erros)
+    except OSError as e:
+        saida_erros.close()
+        raise ErroNmap(f"Não foi possível executar o nmap: {e}")
+
+    parser = ET.XMLPullParser(events=('start', 'end'))
+    raiz = None
+    try:
+        for bloco in iter(lambda: processo.stdout.read1(65536), b''):
+            parser.feed(bloco)
+            for evento, elemento in parser.read_events():
+                if evento == 'start':
+                    if raiz is None:
+                        raiz = elemento
+                    continue
+                if elemento.tag != 'host':
+                    continue
+
+                host = _host_do_xml(elemento)
+                # Libera o host já processado para a memória não crescer com a rede
+                elemento.clear()
+                if raiz is not None:
+                    raiz.remove(elemento)
+
+                if host['ip'] and host['estado'] == 'up':
+                    yield host
+    finally:
+        if processo.poll() is None:
+            processo.kill()
+        processo.stdout.close()
+        codigo = processo.wait()
+        saida_erros.seek(0)
+        erros = saida_erros.read().decode(errors='replace').strip()
+        saida_erros.close()
+
+    if codigo != 0:
+        raise ErroNmap(erros or f"nmap terminou com código {codigo}")
+
+
+# =======================================================
+#   GRAVAÇÃO EM LOTES PEQUENOS (o dashboard atualiza durante o scan)
+# =======================================================
+
+def gravar_hosts_em_lotes(conexao, hosts, tamanho_lote=TAMANHO_LOTE, progresso=None, comparador=None, manter_nome=False):
+    """
+    Enriquece (nome/vendor/tipo) e grava cada host no ativos_online,
+    com um commit a cada `tamanho_lote` hosts. Os nomes NetBIOS/MACs do lote
+    são resolvidos em paralelo e com cache (resolucao.py).
+    Só as linhas que mudaram são escritas (ComparadorInventario; passe o mesmo
+    comparador em todas as chamadas do scan para ter a contagem completa).
+    Retorna {ip: mac} dos hosts vistos.
+    """
+    comparador = comparador or ComparadorInventario(conexao)
+    ips_vistos = {}
+    lote = []
+
+    def gravar_lote():
+        data_hoje = datetime.datetime.now().isoformat(timespec='seconds')
+        with conexao:
+            # Quem já veio com nome e MAC do nmap não precisa de consulta nenhuma
+            resolvidos = resolver_nomes(conexao, [(h['ip'], h['mac']) for h in lote if not (h['hostnames'] and h['mac'])])
+            resultados = []
+            for host in lote:
+                ip = host['ip']
+                nome, mac, tipo = enriquecer_host(ip, host['mac'], host['vendor'], host['hostnames'], resolvidos.get(ip))
+                ips_vistos[ip] = mac
+                resultados.append((ip, mac, nome, tipo))
+            comparador.aplicar(resultados, data_hoje, manter_nome)
+        lote.clear()
+        if progresso: progresso(hosts_encontrados=len(ips_vistos), hosts_processados=len(ips_vistos))
+
+    for host in hosts:
+        lote.append(host)
+        if len(lote) >= tamanho_lote:
+            gravar_lote()
+
+    if lote:
+        gravar_lote()
+    return ips_vistos
@@ -0,0 +1,200 @@
+import array
+import bisect
+import csv
+import io
+import mmap
+import os
+import re
+import struct
+import sys
+import threading
+
+# --- Configurações ---
+ARQUIVO_OUI = os.path.join(os.path.dirname(__file__), 'oui.bin')
+# ---------------------
+
+# Formato do oui.bin (little-endian):
+#   cabeçalho: b'OUI1', total_prefixos (I), total_nomes (I)
+#   prefixos:  total_prefixos × uint32 (OUI de 24 bits, ordenados)
+#   nomes_idx: total_prefixos × uint16 (índice do fabricante de cada prefixo)
+#   offsets:   (total_nomes + 1) × uint32 (início de cada nome no bloco de texto)
+#   texto:     nomes dos fabricantes em UTF-8, um atrás do outro
+MAGICO = b'OUI1'
+CABECALHO = struct.Struct('<4sII')
+
+_LINHA_TXT = re.compile(r'^\s*([0-9A-Fa-f]{6})\s+\(base 16\)\s+(.*?)\s*$')
+_HEX = re.compile(r'[^0-9A-Fa-f]')
+
+
+# =======================================================
+#   COMPILAÇÃO DO REGISTRO DO IEEE (oui.txt ou oui.csv)
+# =======================================================
+
+def ler_registro_ieee(texto):
+    """
+    Lê o registro MA-L do IEEE nos dois formatos publicados
+    (oui.txt: "XXXXXX (base 16) Fabricante"; oui.csv: Registry,Assignment,Organization Name,...).
+    Retorna {prefixo_int: fabricante}.
+    """
+    registros = {}
+    if texto.lstrip().startswith('Registry,'):
+        for linha in csv.DictReader(io.StringIO(texto)):
+            prefixo = linha.get('Assignment') or ''
+            nome = (linha.get('Organization Name') or '').strip()
+            if len(prefixo) == 6 and nome:
+                registros[int(prefixo, 16)] = nome
+        return registros
+
+    for linha in texto.splitlines():
+        encontrado = _LINHA_TXT.match(linha)
+        if encontrado and encontrado.group(2):
+            registros[int(encontrado.group(1), 16)] = encontrado.group(2)
+    return registros
+
+
+def compilar(origem, destino=ARQUIVO_OUI):
+    """Gera o índice binário `destino` a partir do oui.txt/oui.csv do IEEE. Retorna o total de prefixos."""
+    with open(origem, encoding='utf-8', errors='replace') as arquivo:
+        registros = ler_registro_ieee(arquivo.read())
+
+    nomes = sorted(set(registros.values()))
+    if len(nomes) > 0xFFFF:
+        raise ValueError("Fabricantes demais para o índice de 16 bits.")
+    posicao_nome = {nome: i for i, nome in enumerate(nomes)}
+
+    prefixos = array.array('I', sorted(registros))
+    indices = array.array('H', (posicao_nome[registros[p]] for p in prefixos))
+    texto = bytearray()
+    offsets = array.array('I', [0])
+    for nome in nomes:
+        texto += nome.encode('utf-8')
+        offsets.append(len(texto))
+    if sys.byteorder != 'little':
+        for tabela in (prefixos, indices, offsets):
+            tabela.byteswap()
+
+    temporario = destino + '.tmp'
+    with open(temporario, 'wb') as arquivo:
+        arquivo.write(CABECALHO.pack(MAGICO, len(prefixos), len(nomes)))
+        arquivo.write(prefixos.tobytes())
+        arquivo.write(indices.tobytes())
+        arquivo.write(offsets.tobytes())
+        arquivo.write(texto)
+    os.replace(temporario, destino)
+    return len(prefixos)
+
+
+# =======================================================
+#   CONSULTA (mmap + busca binária, sem carregar um dict)
+# =======================================================
+
+def prefixo_do_mac(mac):
+    """Os 24 bits do OUI como inteiro, ou None para MAC inválido/aleatório (localmente administrado)."""
+    if not mac:
+        return None
+    digitos = _HEX.sub('', mac)
+    if len(digitos) != 12:
+        return None
+    prefixo = int(digitos[:6], 16)
+    if prefixo & 0x020000:  # Bit "localmente administrado": MACs aleatórios de celulares/VMs
+        return None
+    return prefixo
+
+
+class IndiceOUI:
+    """Índice OUI → fabricante sobre o arquivo compilado, mapeado em memória."""
+
+    def __init__(self, caminho=ARQUIVO_OUI):
+        with open(caminho, 'rb') as arquivo:
+            self._mapa = mmap.mmap(arquivo.fileno(), 0, access=mmap.ACCESS_READ)
+        magico, total, total_nomes = CABECALHO.unpack_from(self._mapa, 0)
+        if magico != MAGICO:
+            raise ValueError(f"{caminho} não é um índice OUI.")
+
+        inicio = CABECALHO.size
+        fim_prefixos = inicio + 4 * total
+        fim_indices = fim_prefixos + 2 * total
+        fim_offsets = fim_indices + 4 * (total_nomes + 1)
+        visao = memoryview(self._mapa)
+        if sys.byteorder == 'little':
+            self._prefixos = visao[inicio:fim_prefixos].cast('I')
+            self._indices = visao[fim_prefixos:fim_indices].cast('H')
+            self._offsets = visao[fim_indices:fim_offsets].cast('I')
+        else:
+            self._prefixos = array.array('I', visao[inicio:fim_prefixos]); self._prefixos.byteswap()
+            self._indices = array.array('H', visao[fim_prefixos:fim_indices]); self._indices.byteswap()
+            self._offsets = array.array('I', visao[fim_indices:fim_offsets]); self._offsets.byteswap()
+        self._texto = fim_offsets
+
+    def __len__(self):
+        return len(self._prefixos)
+
+    def _nome(self, indice):
+        inicio = self._texto + self._offsets[indice]
+        fim = self._texto + self._offsets[indice + 1]
+        return self._mapa[inicio:fim].decode('utf-8')
+
+    def fabricante(self, mac):
+        """Nome do fabricante do MAC ou None."""
+        prefixo = prefixo_do_mac(mac)
+        if prefixo is None:
+            return None
+        posicao = bisect.bisect_left(self._prefixos, prefixo)
+        if posicao < len(self._prefixos) and self._prefixos[posicao] == prefixo:
+            return self._nome(self._indices[posicao])
+        return None
+
+    def fabricantes(self, macs):
+        """Consulta em lote: {mac: fabricante ou None}."""
+        return {mac: self.fabricante(mac) for mac in macs}
+
+
+_indice = None
+_trava = threading.Lock()
+
+
+def obter_indice():
+    """Índice compartilhado (aberto uma vez por processo). None se o oui.bin não existir."""
+    global _indice
+    if _indice is None:
+        with _trava:
+            if _indice is None:
+                try:
+                    _indice = IndiceOUI()
+                except (OSError, ValueError) as e:
+                    print(f"Aviso: índice OUI indisponível ({e}).")
+                    _indice = False
+    return _indice or None
+
+
+def fabricante_do_mac(mac):
+    indice = obter_indice()
+    return indice.fabricante(mac) if indice else None
+
+
+if __name__ == "__main__":
+    import argparse
+    import time
+    parser = argparse.ArgumentParser(description="Índice local de fabricantes (OUI do IEEE).")
+    sub = parser.add_subparsers(dest='comando', required=True)
+    p_compilar = sub.add_parser('compilar', help="Gera o oui.bin a partir do oui.txt/oui.csv do IEEE")
+    p_compilar.add_argument('origem')
+    p_compilar.add_argument('--destino', default=ARQUIVO_OUI)
+    p_consultar = sub.add_parser('consultar', help="Mostra o fabricante de cada MAC")
+    p_consultar.add_argument('macs', nargs='+')
+    sub.add_parser('benchmark', help="Mede o tempo médio de uma consulta")
+    args = parser.parse_args()
+
+    if args.comando == 'compilar':
+        print(f"{compilar(args.origem, args.destino)} prefixos gravados em {args.destino}")
+    elif args.comando == 'consultar':
+        for mac, nome in IndiceOUI().fabricantes(args.macs).items():
+            print(f"{mac}: {nome or '(desconhecido)'}")
+    else:
+        indice = IndiceOUI()
+        macs = [f"{p >> 16:02X}:{(p >> 8) & 255:02X}:{p & 255:02X}:00:00:01" for p in indice._prefixos[::7]]
+        inicio = time.perf_counter()
+        indice.fabricantes(macs)
+        decorrido = time.perf_counter() - inicio
+        print(f"{len(indice)} prefixos; {len(macs)} consultas em {decorrido * 1000:.1f} ms "
+              f"({decorrido / len(macs) * 1e6:.2f} µs por MAC)")
@@ -0,0 +1,102 @@
+import ipaddress
+from concurrent.futures import ProcessPoolExecutor, as_completed
+
+from nmap_stream import iterar_hosts_nmap
+from presenca import ips_nas_redes
+
+
+# =======================================================
+#   DIVISÃO DAS REDES EM SHARDS
+# =======================================================
+
+def dividir_em_shards(redes, prefixo=24):
+    """
+    Divide as redes (CIDR) em blocos de tamanho `prefixo`.
+    Redes repetidas ou sobrepostas são unificadas antes; redes menores que
+    o bloco ficam inteiras.
+    """
+    unificadas = ipaddress.collapse_addresses(
+        ipaddress.ip_network(rede, strict=False) for rede in redes
+    )
+    shards = []
+    for rede in unificadas:
+        if rede.prefixlen >= prefixo:
+            shards.append(str(rede))
+        else:
+            shards.extend(str(bloco) for bloco in rede.subnets(new_prefix=prefixo))
+    return shards
+
+
+def _scan_shard(shard, argumentos):
+    """Executado no processo filho: devolve os hosts vivos do shard."""
+    return list(iterar_hosts_nmap(shard, argumentos))
+
+
+# =======================================================
+#   SCAN PARTICIONADO EM UM POOL DE PROCESSOS
+# =======================================================
+
+def varrer_particionado(redes, argumentos, prefixo=24, max_processos=4, ao_receber_hosts=None, progresso=None):
+    """
+    Escaneia cada shard das `redes` em um pool de até `max_processos` processos.
+    `ao_receber_hosts(hosts)` é chamado neste processo com os hosts de cada shard:
+    assim que o shard termina (pool) ou conforme o nmap reporta (um shard só).
+    Retorna (ips_vistos, shards_com_falha); só depois que TODOS os shards
+    terminam é que quem chamou deve decidir quem ficou Offline.
+    """
+    shards = dividir_em_shards(redes, prefixo)
+    ips_vistos = set()
+    shards_com_falha = []
+    concluidos = 0
+
+    def registrando(hosts):
+        for host in hosts:
+            ips_vistos.add(host['ip'])
+            yield host
+
+    def consumir(hosts):
+        hosts = registrando(hosts)
+        if ao_receber_hosts: ao_receber_hosts(hosts)
+        for _ in hosts: pass  # Garante que o shard inteiro foi lido
+
+    def concluir(shard, erro=None):
+        nonlocal concluidos
+        concluidos += 1
+        if erro is not None:
+            print(f"[SHARD] Falha em {shard}: {erro}")
+            shards_com_falha.append(shard)
+        if progresso:
+            progresso(hosts_encontrados=len(ips_vistos), progresso=min(99, int(100 * concluidos / len(shards))))
+
+    # Um shard só (ou paralelismo 1) não compensa abrir processos
+    if len(shards) <= 1 or max_processos <= 1:
+        for shard in shards:
+            try:
+                consumir(iterar_hosts_nmap(shard, argumentos))
+                concluir(shard)
+            except Exception as e:
+                concluir(shard, e)
+        return ips_vistos, shards_com_falha
+
+    with ProcessPoolExecutor(max_workers=min(max_processos, len(shards))) as pool:
+        futuros = {pool.submit(_scan_shard, shard, argumentos): shard for shard in shards}
+        for futuro in as_completed(futuros):
+            shard = futuros[futuro]
+            try:
+                consumir(futuro.result())
+                concluir(shard)
+            except Exception as e:
+                concluir(shard, e)
+
+    return ips_vistos, shards_com_falha
+
+
+def ips_em_shards(conexao, shards):
+    """
+    IPs Online do inventário que pertencem aos shards informados.
+    Usado para não marcar Offline quem estava em um shard que falhou.
+    """
+    if not shards:
+        return set()
+    online = (ip for ip, in conexao.execute("SELECT ip_address FROM ativos_online WHERE status='Online' AND ip_address IS NOT NULL"))
+    return ips_nas_redes(online, shards)
@@ -1,85 +1,83 @@
+import argparse
 import sqlite3
-import datetime
+import time
+from banco import conectar
+from busca import buscar, LIMITE_PADRAO
+from migracoes import migrar
+from sessoes import tempo_de_uso, formatar_duracao
+
+# Modo linha de comando: `python pesquisar_ativo.py 192.168.15 impressora`
+# imprime uma linha por ativo; sem termo, pergunta como antes.
+parser = argparse.ArgumentParser(description="Pesquisa ativos por nome, IP, MAC, tipo ou condição.")
+parser.add_argument('termo', nargs='*', help="Palavras a buscar (todas precisam aparecer)")
+parser.add_argument('--limite', type=int, default=LIMITE_PADRAO, help="Máximo de resultados")
+args = parser.parse_args()
 
 conexao = None
 cursor = None
 
 try:
-    # 1. Conectar ao banco
-    conexao = sqlite3.connect('meu_banco.db')
+    # 1. Garantir o esquema atualizado (migrações) e conectar ao banco
+    migrar()
+    conexao = conectar(row_factory=None)
     cursor = conexao.cursor()
 
-    # 2. Garantir que a tabela exista (apenas por segurança)
-    cursor.execute('''
-    CREATE TABLE IF NOT EXISTS ativos_online (
-        id INTEGER PRIMARY KEY AUTOINCREMENT,
-        nome TEXT NOT NULL, ip_address TEXT, mac_address TEXT,
-        status TEXT, condicao TEXT, data_inicio TEXT
-    )
-    ''')
-
     # --- ETAPA DE PESQUISA ---
-    print("\n--- PESQUISAR ATIVOS ONLINE ---")
-    
-    # 3. Pedir o termo de pesquisa ao usuário
-    termo_pesquisa = input("Digite o nome (ou parte do nome) do ativo que deseja buscar: ")
-
-    # 4. Preparar o termo para a consulta LIKE
-    #    O '%' é o coringa. %termo% busca qualquer coisa que contenha o termo.
-    termo_formatado_like = f"%{termo_pesquisa}%"
+    if args.termo:
+        termo_pesquisa = ' '.join(args.termo)
+    else:
+        print("\n--- PESQUISAR ATIVOS ONLINE ---")
+        # 2. Pedir o termo de pesquisa ao usuário
+        termo_pesquisa = input("Digite parte do nome, IP, MAC ou tipo do ativo que deseja buscar: ")
+        print(f"\nBuscando por ativos com '{termo_pesquisa}'...")
 
-    print(f"\nBuscando por ativos com nome parecido com '{termo_pesquisa}'...")
+    # 3. Busca no índice FTS5 (trigram), já ordenada por relevância
+    inicio = time.perf_counter()
+    resultados = buscar(conexao, termo_pesquisa, args.limite)
+    decorrido_ms = (time.perf_counter() - inicio) * 1000
 
-    # 5. Executar a consulta SQL com WHERE e LIKE
-    cursor.execute(
-        "SELECT * FROM ativos_online WHERE nome LIKE ?", 
-        (termo_formatado_like,)
-    )
-    
-    resultados = cursor.fetchall()
+    if args.termo:
+        for ativo in resultados:
+            print(f"{ativo['id']:<6} {ativo['nome'] or '-':<40} {ativo['ip_address'] or '-':<16} "
+                  f"{ativo['mac_address'] or '-':<18} {ativo['tipo'] or '-':<20} {ativo['status'] or '-'}")
+        print(f"{len(resultados)} ativo(s) em {decorrido_ms:.1f} ms")
 
-    # 6. Exibir os resultados
-    if not resultados:
-        print("Nenhum ativo encontrado com esse nome.")
+    # 4. Exibir os resultados (modo interativo)
+    elif not resultados:
+        print("Nenhum ativo encontrado.")
     else:
-        print(f"Encontrados {len(resultados)} ativo(s):")
-        
-        tempo_agora = datetime.datetime.now()
+        print(f"Encontrados {len(resultados)} ativo(s) em {decorrido_ms:.1f} ms:")
         
         for ativo in resultados:
             # --- Reutilizar a lógica de cálculo de tempo ---
-            id_ativo = ativo[0]
-            nome_ativo = ativo[1]
-            ip_ativo = ativo[2]
-            status_ativo = ativo[4] # Coluna 'status'
-            condicao_ativo = ativo[5] # Coluna 'condicao'
-            data_inicio_str = ativo[6] # Coluna 'data_inicio'
-            
-            if data_inicio_str is None:
-                duracao_formatada = "(Data não registrada)"
-            else:
-                try:
-                    data_inicio_obj = datetime.datetime.fromisoformat(data_inicio_str)
-                    duracao = tempo_agora - data_inicio_obj
-                    duracao_formatada = str(duracao).split('.')[0]
-                except (TypeError, ValueError):
-                    duracao_formatada = "(Erro na data)"
+            id_ativo = ativo['id']
+            nome_ativo = ativo['nome']
+            ip_ativo = ativo['ip_address']
+            status_ativo = ativo['status']
+            condicao_ativo = ativo['condicao']
+            # Tempo da sessão Online atual (tabela de sessões)
+            uso = tempo_de_uso(conexao, ativo_id=id_ativo)[0]
+            duracao_formatada = formatar_duracao(uso['tempo_online'])
             
             # Imprimir o resultado completo
             print("---------------------------------")
             print(f"  ID: {id_ativo}")
             print(f"  Nome: {nome_ativo}")
             print(f"  IP: {ip_ativo}")
+            print(f"  MAC: {ativo['mac_address']}")
+            print(f"  Tipo: {ativo['tipo']}")
             print(f"  Status: {status_ativo}")
             print(f"  Condição: {condicao_ativo}")
             print(f"  Tempo de Uso: {duracao_formatada}")
+            print(f"  Uso acumulado: {formatar_duracao(uso['uso_total'])}")
 
 except sqlite3.Error as e:
     print(f"Ocorreu um erro ao interagir com o banco de dados: {e}")
 finally:
-    # 7. Fechar a conexão
+    # 5. Fechar a conexão
     if cursor:
         cursor.close()
     if conexao:
         conexao.close()
-        print("\nConexão com o banco de dados fechada.")
\ No newline at end of file
+        if not args.termo:
+            print("\nConexão com o banco de dados fechada.")
\ No newline at end of file
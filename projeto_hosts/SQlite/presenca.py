@@ -0,0 +1,197 @@
+import calendar
+import ipaddress
+import re
+import subprocess
+import time
+
+# --- Configurações ---
+TABELA_ARP = '/proc/net/arp'
+# Estados do `ip neigh` que o kernel confirmou há pouco (sem pacote nosso)
+ESTADOS_PRESENTES = {'REACHABLE', 'DELAY', 'PROBE'}
+# ---------------------
+
+ATF_COM = 0x2            # Entrada completa em /proc/net/arp
+MAC_VAZIO = '00:00:00:00:00:00'
+
+
+# =======================================================
+#   LEITURA DAS TABELAS (recebem o texto: dá para usar
+#   arquivos gravados de outra máquina no lugar do kernel)
+# =======================================================
+
+def ler_tabela_arp(texto):
+    """
+    Lê o conteúdo de /proc/net/arp.
+    Retorna {ip: mac} só das entradas completas (o kernel não informa a idade delas).
+    """
+    vizinhos = {}
+    for linha in texto.splitlines()[1:]:
+        partes = linha.split()
+        if len(partes) < 4:
+            continue
+        ip, _, flags, mac = partes[:4]
+        try:
+            completa = int(flags, 16) & ATF_COM
+        except ValueError:
+            continue
+        if completa and mac != MAC_VAZIO:
+            vizinhos[ip] = mac.upper()
+    return vizinhos
+
+
+def ler_ip_neigh(texto):
+    """
+    Lê a saída do `ip -4 neigh show`.
+    Retorna {ip: (mac, estado)}; entradas sem MAC (FAILED/INCOMPLETE) ficam de fora.
+    """
+    vizinhos = {}
+    for linha in texto.splitlines():
+        partes = linha.split()
+        if not partes or 'lladdr' not in partes:
+            continue
+        mac = partes[partes.index('lladdr') + 1].upper()
+        vizinhos[partes[0]] = (mac, partes[-1].upper())
+    return vizinhos
+
+
+def ler_leases_dnsmasq(texto, agora=None):
+    """
+    Lê um arquivo de leases do dnsmasq ("expira mac ip nome client-id").
+    Retorna {ip: (mac, nome ou None)} dos leases ainda válidos.
+    """
+    agora = int(agora if agora is not None else time.time())
+    leases = {}
+    for linha in texto.splitlines():
+        partes = linha.split()
+        if len(partes) < 4:
+            continue
+        try:
+            expira = int(partes[0])
+        except ValueError:
+            continue
+        if expira and expira <= agora:
+            continue
+        leases[partes[2]] = (partes[1].upper(), None if partes[3] == '*' else partes[3])
+    return leases
+
+
+_BLOCO_ISC = re.compile(r'lease\s+([\d.]+)\s*\{(.*?)\}', re.S)
+
+
+def ler_leases_isc(texto, agora=None):
+    """
+    Lê um dhcpd.leases do ISC DHCP.
+    Retorna {ip: (mac, nome ou None)} dos leases ativos (o último bloco de cada IP vale).
+    """
+    agora = agora if agora is not None else time.time()
+    leases = {}
+    for ip, corpo in _BLOCO_ISC.findall(texto):
+        estado = re.search(r'binding state (\w+);', corpo)
+        mac = re.search(r'hardware ethernet ([0-9a-fA-F:]+);', corpo)
+        if not mac or (estado and estado.group(1) != 'active'):
+            leases.pop(ip, None)
+            continue
+        fim = re.search(r'ends \d+ (\d+/\d+/\d+ \d+:\d+:\d+);', corpo)
+        if fim and calendar.timegm(time.strptime(fim.group(1), '%Y/%m/%d %H:%M:%S')) <= agora:
+            leases.pop(ip, None)
+            continue
+        nome = re.search(r'client-hostname "([^"]*)";', corpo)
+        leases[ip] = (mac.group(1).upper(), nome.group(1) if nome else None)
+    return leases
+
+
+def ler_leases(caminho, agora=None):
+    """Detecta o formato (ISC ou dnsmasq) e lê o arquivo de leases."""
+    with open(caminho, encoding='utf-8', errors='replace') as arquivo:
+        texto = arquivo.read()
+    if 'lease ' in texto and '{' in texto:
+        return ler_leases_isc(texto, agora)
+    return ler_leases_dnsmasq(texto, agora)
+
+
+# =======================================================
+#   COLETA EM UMA PASSADA
+# =======================================================
+
+def _ler_arquivo(caminho):
+    try:
+        with open(caminho, encoding='utf-8', errors='replace') as arquivo:
+            return arquivo.read()
+    except OSError:
+        return None
+
+
+def _executar_ip_neigh():
+    try:
+        resultado = subprocess.run(['ip', '-4', 'neigh', 'show'], capture_output=True, text=True, timeout=5)
+    except (OSError, subprocess.TimeoutExpired):
+        return None
+    return resultado.stdout if resultado.returncode == 0 else None
+
+
+def ips_nas_redes(ips, redes):
+    """Subconjunto dos `ips` que pertence a alguma das `redes` (CIDR)."""
+    redes = [ipaddress.ip_network(rede, strict=False) for rede in redes]
+    dentro = set()
+    for ip in ips:
+        try:
+            endereco = ipaddress.ip_address(ip)
+        except ValueError:
+            continue
+        if any(endereco in rede for rede in redes):
+            dentro.add(ip)
+    return dentro
+
+
+def coletar_vizinhos(redes=None, caminhos_leases=(), texto_arp=None, texto_neigh=None, agora=None):
+    """
+    Lê a tabela ARP, o `ip neigh` e os leases DHCP de uma vez, sem enviar pacotes.
+    `texto_arp`/`texto_neigh` substituem a leitura do kernel (tabelas gravadas).
+    Retorna (presentes, macs):
+      presentes = {ip: mac} confirmados pelo kernel há pouco;
+      macs      = {ip: mac} de todas as fontes (também para quem não está presente).
+    Sem o `ip neigh` (ex.: contêiner sem iproute2), toda entrada completa da
+    tabela ARP conta como presente.
+    """
+    texto_arp = texto_arp if texto_arp is not None else _ler_arquivo(TABELA_ARP)
+    texto_neigh = texto_neigh if texto_neigh is not None else _executar_ip_neigh()
+
+    macs = {}
+    for caminho in caminhos_leases:
+        try:
+            macs.update({ip: mac for ip, (mac, _) in ler_leases(caminho, agora).items()})
+        except OSError as e:
+            print(f"Aviso: não foi possível ler os leases {caminho}: {e}")
+
+    arp = ler_tabela_arp(texto_arp) if texto_arp else {}
+    macs.update(arp)
+
+    if texto_neigh is not None:
+        vizinhos = ler_ip_neigh(texto_neigh)
+        macs.update({ip: mac for ip, (mac, _) in vizinhos.items()})
+        presentes = {ip: mac for ip, (mac, estado) in vizinhos.items() if estado in ESTADOS_PRESENTES}
+    else:
+        presentes = dict(arp)
+
+    if redes:
+        dentro = ips_nas_redes(macs, redes)
+        presentes = {ip: mac for ip, mac in presentes.items() if ip in dentro}
+        macs = {ip: mac for ip, mac in macs.items() if ip in dentro}
+    return presentes, macs
+
+
+if __name__ == "__main__":
+    import argparse
+    parser = argparse.ArgumentParser(description="Mostra a presença passiva (ARP/neigh/DHCP) sem enviar pacotes.")
+    parser.add_argument('--arp', help="Arquivo com uma cópia de /proc/net/arp")
+    parser.add_argument('--neigh', help="Arquivo com a saída gravada do `ip neigh`")
+    parser.add_argument('--leases', action='append', default=[], help="Arquivo de leases DHCP (ISC ou dnsmasq)")
+    parser.add_argument('redes', nargs='*')
+    args = parser.parse_args()
+
+    presentes, macs = coletar_vizinhos(
+        args.redes, args.leases,
+        texto_arp=_ler_arquivo(args.arp) if args.arp else None,
+        texto_neigh=_ler_arquivo(args.neigh) if args.neigh else None)
+    for ip in sorted(macs, key=ipaddress.ip_address):
+        print(f"{ip:<16} {macs[ip]}  {'presente' if ip in presentes else '-'}")
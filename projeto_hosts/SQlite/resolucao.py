@@ -0,0 +1,103 @@
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+from enriquecimento import resolver_mac
+from netbios import consultar_nbstat_lote
+from presenca import coletar_vizinhos
+
+# --- Configurações ---
+TTL_POSITIVO = 24 * 3600   # Segundos que um nome encontrado fica em cache
+TTL_NEGATIVO = 3600        # Segundos que um "sem nome" fica em cache (evita repetir timeouts)
+MAX_THREADS_RESOLUCAO = 32
+TAMANHO_CONSULTA = 500     # Chaves por SELECT ... IN (...)
+# ---------------------
+
+
+def _chave_mac(mac):
+    return f"mac:{mac.upper()}" if mac and mac != 'N/A' else None
+
+
+def _chave_ip(ip):
+    return f"ip:{ip}"
+
+
+def _buscar_cache(conexao, chaves, agora):
+    encontrados = {}
+    chaves = list(chaves)
+    for inicio in range(0, len(chaves), TAMANHO_CONSULTA):
+        parte = chaves[inicio:inicio + TAMANHO_CONSULTA]
+        placeholders = ','.join('?' for _ in parte)
+        consulta = f"SELECT chave, nome, mac FROM cache_nomes WHERE expira_em > ? AND chave IN ({placeholders})"
+        for chave, nome, mac in conexao.execute(consulta, [agora] + parte):
+            encontrados[chave] = (nome, mac)
+    return encontrados
+
+
+def resolver_nomes(conexao, hosts, max_threads=MAX_THREADS_RESOLUCAO, agora=None):
+    """
+    Resolve nome NetBIOS e MAC de vários hosts de uma vez.
+    `hosts` é uma lista de (ip, mac ou None). Retorna {ip: (nome ou None, mac)}.
+    O que está no cache (tabela cache_nomes, migração 010; inclusive resultados negativos) não é consultado de novo;
+    o resto é resolvido em paralelo e gravado no cache (quem chama faz o commit).
+    """
+    agora = int(agora if agora is not None else time.time())
+    hosts = list(hosts)
+    if not hosts:
+        return {}
+
+    chaves = set()
+    for ip, mac in hosts:
+        chaves.add(_chave_ip(ip))
+        if _chave_mac(mac):
+            chaves.add(_chave_mac(mac))
+    cache = _buscar_cache(conexao, chaves, agora)
+
+    resultados = {}
+    faltando = []
+    for ip, mac in hosts:
+        # O MAC identifica o aparelho mesmo se o DHCP trocou o IP
+        encontrado = cache.get(_chave_mac(mac))
+        if not encontrado:
+            encontrado = cache.get(_chave_ip(ip))
+            # O IP agora pertence a outro aparelho: o nome em cache não vale
+            if encontrado and mac and (encontrado[1] or '').upper() != mac.upper():
+                encontrado = None
+        if encontrado:
+            nome, mac_cache = encontrado
+            resultados[ip] = (nome, mac.upper() if mac else mac_cache)
+        else:
+            faltando.append((ip, mac))
+
+    if faltando:
+        # Nomes: uma única rajada NBSTAT para todo o lote (um socket, um prazo)
+        nomes = consultar_nbstat_lote([ip for ip, _ in faltando])
+        # MACs que o nmap não informou: uma leitura só da tabela de vizinhos;
+        # o getmac (um host por vez, em paralelo) fica para quem não estava nela
+        sem_mac = [ip for ip, mac in faltando if not mac]
+        macs = {}
+        if sem_mac:
+            _, vizinhos = coletar_vizinhos()
+            macs = {ip: vizinhos[ip] for ip in sem_mac if ip in vizinhos}
+            sem_mac = [ip for ip in sem_mac if ip not in macs]
+        if sem_mac:
+            with ThreadPoolExecutor(max_workers=min(max_threads, len(sem_mac))) as pool:
+                macs.update(zip(sem_mac, pool.map(resolver_mac, sem_mac)))
+
+        linhas = []
+        for ip, mac in faltando:
+            nome = nomes.get(ip)
+            mac = mac.upper() if mac else macs[ip]
+            resultados[ip] = (nome, mac)
+            expira_em = agora + (TTL_POSITIVO if nome else TTL_NEGATIVO)
+            linhas.append((_chave_ip(ip), nome, mac, expira_em))
+            if _chave_mac(mac):
+                linhas.append((_chave_mac(mac), nome, mac, expira_em))
+        conexao.executemany(
+            "INSERT OR REPLACE INTO cache_nomes (chave, nome, mac, expira_em) VALUES (?, ?, ?, ?)", linhas)
+
+    return resultados
+
+
+def limpar_cache_expirado(conexao, agora=None):
+    agora = int(agora if agora is not None else time.time())
+    return conexao.execute("DELETE FROM cache_nomes WHERE expira_em <= ?", (agora,)).rowcount
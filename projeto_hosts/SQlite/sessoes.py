@@ -0,0 +1,49 @@
+import datetime
+import time
+
+# =======================================================
+#   TEMPO DE USO POR SESSÕES ONLINE
+#   A tabela `sessoes` (migração 003) guarda cada período Online de um ativo
+#   (inicio/fim em epoch; fim NULL = sessão aberta). Os gatilhos na
+#   ativos_online abrem e fecham as sessões, então tempo online e uso
+#   acumulado saem de uma única consulta agregada.
+# =======================================================
+
+CONSULTA_TEMPO_DE_USO = '''
+    SELECT a.id, a.nome, a.ip_address, a.status, a.condicao,
+           MAX(CASE WHEN s.fim IS NULL THEN :agora - s.inicio END) AS tempo_online,
+           COALESCE(SUM(MAX(0, MIN(COALESCE(s.fim, :agora), :fim) - MAX(s.inicio, :inicio))), 0) AS uso_total,
+           COUNT(s.id) AS sessoes
+    FROM ativos_online a
+    LEFT JOIN sessoes s ON s.ativo_id = a.id AND s.inicio <= :fim AND (s.fim IS NULL OR s.fim > :inicio)
+    {filtro}
+    GROUP BY a.id
+    ORDER BY a.id
+'''
+
+
+def tempo_de_uso(conexao, inicio=None, fim=None, ativo_id=None, agora=None):
+    """
+    Tempo de uso de cada ativo (ou só de `ativo_id`), em segundos:
+      tempo_online = duração da sessão aberta (None se o ativo está Offline);
+      uso_total    = soma das sessões dentro da janela [inicio, fim) (padrão: todo o histórico);
+      sessoes      = quantas sessões tocam a janela.
+    """
+    agora = int(agora if agora is not None else time.time())
+    parametros = {
+        'agora': agora,
+        'inicio': int(inicio) if inicio is not None else 0,
+        'fim': min(int(fim), agora) if fim is not None else agora,
+        'ativo_id': ativo_id,
+    }
+    filtro = "WHERE a.id = :ativo_id" if ativo_id is not None else ""
+    colunas = ('id', 'nome', 'ip_address', 'status', 'condicao', 'tempo_online', 'uso_total', 'sessoes')
+    return [dict(zip(colunas, linha))
+            for linha in conexao.execute(CONSULTA_TEMPO_DE_USO.format(filtro=filtro), parametros)]
+
+
+def formatar_duracao(segundos):
+    """Segundos → texto no formato do timedelta (ex: '2 days, 3:04:05'); None vira '-'."""
+    if segundos is None:
+        return '-'
+    return str(datetime.timedelta(seconds=int(segundos)))
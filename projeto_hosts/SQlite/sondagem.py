@@ -0,0 +1,406 @@
+import asyncio
+import errno
+import itertools
+import os
+import random
+import socket
+import struct
+import time
+
+try:
+    import resource  # Só existe em Unix; no Windows não há limite de descritores por processo
+except ImportError:
+    resource = None
+
+# --- Configurações ---
+TIMEOUT_PADRAO = 1.0   # Segundos de espera por host
+JANELA_PADRAO = 1024   # Máximo de sondagens em voo ao mesmo tempo
+MAX_CONEXOES_TCP = 2048  # Sockets TCP abertos ao mesmo tempo (reduzido ao limite de descritores, ver limite_de_conexoes)
+MARGEM_DESCRITORES = 128  # Descritores deixados livres para o banco, o socket ICMP, o Flask...
+ESPERA_SEM_DESCRITORES = 0.01  # Segundos até tentar de novo quando o processo fica sem descritores
+
+# Portas tentadas pela SondaTCP conforme o tipo do ativo (hosts que descartam ICMP)
+PORTAS_TCP_PADRAO = [445, 135, 3389, 22, 80, 443]
+PORTAS_TCP_POR_TIPO = {
+    'Computador': [445, 135, 3389, 22],
+    'Notebook': [445, 135, 3389, 22],
+    'Servidor': [22, 445, 3389, 80, 443],
+    'Impressora': [9100, 631, 80, 443, 515],
+    'Roteador/Firewall': [80, 443, 22, 53],
+    'Switch': [22, 23, 80, 443],
+    'Rede': [80, 443, 22],
+    'Camera': [554, 80, 443],
+    'VoIP': [5060, 80, 443],
+    'Smartphone': [62078, 5228],
+}
+# ---------------------
+
+ICMP_ECHO_REQUEST = 8
+ICMP_ECHO_REPLY = 0
+
+
+# =======================================================
+#   BACKENDS DE SONDAGEM
+# =======================================================
+
+def _checksum(dados):
+    """Checksum de 16 bits (RFC 1071) usado no cabeçalho ICMP."""
+    if len(dados) % 2:
+        dados += b'\x00'
+    soma = sum(struct.unpack(f'!{len(dados) // 2}H', dados))
+    soma = (soma >> 16) + (soma & 0xFFFF)
+    soma += soma >> 16
+    return ~soma & 0xFFFF
+
+
+def _montar_echo(identificador, sequencia, payload=b'hosts-monitor'):
+    """Monta um pacote ICMP Echo Request."""
+    cabecalho = struct.pack('!BBHHH', ICMP_ECHO_REQUEST, 0, 0, identificador, sequencia)
+    checksum = _checksum(cabecalho + payload)
+    cabecalho = struct.pack('!BBHHH', ICMP_ECHO_REQUEST, 0, checksum, identificador, sequencia)
+    return cabecalho + payload
+
+
+class SondaICMP:
+    """
+    Sonda ICMP Echo assíncrona: um único socket atende todos os hosts.
+    Tenta primeiro o socket datagrama (ping sem root no Linux) e depois o raw.
+    As respostas são casadas com a requisição pelo par (ip, sequência).
+    """
+
+    def __init__(self):
+        self._sock = None
+        self._raw = False
+        self._loop = None
+        self._pendentes = {}
+        self._sequencias = itertools.count(1)
+        self._identificador = os.getpid() & 0xFFFF
+
+    def _abrir(self):
+        try:
+            sock = socket.socket(socket.AF_INET, socket.SOCK_DGRAM, socket.IPPROTO_ICMP)
+            self._raw = False
+        except OSError:
+            # Sem permissão para o ping datagrama: precisa de root/CAP_NET_RAW
+            sock = socket.socket(socket.AF_INET, socket.SOCK_RAW, socket.IPPROTO_ICMP)
+            self._raw = True
+        sock.setblocking(False)
+        self._sock = sock
+        self._loop = asyncio.get_running_loop()
+        self._loop.add_reader(sock.fileno(), self._ler_respostas)
+
+    def _ler_respostas(self):
+        while True:
+            try:
+                dados, (ip, _) = self._sock.recvfrom(2048)
+            except (BlockingIOError, InterruptedError):
+                return
+            except OSError:
+                return
+
+            if self._raw:
+                # O socket raw entrega o cabeçalho IP junto
+                dados = dados[(dados[0] & 0x0F) * 4:]
+            if len(dados) < 8:
+                continue
+
+            tipo, _, _, identificador, sequencia = struct.unpack('!BBHHH', dados[:8])
+            if tipo != ICMP_ECHO_REPLY:
+                continue
+            # No socket datagrama o kernel reescreve o identificador
+            if self._raw and identificador != self._identificador:
+                continue
+
+            futuro = self._pendentes.pop((ip, sequencia), None)
+            if futuro is not None and not futuro.done():
+                futuro.set_result(time.perf_counter())
+
+    async def sondar(self, ip, timeout):
+        """Retorna o RTT em segundos ou None se o host não respondeu a tempo."""
+        if self._sock is None:
+            self._abrir()
+
+        sequencia = next(self._sequencias) & 0xFFFF
+        chave = (ip, sequencia)
+        futuro = self._loop.create_future()
+        self._pendentes[chave] = futuro
+        pacote = _montar_echo(self._identificador, sequencia)
+        inicio = time.perf_counter()
+        try:
+            while True:
+                try:
+                    self._sock.sendto(pacote, (ip, 0))
+                    break
+                except BlockingIOError:
+                    # Buffer de envio cheio: cede a vez e tenta de novo
+                    if time.perf_counter() - inicio >= timeout:
+                        return None
+                    await asyncio.sleep(0.001)
+            restante = max(0.0, timeout - (time.perf_counter() - inicio))
+            chegada = await asyncio.wait_for(futuro, restante)
+            return chegada - inicio
+        except (asyncio.TimeoutError, OSError):
+            return None
+        finally:
+            self._pendentes.pop(chave, None)
+
+    def fechar(self):
+        if self._sock is not None:
+            try:
+                self._loop.remove_reader(self._sock.fileno())
+            except Exception:
+                pass
+            self._sock.close()
+            self._sock = None
+
+
+def limite_de_conexoes(maximo=MAX_CONEXOES_TCP):
+    """
+    Quantos sockets TCP a sonda pode manter abertos: `maximo`, mas nunca acima do
+    limite de descritores do processo (RLIMIT_NOFILE, 1024 por padrão no Linux)
+    menos MARGEM_DESCRITORES.
+    """
+    if resource is None:
+        return maximo
+    suave, _ = resource.getrlimit(resource.RLIMIT_NOFILE)
+    if suave == resource.RLIM_INFINITY:
+        return maximo
+    livres = suave - MARGEM_DESCRITORES if suave > 2 * MARGEM_DESCRITORES else suave // 2
+    return max(1, min(maximo, livres))
+
+
+def portas_para_tipo(tipo):
+    return PORTAS_TCP_POR_TIPO.get(tipo, PORTAS_TCP_PADRAO)
+
+
+class SondaTCP:
+    """
+    Sonda por TCP connect para hosts que descartam ICMP (ex.: Windows com firewall).
+    Tenta as portas do host em paralelo; vale a primeira que completar o
+    handshake OU responder RST (conexão recusada também prova que o host existe).
+    `portas_por_ip` define a lista de cada IP; os demais usam `portas_padrao`.
+    Os sockets são fechados com RST (SO_LINGER 0) para não acumular TIME_WAIT.
+    """
+
+    def __init__(self, portas_por_ip=None, portas_padrao=None, max_conexoes=MAX_CONEXOES_TCP):
+        self.portas_por_ip = portas_por_ip or {}
+        self.portas_padrao = portas_padrao or PORTAS_TCP_PADRAO
+        self._max_conexoes = limite_de_conexoes(max_conexoes)
+        self._limite = None
+
+    async def _conectar(self, ip, porta, prazo):
+        async with self._limite:
+            loop = asyncio.get_running_loop()
+            while True:
+                sock = None
+                try:
+                    sock = socket.socket(socket.AF_INET, socket.SOCK_STREAM)
+                    sock.setblocking(False)
+                    sock.setsockopt(socket.SOL_SOCKET, socket.SO_LINGER, struct.pack('ii', 1, 0))
+                    restante = prazo - time.perf_counter()
+                    if restante <= 0:
+                        return False
+                    await asyncio.wait_for(loop.sock_connect(sock, (ip, porta)), restante)
+                    return True
+                except ConnectionRefusedError:
+                    return True
+                except OSError as e:
+                    # Sem descritores livres (outras partes do processo também abrem arquivos):
+                    # só esta tentativa espera, a varredura continua
+                    if e.errno not in (errno.EMFILE, errno.ENFILE):
+                        return e.errno == errno.ECONNREFUSED
+                    if prazo - time.perf_counter() <= ESPERA_SEM_DESCRITORES:
+                        return False
+                except asyncio.TimeoutError:
+                    return False
+                finally:
+                    if sock is not None:
+                        sock.close()
+                await asyncio.sleep(ESPERA_SEM_DESCRITORES)
+
+    async def sondar(self, ip, timeout):
+        """Retorna o tempo até a primeira porta responder ou None."""
+        if self._limite is None:
+            self._limite = asyncio.Semaphore(self._max_conexoes)
+        inicio = time.perf_counter()
+        prazo = inicio + timeout
+        tentativas = [asyncio.ensure_future(self._conectar(ip, porta, prazo))
+                      for porta in self.portas_por_ip.get(ip) or self.portas_padrao]
+        try:
+            for concluida in asyncio.as_completed(tentativas):
+                if await concluida:
+                    return time.perf_counter() - inicio
+            return None
+        finally:
+            for tentativa in tentativas:
+                tentativa.cancel()
+
+    def fechar(self):
+        pass
+
+
+class SondaPing3:
+    """Alternativa usando a biblioteca ping3 em threads (quando não há socket ICMP)."""
+
+    def __init__(self):
+        from ping3 import ping
+        self._ping = ping
+
+    async def sondar(self, ip, timeout):
+        loop = asyncio.get_running_loop()
+        try:
+            resposta = await loop.run_in_executor(None, lambda: self._ping(ip, timeout=timeout))
+        except Exception:
+            return None
+        return resposta if resposta else None
+
+    def fechar(self):
+        pass
+
+
+class SondaFalsa:
+    """
+    Sonda simulada (sem rede) para benchmarks e testes.
+    Cada host responde com RTT exponencial ou é "perdido" com a taxa informada.
+    """
+
+    def __init__(self, taxa_perda=0.1, rtt_medio=0.02, semente=None):
+        self.taxa_perda = taxa_perda
+        self.rtt_medio = rtt_medio
+        self._aleatorio = random.Random(semente)
+
+    async def sondar(self, ip, timeout):
+        if self._aleatorio.random() < self.taxa_perda:
+            await asyncio.sleep(timeout)
+            return None
+        rtt = self._aleatorio.expovariate(1 / self.rtt_medio)
+        if rtt >= timeout:
+            await asyncio.sleep(timeout)
+            return None
+        await asyncio.sleep(rtt)
+        return rtt
+
+    def fechar(self):
+        pass
+
+
+def criar_sonda_padrao():
+    """Escolhe o melhor backend disponível nesta máquina."""
+    try:
+        sock = socket.socket(socket.AF_INET, socket.SOCK_DGRAM, socket.IPPROTO_ICMP)
+        sock.close()
+        return SondaICMP()
+    except OSError:
+        pass
+    try:
+        sock = socket.socket(socket.AF_INET, socket.SOCK_RAW, socket.IPPROTO_ICMP)
+        sock.close()
+        return SondaICMP()
+    except OSError:
+        return SondaPing3()
+
+
+class OuvinteTCPLocal:
+    """
+    Portas TCP escutando localmente (substituto de um host com serviços em testes).
+    O kernel completa o handshake sozinho, então não há thread de atendimento.
+    Uso:
+        with OuvinteTCPLocal(quantidade=2) as ouvinte:
+            varrer_hosts(['127.0.0.1'], sonda=SondaTCP(portas_padrao=ouvinte.portas))
+    """
+
+    def __init__(self, host='127.0.0.1', portas=None, quantidade=1, backlog=4096):
+        self.host = host
+        self._socks = []
+        for porta in portas or [0] * quantidade:
+            sock = socket.socket(socket.AF_INET, socket.SOCK_STREAM)
+            sock.setsockopt(socket.SOL_SOCKET, socket.SO_REUSEADDR, 1)
+            sock.bind((host, porta))
+            sock.listen(backlog)
+            self._socks.append(sock)
+        self.portas = [sock.getsockname()[1] for sock in self._socks]
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *_):
+        for sock in self._socks:
+            sock.close()
+
+
+# =======================================================
+#   VARREDURA CONCORRENTE
+# =======================================================
+
+async def varrer_async(ips, sonda, timeout=TIMEOUT_PADRAO, janela=JANELA_PADRAO):
+    """
+    Sonda todos os IPs com no máximo `janela` sondagens em voo.
+    Retorna {ip: rtt_em_segundos ou None}.
+    """
+    ips = list(ips)
+    resultados = {}
+    if not ips:
+        return resultados
+
+    # A sequência ICMP tem 16 bits: a janela não pode passar disso
+    janela = max(1, min(janela, 0xFFFF, len(ips)))
+    pendentes = iter(ips)
+
+    async def trabalhador():
+        # Todos os trabalhadores consomem o mesmo iterador (memória constante)
+        for ip in pendentes:
+            resultados[ip] = await sonda.sondar(ip, timeout)
+
+    await asyncio.gather(*(trabalhador() for _ in range(janela)))
+    return resultados
+
+
+def varrer_hosts(ips, sonda=None, timeout=TIMEOUT_PADRAO, janela=JANELA_PADRAO):
+    """Versão síncrona de varrer_async (para scripts e threads do Flask)."""
+    sonda_propria = sonda is None
+    if sonda_propria:
+        sonda = criar_sonda_padrao()
+
+    async def _executar():
+        try:
+            return await varrer_async(ips, sonda, timeout, janela)
+        finally:
+            if sonda_propria:
+                sonda.fechar()
+
+    return asyncio.run(_executar())
+
+
+def benchmark(total_hosts, janela=JANELA_PADRAO, timeout=TIMEOUT_PADRAO, taxa_perda=0.1):
+    """Mede a vazão do motor com a SondaFalsa (não envia pacotes)."""
+    ips = (f"10.{(i >> 16) & 255}.{(i >> 8) & 255}.{i & 255}" for i in range(total_hosts))
+    sonda = SondaFalsa(taxa_perda=taxa_perda, semente=42)
+
+    inicio = time.perf_counter()
+    resultados = varrer_hosts(ips, sonda=sonda, timeout=timeout, janela=janela)
+    duracao = time.perf_counter() - inicio
+
+    online = sum(1 for rtt in resultados.values() if rtt is not None)
+    print(f"{total_hosts} hosts em {duracao:.2f}s ({total_hosts / duracao:.0f} hosts/s) | "
+          f"janela={janela} timeout={timeout}s | online={online} offline={total_hosts - online}")
+    return duracao
+
+
+if __name__ == "__main__":
+    import argparse
+
+    parser = argparse.ArgumentParser(description='Motor de sondagem concorrente')
+    parser.add_argument('ips', nargs='*', help='IPs para sondar')
+    parser.add_argument('--benchmark', type=int, metavar='N', help='Simula N hosts com a sonda falsa')
+    parser.add_argument('--janela', type=int, default=JANELA_PADRAO)
+    parser.add_argument('--timeout', type=float, default=TIMEOUT_PADRAO)
+    parser.add_argument('--perda', type=float, default=0.1, help='Taxa de perda da sonda falsa')
+    parser.add_argument('--tcp', metavar='PORTAS', help='Usa a sonda TCP nessas portas (ex: 445,3389)')
+    args = parser.parse_args()
+
+    if args.benchmark:
+        benchmark(args.benchmark, janela=args.janela, timeout=args.timeout, taxa_perda=args.perda)
+    else:
+        sonda = SondaTCP(portas_padrao=[int(p) for p in args.tcp.split(',')]) if args.tcp else None
+        for ip, rtt in varrer_hosts(args.ips, sonda=sonda, timeout=args.timeout, janela=args.janela).items():
+            print(f"{ip}: {f'{rtt * 1000:.1f} ms' if rtt is not None else 'sem resposta'}")
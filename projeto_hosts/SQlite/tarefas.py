@@ -0,0 +1,150 @@
+import datetime
+import threading
+import uuid
+from concurrent.futures import ThreadPoolExecutor
+
+# --- Configurações ---
+MAX_TAREFAS_SIMULTANEAS = 2  # Threads dedicadas aos scans (fora dos workers do Flask)
+HISTORICO_MAXIMO = 200       # Tarefas finalizadas guardadas para consulta
+# ---------------------
+
+FASES_FINAIS = ('concluido', 'erro', 'cancelado')
+
+_executor = ThreadPoolExecutor(max_workers=MAX_TAREFAS_SIMULTANEAS, thread_name_prefix='tarefa-scan')
+_tarefas = {}
+_trava = threading.Lock()
+
+
+class Tarefa:
+    """
+    Estado de uma tarefa em segundo plano (fase, progresso e contagem de hosts).
+    Tarefas canceláveis recebem o evento `cancelamento` como `cancelar=`.
+    """
+
+    def __init__(self, tipo, cancelavel=False):
+        self.id = uuid.uuid4().hex
+        self.tipo = tipo
+        self.cancelavel = cancelavel
+        self.cancelamento = threading.Event()
+        self.fase = 'na_fila'
+        self.progresso = 0
+        self.hosts_encontrados = 0
+        self.hosts_processados = 0
+        self.erro = None
+        self.resultado = None
+        self.criado_em = datetime.datetime.now().isoformat()
+        self.iniciado_em = None
+        self.finalizado_em = None
+        self._trava = threading.Lock()
+
+    def atualizar(self, fase=None, hosts_encontrados=None, hosts_processados=None, progresso=None):
+        """Callback de progresso repassado às funções de scan."""
+        with self._trava:
+            if fase is not None:
+                self.fase = fase
+            if hosts_encontrados is not None:
+                self.hosts_encontrados = hosts_encontrados
+            if hosts_processados is not None:
+                self.hosts_processados = hosts_processados
+            if progresso is not None:
+                self.progresso = progresso
+            elif self.hosts_encontrados:
+                self.progresso = min(99, int(100 * self.hosts_processados / self.hosts_encontrados))
+
+    @property
+    def finalizada(self):
+        return self.fase in FASES_FINAIS
+
+    def como_dict(self):
+        with self._trava:
+            return {
+                'id': self.id,
+                'tipo': self.tipo,
+                'cancelavel': self.cancelavel,
+                'fase': self.fase,
+                'progresso': self.progresso,
+                'hosts_encontrados': self.hosts_encontrados,
+                'hosts_processados': self.hosts_processados,
+                'erro': self.erro,
+                'resultado': self.resultado,
+                'criado_em': self.criado_em,
+                'iniciado_em': self.iniciado_em,
+                'finalizado_em': self.finalizado_em,
+            }
+
+
+def _executar(tarefa, funcao, args, kwargs):
+    if tarefa.cancelamento.is_set():
+        # Cancelada ainda na fila: nem começa
+        tarefa.finalizado_em = datetime.datetime.now().isoformat()
+        return
+    tarefa.iniciado_em = datetime.datetime.now().isoformat()
+    tarefa.atualizar(fase='executando')
+    if tarefa.cancelavel:
+        kwargs = dict(kwargs, cancelar=tarefa.cancelamento)
+    try:
+        resultado = funcao(*args, progresso=tarefa.atualizar, **kwargs)
+        if tarefa.cancelamento.is_set():
+            # O que já foi gravado antes do cancelamento fica no banco
+            tarefa.atualizar(fase='cancelado')
+        # As funções de scan retornam False quando o nmap falha
+        elif resultado is False:
+            tarefa.erro = 'Falha ao executar o scan.'
+            tarefa.atualizar(fase='erro')
+        else:
+            tarefa.resultado = None if resultado is True else resultado
+            tarefa.atualizar(fase='concluido', progresso=100)
+    except Exception as e:
+        tarefa.erro = str(e)
+        tarefa.atualizar(fase='erro')
+    finally:
+        tarefa.finalizado_em = datetime.datetime.now().isoformat()
+
+
+def _descartar_antigas():
+    """Mantém apenas as HISTORICO_MAXIMO tarefas finalizadas mais recentes."""
+    finalizadas = [t for t in _tarefas.values() if t.finalizada]
+    excesso = len(finalizadas) - HISTORICO_MAXIMO
+    if excesso > 0:
+        for tarefa in sorted(finalizadas, key=lambda t: t.criado_em)[:excesso]:
+            _tarefas.pop(tarefa.id, None)
+
+
+def submeter(tipo, funcao, *args, cancelavel=False, **kwargs):
+    """
+    Agenda `funcao` no executor dedicado e retorna a Tarefa criada.
+    A função recebe o callback `progresso=` além dos argumentos informados
+    (e o threading.Event `cancelar=` se `cancelavel`).
+    """
+    tarefa = Tarefa(tipo, cancelavel)
+    with _trava:
+        _descartar_antigas()
+        _tarefas[tarefa.id] = tarefa
+    _executor.submit(_executar, tarefa, funcao, args, kwargs)
+    return tarefa
+
+
+def cancelar(id_tarefa):
+    """
+    Pede o cancelamento de uma tarefa cancelável. Retorna a Tarefa (None se não existir).
+    A função em execução para no próximo ponto de checagem; uma tarefa na fila nem começa.
+    """
+    with _trava:
+        tarefa = _tarefas.get(id_tarefa)
+    if tarefa is None or not tarefa.cancelavel or tarefa.finalizada:
+        return tarefa
+    tarefa.cancelamento.set()
+    with tarefa._trava:
+        if tarefa.fase == 'na_fila':
+            tarefa.fase = 'cancelado'
+    return tarefa
+
+
+def obter(id_tarefa):
+    with _trava:
+        return _tarefas.get(id_tarefa)
+
+
+def listar():
+    with _trava:
+        return sorted(_tarefas.values(), key=lambda t: t.criado_em, reverse=True)
@@ -0,0 +1,20 @@
+import os
+import sys
+
+import pytest
+
+# Os módulos do projeto são planos (from banco import conectar...): a pasta SQlite vai para o path
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import banco  # noqa: E402
+
+
+@pytest.fixture
+def banco_temporario(tmp_path, monkeypatch):
+    """Banco vazio e migrado em uma pasta temporária (o meu_banco.db do projeto não é tocado)."""
+    import migracoes
+    banco.fechar_todas()
+    monkeypatch.setattr(banco, 'DB_FILE', str(tmp_path / 'teste.db'))
+    migracoes.migrar()
+    yield banco.DB_FILE
+    banco.fechar_todas()
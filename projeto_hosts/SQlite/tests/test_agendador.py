@@ -0,0 +1,73 @@
+import agendador
+from banco import conectar
+from sondagem import OuvinteTCPLocal, SondaFalsa
+
+AGORA = 1764504000  # 2025-11-30 12:00:00 UTC
+
+
+class SondaAnotada(SondaFalsa):
+    """SondaFalsa sem perda que guarda os IPs sondados (e só responde a `respondem`, se informado)."""
+
+    def __init__(self, respondem=None):
+        super().__init__(taxa_perda=0, rtt_medio=0.001, semente=1)
+        self.respondem = respondem
+        self.sondados = []
+
+    async def sondar(self, ip, timeout):
+        self.sondados.append(ip)
+        if self.respondem is not None and ip not in self.respondem:
+            return None
+        return await super().sondar(ip, timeout)
+
+
+def _ativo(id_ativo, ip, metodo, tipo=None):
+    # Mesma ordem de colunas de agendador.ativos_pendentes
+    return (id_ativo, f'ativo-{id_ativo}', ip, 'Online', 'Monitorado', 60, None, 0, tipo, metodo)
+
+
+def _cadastrar(conexao, nome, ip, status):
+    return conexao.execute(
+        "INSERT INTO ativos_online (nome, ip_address, status) VALUES (?, ?, ?)", (nome, ip, status)).lastrowid
+
+
+def test_presenca_passiva_dispensa_a_sondagem(banco_temporario):
+    conexao = conectar()
+    with conexao:
+        presente = _cadastrar(conexao, 'notebook', '10.0.0.1', 'Offline')
+        sondado = _cadastrar(conexao, 'servidor', '10.0.0.2', 'Online')
+    mudancas = []
+    sonda = SondaAnotada()
+
+    verificados, mudaram = agendador.verificar_pendentes(
+        conexao, ao_mudar=lambda ativo, status: mudancas.append((ativo['id'], status)),
+        sonda=sonda, agora=AGORA, presentes={'10.0.0.1': 'F0:18:98:4D:AA:02'})
+
+    assert (verificados, mudaram) == (2, 1)
+    assert sonda.sondados == ['10.0.0.2']
+    assert mudancas == [(presente, 'Online')]
+    # Só quem foi sondado tem amostra de latência; os dois foram reagendados
+    assert [linha[0] for linha in conexao.execute("SELECT ativo_id FROM latencia")] == [sondado]
+    assert {linha[0] for linha in conexao.execute("SELECT ativo_id FROM agenda_sondagem")} == {presente, sondado}
+    conexao.close()
+
+
+def test_sondar_por_metodo_comeca_pelo_metodo_de_cada_ativo(monkeypatch):
+    with OuvinteTCPLocal() as ouvinte:
+        porta_fechada = ouvinte.portas[0]
+    # Todo TCP em 127.0.0.x responde (RST da porta fechada); o "ICMP" só responde em 127.0.0.2
+    ativos = [_ativo(1, '127.0.0.2', agendador.METODO_ICMP),
+              _ativo(2, '127.0.0.3', agendador.METODO_TCP),
+              _ativo(3, '127.0.0.4', None),
+              _ativo(4, '127.0.0.5', agendador.METODO_ICMP)]
+    monkeypatch.setattr(agendador, 'portas_para_tipo', lambda tipo: [porta_fechada])
+    sonda = SondaAnotada(respondem={'127.0.0.2'})
+    resultado = agendador.sondar_por_metodo(ativos, sonda=sonda, timeout=1)
+
+    assert {ip: metodo for ip, (_, metodo) in resultado.items()} == {
+        '127.0.0.2': agendador.METODO_ICMP,
+        '127.0.0.3': agendador.METODO_TCP,   # Nem passou pelo ICMP
+        '127.0.0.4': agendador.METODO_TCP,   # Sem método salvo: ICMP primeiro, TCP depois
+        '127.0.0.5': agendador.METODO_TCP,
+    }
+    assert all(rtt is not None for rtt, _ in resultado.values())
+    assert sorted(sonda.sondados) == ['127.0.0.2', '127.0.0.4', '127.0.0.5']
@@ -0,0 +1,35 @@
+import classificador
+
+TIPOS_DE_REDE = ('Roteador/Firewall', 'Switch', 'Rede')
+
+
+def test_cisco_ios_nao_vira_smartphone():
+    assert classificador.classificar('switch-core', 'Cisco Systems', 'Cisco IOS 15.2') == 'Switch'
+    assert classificador.classificar('core-01', 'Cisco Systems', 'Cisco IOS 15.2') in TIPOS_DE_REDE
+    assert classificador.classificar(None, None, 'Cisco IOS XE 16.9') in TIPOS_DE_REDE
+
+
+def test_aparelhos_apple_continuam_smartphone():
+    assert classificador.classificar('iPhone-de-Ana', 'Apple', 'Apple iOS 17') == 'Smartphone'
+    assert classificador.classificar(None, 'Apple', 'Apple iOS 16.4') == 'Smartphone'
+    assert classificador.classificar('tablet-sala', 'Apple', 'iPadOS 17') == 'Smartphone'
+
+
+def test_palavra_so_casa_inteira():
+    # 'hp' dentro de 'whatsapp' e 'pc' dentro de 'hpc01' não contam
+    assert classificador.classificar('whatsapp-gw', None, None) == 'Outros Dispositivos'
+    assert classificador.classificar('hpc01', None, None) == 'Outros Dispositivos'
+    assert classificador.classificar('ios-lab', None, None) == 'Outros Dispositivos'
+    assert classificador.classificar('hp-laserjet-rh', None, None) == 'Impressora'
+    assert classificador.classificar('pc-recepcao', None, None) == 'Computador'
+
+
+def test_impressora_de_rede_continua_impressora():
+    assert classificador.classificar(None, 'Hewlett Packard', 'HP JetDirect network printer') == 'Impressora'
+
+
+def test_lote_na_mesma_ordem():
+    itens = [('switch-core', 'Cisco Systems', 'Cisco IOS 15.2'),
+             ('pc-recepcao', 'Dell', 'Windows 10'),
+             ('switch-core', 'Cisco Systems', 'Cisco IOS 15.2')]
+    assert classificador.classificar_lote(itens) == ['Switch', 'Computador', 'Switch']
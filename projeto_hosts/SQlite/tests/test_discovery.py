@@ -0,0 +1,53 @@
+import banco
+import discovery
+from fingerprints import carregar_fingerprints, salvar_fingerprints, separar_para_fingerprint
+from inventario import ComparadorInventario
+
+IP = '192.168.0.2'
+MAC = 'C8:3A:35:1F:80:02'
+SALVO_EM = 1764504000  # 2025-11-30 12:00:00 UTC
+SERVICOS = [{'porta': 22, 'protocolo': 'tcp', 'nome': 'ssh', 'produto': 'Cisco SSH'}]
+
+
+def _salvar_lote(conexao, dados_por_ip, em_cache):
+    # NetBIOS sem resposta (None): o nome vem do nmap ou do fingerprint
+    discovery.salvar_lote_detalhado(conexao, ComparadorInventario(conexao), [IP], {IP: MAC},
+                                    dados_por_ip, em_cache, {IP: (None, MAC)})
+
+
+def test_host_do_cache_mantem_hostname_os_e_servicos(banco_temporario):
+    conexao = banco.conectar()
+    salvar_fingerprints(conexao, [(MAC, IP, 'switch-core', 'Cisco IOS 15.2', SERVICOS, 'Switch')], agora=SALVO_EM)
+    conexao.commit()
+
+    para_escanear, em_cache = separar_para_fingerprint(conexao, {IP: MAC}, agora=SALVO_EM + 60)
+    assert para_escanear == []
+    _salvar_lote(conexao, {}, em_cache)
+
+    assert tuple(conexao.execute("SELECT nome, tipo FROM ativos_online WHERE ip_address=?", (IP,)).fetchone()) == \
+        ('switch-core (Cisco IOS 15.2)', 'Switch')
+    registro = carregar_fingerprints(conexao, [MAC])[MAC]
+    assert (registro['hostname'], registro['servicos'], registro['atualizado_em']) == ('switch-core', SERVICOS, SALVO_EM)
+
+
+def test_tipo_do_cache_quando_nenhuma_regra_casa(banco_temporario):
+    conexao = banco.conectar()
+    salvar_fingerprints(conexao, [(MAC, IP, 'nas01', 'OS Bloqueado', [], 'Servidor')], agora=SALVO_EM)
+    conexao.commit()
+
+    _, em_cache = separar_para_fingerprint(conexao, {IP: MAC}, agora=SALVO_EM + 60)
+    _salvar_lote(conexao, {}, em_cache)
+
+    assert tuple(conexao.execute("SELECT nome, tipo FROM ativos_online WHERE ip_address=?", (IP,)).fetchone()) == \
+        ('nas01 (OS Bloqueado)', 'Servidor')
+
+
+def test_scan_detalhado_grava_hostname_no_fingerprint(banco_temporario):
+    conexao = banco.conectar()
+    dados = {'hostnames': [{'name': 'switch-core'}], 'osmatch': [{'name': 'Cisco IOS 15.2'}],
+             'tcp': {22: {'state': 'open', 'name': 'ssh', 'product': 'Cisco SSH'}}}
+    _salvar_lote(conexao, {IP: dados}, {})
+
+    registro = carregar_fingerprints(conexao, [MAC])[MAC]
+    assert (registro['hostname'], registro['os_guess'], registro['servicos'], registro['tipo']) == \
+        ('switch-core', 'Cisco IOS 15.2', SERVICOS, 'Switch')
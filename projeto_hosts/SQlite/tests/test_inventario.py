@@ -0,0 +1,87 @@
+from banco import conectar
+from inventario import ComparadorInventario
+
+DATA_1 = '2025-11-30T12:00:00'
+DATA_2 = '2025-11-30T13:00:00'
+
+PRIMEIRO_SCAN = [
+    ('192.168.0.10', 'AA:BB:CC:00:00:10', 'PC-RECEPCAO (Windows 10)', 'Computador'),
+    ('192.168.0.20', 'AA:BB:CC:00:00:20', 'impressora-rh (OS Bloqueado)', 'Impressora'),
+    ('192.168.0.30', 'N/A', 'Dispositivo-30 (OS Bloqueado)', 'Outros Dispositivos'),
+]
+
+
+def _scan(conexao, hosts, data, **kwargs):
+    comparador = ComparadorInventario(conexao)
+    comparador.aplicar(hosts, data, **kwargs)
+    return comparador
+
+
+def _ativos(conexao):
+    return {linha['ip_address']: (linha['mac_address'], linha['nome'], linha['status'], linha['data_inicio'])
+            for linha in conexao.execute("SELECT * FROM ativos_online")}
+
+
+def test_scan_repetido_nao_escreve_nada(banco_temporario):
+    conexao = conectar()
+    with conexao:
+        primeiro = _scan(conexao, PRIMEIRO_SCAN, DATA_1)
+    assert primeiro.contagem == {'inseridos': 3, 'alterados': 0, 'inalterados': 0, 'offline': 0}
+
+    antes = conexao.total_changes
+    with conexao:
+        segundo = _scan(conexao, PRIMEIRO_SCAN, DATA_2)
+    assert segundo.contagem == {'inseridos': 0, 'alterados': 0, 'inalterados': 3, 'offline': 0}
+    assert conexao.total_changes == antes
+    # O data_inicio continua o da entrada
+    assert {dados[3] for dados in _ativos(conexao).values()} == {DATA_1}
+    conexao.close()
+
+
+def test_novo_alterado_e_offline(banco_temporario):
+    conexao = conectar()
+    with conexao:
+        _scan(conexao, PRIMEIRO_SCAN, DATA_1)
+
+    segundo_scan = [
+        ('192.168.0.11', 'AA:BB:CC:00:00:10', 'PC-RECEPCAO (Windows 10)', 'Computador'),  # DHCP trocou o IP
+        ('192.168.0.30', 'N/A', 'Dispositivo-30 (OS Bloqueado)', 'Outros Dispositivos'),   # Igual
+        ('192.168.0.40', 'AA:BB:CC:00:00:40', 'notebook-ana (Linux)', 'Notebook'),           # Novo
+    ]
+    with conexao:
+        comparador = _scan(conexao, segundo_scan, DATA_2)
+        comparador.marcar_offline()
+    assert comparador.contagem == {'inseridos': 1, 'alterados': 1, 'inalterados': 1, 'offline': 1}
+
+    ativos = _ativos(conexao)
+    assert set(ativos) == {'192.168.0.11', '192.168.0.20', '192.168.0.30', '192.168.0.40'}
+    assert ativos['192.168.0.11'][:3] == ('AA:BB:CC:00:00:10', 'PC-RECEPCAO (Windows 10)', 'Online')
+    assert ativos['192.168.0.20'][2] == 'Offline'
+    assert ativos['192.168.0.40'][3] == DATA_2
+
+    # Volta do Offline: conta como alterado e ganha novo data_inicio
+    with conexao:
+        terceiro = _scan(conexao, [PRIMEIRO_SCAN[1]], DATA_2)
+    assert terceiro.contagem['alterados'] == 1
+    assert _ativos(conexao)['192.168.0.20'][2:] == ('Online', DATA_2)
+    conexao.close()
+
+
+def test_manter_nome_e_preencher_mac(banco_temporario):
+    conexao = conectar()
+    with conexao:
+        _scan(conexao, PRIMEIRO_SCAN, DATA_1)
+
+    # Etapa rápida do discovery: nome genérico não apaga o nome do fingerprint,
+    # mas o MAC que faltava é preenchido
+    with conexao:
+        comparador = _scan(conexao, [
+            ('192.168.0.10', 'AA:BB:CC:00:00:10', 'Dispositivo-10', 'Outros Dispositivos'),
+            ('192.168.0.30', 'AA:BB:CC:00:00:30', 'Dispositivo-30', 'Outros Dispositivos'),
+        ], DATA_2, manter_nome=True)
+    assert comparador.contagem == {'inseridos': 0, 'alterados': 1, 'inalterados': 1, 'offline': 0}
+
+    ativos = _ativos(conexao)
+    assert ativos['192.168.0.10'][1] == 'PC-RECEPCAO (Windows 10)'
+    assert ativos['192.168.0.30'][:2] == ('AA:BB:CC:00:00:30', 'Dispositivo-30 (OS Bloqueado)')
+    conexao.close()
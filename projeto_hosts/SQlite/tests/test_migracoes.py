@@ -0,0 +1,93 @@
+import types
+
+import pytest
+
+import banco
+import migracoes
+
+
+def _passo(descricao, aplicar, preencher=None):
+    modulo = types.ModuleType('migracoes.teste')
+    modulo.DESCRICAO = descricao
+    modulo.aplicar = aplicar
+    if preencher is not None:
+        modulo.preencher = preencher
+    return modulo
+
+
+def _versoes(conexao):
+    return [tuple(linha) for linha in conexao.execute(
+        "SELECT versao, preenchida_em IS NOT NULL FROM schema_version ORDER BY versao")]
+
+
+def test_banco_novo_recebe_todas_as_migracoes(tmp_path, monkeypatch):
+    banco.fechar_todas()
+    monkeypatch.setattr(banco, 'DB_FILE', str(tmp_path / 'novo.db'))
+    todas = [versao for versao, _ in migracoes.listar_migracoes()]
+    assert todas == sorted(todas) and todas[0] == 1
+
+    assert migracoes.migrar() == todas
+    assert migracoes.migrar() == []  # Nada pendente na segunda vez
+
+    conexao = banco.conectar()
+    try:
+        assert migracoes.versao_atual(conexao) == todas[-1]
+        assert _versoes(conexao) == [(versao, 1) for versao in todas]
+    finally:
+        conexao.close()
+        banco.fechar_todas()
+
+
+def test_falha_em_um_passo_desfaz_o_lote_inteiro(banco_temporario, monkeypatch):
+    reais = migracoes.listar_migracoes()
+    ultima = reais[-1][0]
+
+    def criar_tabela(conexao):
+        conexao.execute("CREATE TABLE teste_lote (id INTEGER PRIMARY KEY)")
+
+    def falhar(conexao):
+        raise RuntimeError("passo com erro")
+
+    monkeypatch.setattr(migracoes, 'listar_migracoes', lambda: reais + [
+        (ultima + 1, _passo("cria tabela", criar_tabela)),
+        (ultima + 2, _passo("falha", falhar)),
+    ])
+    conexao = banco.conectar(row_factory=None)
+    try:
+        with pytest.raises(RuntimeError):
+            migracoes.aplicar_pendentes(conexao)
+        assert migracoes.versao_atual(conexao) == ultima
+        assert conexao.execute("SELECT 1 FROM sqlite_master WHERE name='teste_lote'").fetchone() is None
+    finally:
+        conexao.close()
+
+
+def test_preenchimento_em_lotes(banco_temporario, monkeypatch):
+    reais = migracoes.listar_migracoes()
+    versao = reais[-1][0] + 1
+    lotes = []
+
+    def aplicar(conexao):
+        conexao.execute("CREATE TABLE teste_preencher (id INTEGER PRIMARY KEY, pronto INTEGER)")
+        conexao.executemany("INSERT INTO teste_preencher (id) VALUES (?)", [(i,) for i in range(5)])
+
+    def preencher(conexao, limite):
+        cursor = conexao.execute(
+            "UPDATE teste_preencher SET pronto=1 WHERE id IN "
+            "(SELECT id FROM teste_preencher WHERE pronto IS NULL LIMIT ?)", (limite,))
+        lotes.append(cursor.rowcount)
+        return cursor.rowcount
+
+    monkeypatch.setattr(migracoes, 'listar_migracoes', lambda: reais + [(versao, _passo("preencher", aplicar, preencher))])
+    conexao = banco.conectar(row_factory=None)
+    try:
+        assert migracoes.aplicar_pendentes(conexao) == [versao]
+        assert _versoes(conexao)[-1] == (versao, 0)
+
+        assert migracoes.preencher_pendentes(conexao, tamanho_lote=2) == 5
+        assert lotes == [2, 2, 1, 0]
+        assert _versoes(conexao)[-1] == (versao, 1)
+        assert conexao.execute("SELECT COUNT(*) FROM teste_preencher WHERE pronto=1").fetchone()[0] == 5
+        assert migracoes.preencher_pendentes(conexao) == 0
+    finally:
+        conexao.close()
@@ -0,0 +1,35 @@
+import monitor
+from banco import conectar
+
+
+def _cadastrar(conexao, nome, ip, status):
+    return conexao.execute(
+        "INSERT INTO ativos_online (nome, ip_address, status) VALUES (?, ?, ?)", (nome, ip, status)).lastrowid
+
+
+def test_verificar_ativos_atualiza_status_alertas_e_latencia(banco_temporario, monkeypatch):
+    conexao = conectar()
+    with conexao:
+        caiu = _cadastrar(conexao, 'servidor', '10.0.0.1', 'Online')
+        voltou = _cadastrar(conexao, 'impressora', '10.0.0.2', 'Offline')
+        estavel = _cadastrar(conexao, 'switch', '10.0.0.3', 'Online')
+    conexao.close()
+
+    # Sonda falsa: 10.0.0.1 não responde, os outros respondem com RTT conhecido
+    respostas = {'10.0.0.2': 0.004, '10.0.0.3': 0.0015}
+    monkeypatch.setattr(monitor, 'varrer_hosts', lambda ips, **kwargs: {ip: respostas[ip] for ip in ips if ip in respostas})
+
+    monitor.verificar_ativos()
+
+    conexao = conectar()
+    try:
+        status = dict(conexao.execute("SELECT id, status FROM ativos_online").fetchall())
+        assert status == {caiu: 'Offline', voltou: 'Online', estavel: 'Online'}
+
+        alertas = conexao.execute("SELECT ativo_id, tipo_alerta FROM alertas ORDER BY id").fetchall()
+        assert [tuple(alerta) for alerta in alertas] == [(caiu, 'Status: Offline'), (voltou, 'Status: Online')]
+
+        amostras = dict(conexao.execute("SELECT ativo_id, rtt_us FROM latencia").fetchall())
+        assert amostras == {caiu: None, voltou: 4000, estavel: 1500}
+    finally:
+        conexao.close()
@@ -0,0 +1,56 @@
+import time
+
+import netbios
+from netbios import ResponderNbstatLocal, consultar_nbstat, consultar_nbstat_lote, ler_resposta, montar_resposta
+
+TIMEOUT = 0.5
+
+
+def test_lote_em_um_socket_com_host_mudo():
+    # Dois "hosts Windows" na mesma porta (endereços de loopback diferentes) e um IP que não responde
+    with ResponderNbstatLocal('PC-RECEPCAO', host='127.0.0.2') as primeiro, \
+            ResponderNbstatLocal('PC-FINANCEIRO', host='127.0.0.3', porta=primeiro.porta):
+        inicio = time.monotonic()
+        resultado = consultar_nbstat_lote(['127.0.0.2', '127.0.0.3', '127.0.0.4', '127.0.0.2'],
+                                          timeout=TIMEOUT, porta=primeiro.porta)
+        decorrido = time.monotonic() - inicio
+
+    assert resultado == {'127.0.0.2': 'PC-RECEPCAO', '127.0.0.3': 'PC-FINANCEIRO', '127.0.0.4': None}
+    # Um prazo só para o lote inteiro, não um por IP
+    assert decorrido < 2 * TIMEOUT
+
+
+def test_todos_respondem_antes_do_prazo():
+    with ResponderNbstatLocal('PC-TESTE', host='127.0.0.2') as respondedor:
+        inicio = time.monotonic()
+        assert consultar_nbstat('127.0.0.2', timeout=5, porta=respondedor.porta) == 'PC-TESTE'
+        assert time.monotonic() - inicio < 1
+
+
+def test_sem_resposta_retorna_none_no_prazo():
+    with ResponderNbstatLocal('PC-TESTE', host='127.0.0.2') as respondedor:
+        porta_livre = respondedor.porta
+    inicio = time.monotonic()
+    assert consultar_nbstat_lote(['127.0.0.2', '127.0.0.5'], timeout=TIMEOUT, porta=porta_livre) == \
+        {'127.0.0.2': None, '127.0.0.5': None}
+    assert time.monotonic() - inicio < 2 * TIMEOUT
+    assert consultar_nbstat_lote([]) == {}
+
+
+def test_nome_da_maquina_prefere_unique_20_depois_00():
+    grupo_primeiro = [('WORKGROUP', 0x00, True), ('ESTACAO', 0x00, False), ('SERVIDOR', 0x20, False)]
+    assert netbios.nome_da_maquina(grupo_primeiro) == 'SERVIDOR'
+    assert netbios.nome_da_maquina([('WORKGROUP', 0x00, True), ('ESTACAO', 0x00, False)]) == 'ESTACAO'
+    assert netbios.nome_da_maquina([('WORKGROUP', 0x00, True), ('WORKGROUP', 0x1E, True)]) is None
+
+    # Pelo socket: só grupos e o <00> UNIQUE na tabela do respondedor
+    nomes = [('WORKGROUP', 0x00, True), ('__MSBROWSE__', 0x01, True), ('IMPRESSORA-RH', 0x00, False)]
+    with ResponderNbstatLocal('IGNORADO', host='127.0.0.2', nomes=nomes) as respondedor:
+        assert consultar_nbstat('127.0.0.2', timeout=TIMEOUT, porta=respondedor.porta) == 'IMPRESSORA-RH'
+
+
+def test_resposta_montada_e_lida_de_volta():
+    pacote = montar_resposta(0x1234, [('PC-TESTE', 0x20, False)], mac='3C:52:82:6E:4A:1B')
+    assert ler_resposta(pacote) == (0x1234, [('PC-TESTE', 0x20, False)], '3C:52:82:6E:4A:1B')
+    assert ler_resposta(pacote[:20]) is None
+    assert ler_resposta(netbios.montar_consulta(1)) is None  # Consulta, não resposta
@@ -0,0 +1,62 @@
+import os
+
+import presenca
+
+# Tabelas no formato real: /proc/net/arp, `ip -4 neigh show`, leases do dnsmasq e dhcpd.leases do ISC
+DADOS = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'dados')
+AGORA = 1764504000  # 2025-11-30 12:00:00 UTC
+
+
+def _ler(nome):
+    with open(os.path.join(DADOS, nome), encoding='utf-8') as arquivo:
+        return arquivo.read()
+
+
+def test_tabela_arp_ignora_entradas_incompletas():
+    assert presenca.ler_tabela_arp(_ler('proc_net_arp.txt')) == {
+        '192.168.0.1': 'C8:3A:35:1F:80:01',
+        '192.168.0.23': '3C:52:82:6E:4A:1B',
+        '192.168.0.57': 'B8:27:EB:10:22:33',
+        '10.20.0.5': '00:50:56:A1:0B:7C',
+    }
+
+
+def test_ip_neigh_ignora_incomplete_e_failed():
+    assert presenca.ler_ip_neigh(_ler('ip_neigh.txt')) == {
+        '192.168.0.1': ('C8:3A:35:1F:80:01', 'REACHABLE'),
+        '192.168.0.23': ('3C:52:82:6E:4A:1B', 'DELAY'),
+        '192.168.0.31': ('F0:18:98:4D:AA:02', 'STALE'),
+        '192.168.0.57': ('B8:27:EB:10:22:33', 'PERMANENT'),
+        '192.168.0.61': ('9C:B6:D0:E1:41:7F', 'PROBE'),
+        '10.20.0.5': ('00:50:56:A1:0B:7C', 'STALE'),
+    }
+
+
+def test_leases_dnsmasq_so_os_validos():
+    assert presenca.ler_leases(os.path.join(DADOS, 'dnsmasq.leases'), agora=AGORA) == {
+        '192.168.0.31': ('F0:18:98:4D:AA:02', 'macbook-ana'),
+        '192.168.0.50': ('00:1B:A9:55:66:77', 'impressora-rh'),  # expira 0 = lease permanente
+        '192.168.0.61': ('9C:B6:D0:E1:41:7F', None),
+    }
+
+
+def test_leases_isc_ultimo_bloco_ativo_de_cada_ip():
+    assert presenca.ler_leases(os.path.join(DADOS, 'dhcpd.leases'), agora=AGORA) == {
+        '192.168.0.31': ('F0:18:98:4D:AA:02', 'macbook-ana'),
+        '192.168.0.61': ('9C:B6:D0:E1:41:7F', 'celular-joao'),
+        '192.168.0.80': ('00:1B:A9:55:66:77', 'impressora-rh'),  # ends never
+    }
+
+
+def test_coletar_vizinhos_com_tabelas_gravadas():
+    presentes, macs = presenca.coletar_vizinhos(
+        ['192.168.0.0/24'],
+        [os.path.join(DADOS, 'dhcpd.leases'), os.path.join(DADOS, 'dnsmasq.leases')],
+        texto_arp=_ler('proc_net_arp.txt'), texto_neigh=_ler('ip_neigh.txt'), agora=AGORA)
+    assert presentes == {
+        '192.168.0.1': 'C8:3A:35:1F:80:01',
+        '192.168.0.23': '3C:52:82:6E:4A:1B',
+        '192.168.0.61': '9C:B6:D0:E1:41:7F',
+    }
+    assert set(macs) == {'192.168.0.1', '192.168.0.23', '192.168.0.31', '192.168.0.50',
+                         '192.168.0.57', '192.168.0.61', '192.168.0.80'}
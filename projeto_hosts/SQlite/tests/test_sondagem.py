@@ -0,0 +1,129 @@
+import asyncio
+import time
+
+import pytest
+
+import sondagem
+from sondagem import OuvinteTCPLocal, SondaFalsa, SondaTCP, limite_de_conexoes, varrer_async, varrer_hosts
+
+
+def _porta_fechada():
+    with OuvinteTCPLocal() as ouvinte:
+        return ouvinte.portas[0]
+
+
+class SemaforoContado(asyncio.Semaphore):
+    """Semáforo que guarda o pico de conexões ao mesmo tempo."""
+
+    def __init__(self, valor):
+        super().__init__(valor)
+        self.em_uso = 0
+        self.pico = 0
+
+    async def __aenter__(self):
+        await super().__aenter__()
+        self.em_uso += 1
+        self.pico = max(self.pico, self.em_uso)
+
+    async def __aexit__(self, *excecao):
+        self.em_uso -= 1
+        await super().__aexit__(*excecao)
+
+
+class SondaContada(SondaFalsa):
+    """SondaFalsa sem perda que guarda o pico de sondagens em voo."""
+
+    def __init__(self):
+        super().__init__(taxa_perda=0, rtt_medio=0.005, semente=3)
+        self.em_voo = 0
+        self.pico = 0
+
+    async def sondar(self, ip, timeout):
+        self.em_voo += 1
+        self.pico = max(self.pico, self.em_voo)
+        try:
+            return await super().sondar(ip, timeout)
+        finally:
+            self.em_voo -= 1
+
+
+def _ips(total):
+    return [f'10.0.{i // 256}.{i % 256}' for i in range(total)]
+
+
+def test_varredura_respeita_a_janela():
+    sonda = SondaContada()
+    resultado = asyncio.run(varrer_async(_ips(200), sonda, timeout=1, janela=16))
+    assert len(resultado) == 200
+    assert sonda.pico == 16
+    # Janela maior que a lista: um trabalhador por IP, não mais
+    sonda = SondaContada()
+    asyncio.run(varrer_async(_ips(10), sonda, timeout=1, janela=1024))
+    assert sonda.pico == 10
+
+
+def test_host_mudo_so_custa_o_timeout():
+    # Ninguém responde: cada "onda" da janela leva um timeout, não um por host
+    inicio = time.perf_counter()
+    resultado = varrer_hosts(_ips(256), sonda=SondaFalsa(taxa_perda=1), timeout=0.1, janela=256)
+    assert time.perf_counter() - inicio < 0.5
+    assert set(resultado.values()) == {None}
+
+    inicio = time.perf_counter()
+    varrer_hosts(_ips(64), sonda=SondaFalsa(taxa_perda=1), timeout=0.05, janela=16)
+    assert time.perf_counter() - inicio >= 4 * 0.05
+
+
+def test_contagem_de_resultados():
+    resultado = varrer_hosts(_ips(2000), sonda=SondaFalsa(taxa_perda=0.25, rtt_medio=0.005, semente=42),
+                             timeout=0.2, janela=512)
+    online = [rtt for rtt in resultado.values() if rtt is not None]
+    assert len(resultado) == 2000
+    assert 1300 < len(online) < 1700
+    assert all(0 <= rtt < 0.2 for rtt in online)
+    assert varrer_hosts([], sonda=SondaFalsa()) == {}
+
+
+def test_connect_completo_conta_como_online():
+    with OuvinteTCPLocal(quantidade=2) as ouvinte:
+        resultado = varrer_hosts(['127.0.0.1'], sonda=SondaTCP(portas_padrao=ouvinte.portas), timeout=1)
+    assert resultado['127.0.0.1'] is not None
+    assert 0 <= resultado['127.0.0.1'] < 1
+
+
+def test_porta_recusada_prova_que_o_host_existe():
+    # Nenhuma porta escutando: o RST do kernel já basta para dar o host como Online
+    sonda = SondaTCP({'127.0.0.1': [_porta_fechada()]}, portas_padrao=[1])
+    resultado = varrer_hosts(['127.0.0.1', '127.0.0.2'], sonda=sonda, timeout=1)
+    assert resultado['127.0.0.1'] is not None
+    assert resultado['127.0.0.2'] is not None
+
+
+@pytest.mark.parametrize('suave, esperado', [(4096, 4096 - sondagem.MARGEM_DESCRITORES), (1024, 1024 - sondagem.MARGEM_DESCRITORES), (200, 100)])
+def test_limite_de_conexoes_fica_abaixo_do_rlimit(monkeypatch, suave, esperado):
+    if sondagem.resource is None:
+        pytest.skip("sem o módulo resource (Windows)")
+    monkeypatch.setattr(sondagem.resource, 'getrlimit', lambda _: (suave, sondagem.resource.RLIM_INFINITY))
+    assert limite_de_conexoes(10 ** 6) == esperado
+    assert limite_de_conexoes(16) == 16
+    assert SondaTCP(max_conexoes=10 ** 6)._max_conexoes == esperado
+
+
+def test_semaforo_segura_as_conexoes_em_voo(monkeypatch):
+    if sondagem.resource is None:
+        pytest.skip("sem o módulo resource (Windows)")
+    # RLIMIT_NOFILE "de mentira" em 300: no máximo 300 - MARGEM_DESCRITORES sockets abertos
+    monkeypatch.setattr(sondagem.resource, 'getrlimit', lambda _: (300, sondagem.resource.RLIM_INFINITY))
+    porta = _porta_fechada()
+    ips = [f'127.0.{i // 250}.{i % 250 + 1}' for i in range(600)]
+    sonda = SondaTCP(portas_padrao=[porta] * 4)
+    limite = sonda._max_conexoes
+    assert limite == 300 - sondagem.MARGEM_DESCRITORES
+
+    async def _executar():
+        sonda._limite = SemaforoContado(limite)
+        return await varrer_async(ips, sonda, timeout=2, janela=len(ips))
+
+    resultado = asyncio.run(_executar())
+    assert sum(rtt is not None for rtt in resultado.values()) == len(ips)
+    assert 1 < sonda._limite.pico <= limite
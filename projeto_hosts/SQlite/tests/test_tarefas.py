@@ -0,0 +1,45 @@
+import threading
+import time
+
+import tarefas
+
+
+def _esperar_fim(tarefa, prazo=5):
+    limite = time.monotonic() + prazo
+    while not tarefa.finalizada or tarefa.finalizado_em is None:
+        assert time.monotonic() < limite, tarefa.como_dict()
+        time.sleep(0.01)
+
+
+def test_cancelar_interrompe_tarefa_em_execucao():
+    comecou = threading.Event()
+
+    def longa(cancelar=None, progresso=None):
+        progresso(fase='detalhando', hosts_encontrados=10, hosts_processados=3)
+        comecou.set()
+        cancelar.wait(5)
+        return True
+
+    tarefa = tarefas.submeter('discovery', longa, cancelavel=True)
+    assert comecou.wait(5)
+    assert tarefas.cancelar(tarefa.id) is tarefa
+    _esperar_fim(tarefa)
+
+    estado = tarefa.como_dict()
+    assert (estado['fase'], estado['cancelavel'], estado['hosts_processados']) == ('cancelado', True, 3)
+
+
+def test_tarefa_sem_cancelamento_nao_recebe_o_evento():
+    recebidos = {}
+
+    def curta(progresso=None, **kwargs):
+        recebidos.update(kwargs)
+        return {'total': 1}
+
+    tarefa = tarefas.submeter('reclassificar', curta)
+    _esperar_fim(tarefa)
+    tarefas.cancelar(tarefa.id)
+
+    assert recebidos == {}
+    assert (tarefa.fase, tarefa.resultado) == ('concluido', {'total': 1})
+    assert tarefas.cancelar('nao-existe') is None
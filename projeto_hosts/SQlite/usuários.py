@@ -1,4 +1,6 @@
 import sqlite3
+from banco import conectar
+from migracoes import migrar
 
 conexao = None
 cursor = None
@@ -6,19 +8,10 @@ cursor = None
 try:
     # 1. Conectar (ou criar) um banco de dados
     # Como você apagou 'meu_banco.db', ele será criado do zero
-    conexao = sqlite3.connect('meu_banco.db')
+    # --- ETAPA DE CRIAÇÃO (CREATE): tabelas no formato atual, pelas migrações ---
+    migrar()
+    conexao = conectar(row_factory=None)
     cursor = conexao.cursor()
-
-    # --- ETAPA DE CRIAÇÃO (CREATE) ---
-    # Este comando AGORA VAI SER EXECUTADO
-    cursor.execute('''
-    CREATE TABLE IF NOT EXISTS usuarios (
-        id INTEGER PRIMARY KEY AUTOINCREMENT,
-        nome TEXT NOT NULL,
-        email TEXT,
-        senha TEXT NOT NULL
-    )
-    ''')
     print("Tabela 'usuarios' criada/verificada com a coluna 'senha'.")
 
     # --- DADOS DE TESTE (Corrigido) ---
@@ -60,6 +60,10 @@ async function atualizarOnlineComScan() {
         
         if (!response.ok) throw new Error('Erro no scan');
 
+        // O scan roda em segundo plano: aguarda a tarefa terminar
+        const { job_id } = await response.json();
+        await aguardarTarefaStatus(job_id);
+
         // Sucesso! Recarrega a tabela com os novos status do banco
         await carregarAtivosOnline();
         
@@ -78,6 +82,19 @@ async function atualizarOnlineComScan() {
     }
 }
 
+// Consulta /scan-jobs/<id> até a tarefa de scan terminar
+async function aguardarTarefaStatus(jobId) {
+    while (true) {
+        await new Promise(resolve => setTimeout(resolve, 1000));
+        const response = await fetch(`${API_BASE_URL_ASSETS}/scan-jobs/${jobId}`);
+        if (!response.ok) throw new Error('Tarefa de scan não encontrada');
+        const tarefa = await response.json();
+
+        if (tarefa.fase === 'concluido') return tarefa;
+        if (tarefa.fase === 'erro') throw new Error(tarefa.erro || 'Erro no scan');
+    }
+}
+
 // --- 3. RENDERIZAÇÃO DA TABELA ---
 function renderizarTabelaOnline(ativos) {
     const tableBody = document.getElementById('online-assets-tbody');
@@ -45,11 +45,15 @@ window.atualizarComScan = async function() {
     if(window.showToast) window.showToast('Varrendo a rede por novos dispositivos...', 'info');
 
     try {
-        // Chama o scan completo do Python
+        // Chama o scan completo do Python (roda em segundo plano no servidor)
         const responseScan = await fetch(`${API_BASE_URL}/scan-rede`, { method: 'POST' });
 
         if (!responseScan.ok) throw new Error('Erro no scan');
 
+        // Aguarda a tarefa terminar consultando o progresso
+        const { job_id } = await responseScan.json();
+        await aguardarTarefaScan(job_id, btn);
+
         // Recarrega a tabela com as novidades
         await carregarDadosInventario(); 
         
@@ -66,6 +70,21 @@ window.atualizarComScan = async function() {
     }
 }
 
+// Consulta /scan-jobs/<id> até o scan terminar, mostrando o progresso no botão
+async function aguardarTarefaScan(jobId, btn) {
+    while (true) {
+        await new Promise(resolve => setTimeout(resolve, 1500));
+        const response = await fetch(`${API_BASE_URL}/scan-jobs/${jobId}`);
+        if (!response.ok) throw new Error('Tarefa de scan não encontrada');
+        const tarefa = await response.json();
+
+        if (tarefa.fase === 'concluido') return tarefa;
+        if (tarefa.fase === 'erro') throw new Error(tarefa.erro || 'Erro no scan');
+
+        if (btn) btn.innerHTML = `<i class="fa fa-spinner fa-spin"></i> Buscando Novos Ativos... ${tarefa.progresso}%`;
+    }
+}
+
 // --- 3. TABELA ---
 function preencherTabela(dados) {
     const tbody = document.getElementById('inventory-table-body');